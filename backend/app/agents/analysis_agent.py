@@ -0,0 +1,160 @@
+from typing import Any, List
+from app.agents.base import BaseAgent
+from app.agents.department_agent import DepartmentAgent, VALID_DEPARTMENTS, CLASSIFICATION_RULES
+from app.agents.sentiment_agent import SentimentAgent, _normalize_sentiment
+from app.core.analysis_memo import analysis_memo
+from app.core.llm import track_served_routes
+from app.schemas.layout import Article
+from app.core.config import settings
+import asyncio
+import json
+
+class AnalysisAgent(BaseAgent):
+    """
+    Fused department + sentiment analysis (ANALYSIS_MODE="fused").
+    The local passes run first: the centroid classifier labels clear-cut
+    departments and the lexicon settles clear-cut sentiment. Articles still
+    needing both answers go to the model once, in batches of
+    ANALYSIS_BATCH_SIZE, instead of once per agent. Articles needing one
+    answer, and anything the batch response leaves missing or invalid, go
+    through the regular DepartmentAgent / SentimentAgent LLM paths.
+    """
+
+    def __init__(self, department_agent: DepartmentAgent = None, sentiment_agent: SentimentAgent = None):
+        super().__init__(name="Fused Analysis Agent")
+        self.department_agent = department_agent or DepartmentAgent()
+        self.sentiment_agent = sentiment_agent or SentimentAgent()
+
+    async def run(self, articles: List[Article]) -> List[Article]:
+        if not articles:
+            return articles
+
+        memo = await analysis_memo.lookup(articles)
+        unseen = []
+        for i, article in enumerate(articles):
+            entry = memo.get(i, {})
+            sentiment = _normalize_sentiment(entry.get("sentiment_label"), entry.get("sentiment_confidence"))
+            if entry.get("department") in VALID_DEPARTMENTS and sentiment:
+                article.department = entry["department"]
+                article.sentiment_label, article.sentiment_confidence = sentiment
+            else:
+                unseen.append(article)
+        if len(unseen) < len(articles):
+            self.log(f"Analysis memo supplied results for {len(articles) - len(unseen)}/{len(articles)} articles")
+        if not unseen:
+            return articles
+
+        department_pending, vectors, local_guesses = unseen, None, {}
+        if settings.DEPARTMENT_CLASSIFIER_ENABLED:
+            try:
+                department_pending, vectors, local_guesses = await self.department_agent._classify_local(unseen)
+            except Exception as e:
+                self.log(f"Local classifier unavailable ({e}). Using LLM for all departments.")
+        sentiment_pending = self.sentiment_agent._settle_with_lexicon(unseen)
+
+        needs_department = {id(a) for a in department_pending}
+        needs_sentiment = {id(a) for a in sentiment_pending}
+        fused = [a for a in unseen if id(a) in needs_department and id(a) in needs_sentiment]
+        department_only = [a for a in department_pending if id(a) not in needs_sentiment]
+        sentiment_only = [a for a in sentiment_pending if id(a) not in needs_department]
+
+        batch_size = max(1, settings.ANALYSIS_BATCH_SIZE)
+        self.log(
+            f"Fused department + sentiment analysis for {len(fused)}/{len(unseen)} articles (batch size {batch_size}); "
+            f"{len(department_only)} need a department only, {len(sentiment_only)} a sentiment only"
+        )
+
+        batches = [fused[i:i + batch_size] for i in range(0, len(fused), batch_size)]
+        with track_served_routes() as routes:
+            results = await self.map_concurrent(batches, self._analyze_batch)
+
+            missing_department = department_only + [a for batch in results for a in batch[0]]
+            missing_sentiment = sentiment_only + [a for batch in results for a in batch[1]]
+            if len(missing_department) > len(department_only) or len(missing_sentiment) > len(sentiment_only):
+                self.log(
+                    f"Falling back for {len(missing_department) - len(department_only)} department(s) "
+                    f"and {len(missing_sentiment) - len(sentiment_only)} sentiment(s)"
+                )
+            department_failed, sentiment_ok = await asyncio.gather(
+                self.department_agent._classify_llm(missing_department) if missing_department else asyncio.sleep(0, []),
+                self.map_concurrent(missing_sentiment, self.sentiment_agent.analyze)
+            )
+
+        # Only LLM answers are memoized: not local labels, lexicon scores, error defaults or heuristic sentiment
+        department_failed = {id(a) for a in department_failed}
+        sentiment_failed = {id(a) for a, ok in zip(missing_sentiment, sentiment_ok) if not ok}
+        await analysis_memo.store([a for a in department_pending if id(a) not in department_failed], ["department"], routes)
+        await analysis_memo.store(
+            [a for a in sentiment_pending if id(a) not in sentiment_failed],
+            ["sentiment_label", "sentiment_confidence"],
+            routes
+        )
+
+        if vectors is not None:
+            self.department_agent._learn_from_llm(department_pending, vectors, local_guesses, department_failed)
+        return articles
+
+    async def _analyze_batch(self, batch: List[Article]):
+        """One call for the whole batch. Returns (missing_department, missing_sentiment)."""
+        department_list = "\n".join(f"{i}. {dept}" for i, dept in enumerate(VALID_DEPARTMENTS))
+        article_list = "\n\n".join(
+            f"[{i}] Headline: {article.headline}\nBody: {article.body[:800]}"
+            for i, article in enumerate(batch)
+        )
+        prompt = f"""
+            Act as a Cabinet Secretary for the Andhra Pradesh Government.
+            For EACH of the following news articles:
+            - classify it into EXACTLY ONE of these official departments (by number):
+
+            {department_list}
+
+            - rate its sentiment as "Positive", "Negative" or "Neutral" with a confidence between 0.0 and 1.0.
+
+            Articles:
+            {article_list}
+            {CLASSIFICATION_RULES}
+            Return ONLY a JSON object keyed by article index, e.g.
+            {{"0": {{"d": 5, "s": "Positive", "c": 0.8}}, "1": {{"d": 17, "s": "Neutral", "c": 0.6}}}}
+            """
+
+        try:
+            content = await self.call_llm(
+                messages=[
+                    {"role": "system", "content": "You are a government news analysis AI. Output only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                json_mode=True
+            )
+            data = json.loads(content.replace("```json", "").replace("```", "").strip())
+        except Exception as e:
+            self.log(f"Fused analysis of {len(batch)} articles failed: {e}")
+            return list(batch), list(batch)
+
+        if not isinstance(data, dict):
+            self.log(f"Fused response was not an index mapping: {content[:200]}")
+            return list(batch), list(batch)
+
+        missing_department, missing_sentiment = [], []
+        for i, article in enumerate(batch):
+            entry: Any = data.get(str(i))
+            if not isinstance(entry, dict):
+                missing_department.append(article)
+                missing_sentiment.append(article)
+                continue
+
+            department = DepartmentAgent._department_from_batch_value(entry.get("d", entry.get("department")))
+            if department is None:
+                missing_department.append(article)
+            else:
+                article.department = department
+
+            sentiment = _normalize_sentiment(entry.get("s", entry.get("sentiment")), entry.get("c", entry.get("confidence", 0.5)))
+            if sentiment is None:
+                missing_sentiment.append(article)
+            else:
+                article.sentiment_label, article.sentiment_confidence = sentiment
+
+            if department and sentiment:
+                self.log(f"Analyzed: '{article.headline[:30]}...' -> {department}, {sentiment[0]} ({sentiment[1]:.2f})")
+
+        return missing_department, missing_sentiment
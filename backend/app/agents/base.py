@@ -1,5 +1,9 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional, List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, List, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
 
 class BaseAgent(ABC):
     def __init__(self, name: str):
@@ -19,56 +23,38 @@ class BaseAgent(ABC):
         # In a real app, use a proper logger
         print(f"[{self.name}] {message}")
 
-    async def call_llm(self, messages: List[Dict[str, Any]], model: Optional[str] = None, json_mode: bool = False) -> str:
+    async def map_concurrent(self, items: List[T], fn: Callable[[T], Awaitable[R]], limit: Optional[int] = None) -> List[R]:
         """
-        Versatile LLM caller that handles Groq key rotation and Ollama fallback.
+        Await `fn(item)` for every item, at most `limit` at a time (default
+        ANALYSIS_CONCURRENCY). Results come back in input order. `fn` should
+        handle its own per-item errors; anything it raises propagates.
         """
         from app.core.config import settings
-        from groq import Groq, RateLimitError
-        from app.core.ollama import ollama_service
 
-        keys = settings.GROQ_API_KEYS
-        
-        # Case 1: Groq with Rotation
-        if settings.LLM_PROVIDER == "groq" and keys:
-            for i, key in enumerate(keys):
-                try:
-                    client = Groq(api_key=key)
-                    resp = client.chat.completions.create(
-                        messages=messages,
-                        model=model or settings.GROQ_MODEL,
-                        response_format={"type": "json_object"} if json_mode else None
-                    )
-                    result = resp.choices[0].message.content
-                    self.log(f"LLM Call Success. Provider: Groq, Model: {model or settings.GROQ_MODEL}, Result len: {len(result) if result else 0}")
-                    return result
-                except RateLimitError:
-                    self.log(f"Key {i+1}/{len(keys)} rate limited. Trying next...")
-                    continue
-                except Exception as e:
-                    self.log(f"Groq error with key {i+1}: {e}")
-                    if i < len(keys) - 1:
-                        continue
-                    else:
-                        break # Fallback to Ollama if all keys fail
+        semaphore = asyncio.Semaphore(max(1, limit or settings.ANALYSIS_CONCURRENCY))
+
+        async def bounded(item: T) -> R:
+            async with semaphore:
+                return await fn(item)
+
+        return await asyncio.gather(*(bounded(item) for item in items))
+
+    async def call_llm(self, messages: List[Dict[str, Any]], model: Optional[str] = None, json_mode: bool = False, cache: bool = True, hedge: Optional[bool] = None) -> str:
+        """
+        Versatile LLM caller that handles Groq key rotation and Ollama fallback.
+        Delegates to the shared async client pool so concurrent calls don't block the event loop.
+        Responses are served from the on-disk LLM cache unless `cache=False`.
+        `hedge=True` duplicates slow calls to a secondary provider (latency-sensitive tasks).
+        """
+        from app.core.llm import llm_service
+
+        return await llm_service.chat(messages, model=model, json_mode=json_mode, source=self.name, cache=cache, hedge=hedge)
+
+    async def stream_llm(self, messages: List[Dict[str, Any]], model: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Token-streaming variant of call_llm for user-facing answers (SSE endpoints).
+        """
+        from app.core.llm import llm_service
 
-        # Case 2: Manual Ollama or Fallback
-        try:
-            return ollama_service.chat(messages, schema=True if json_mode else None)
-        except Exception as e:
-            # Final try: if Ollama was requested but failed, try Groq as last resort
-            if settings.LLM_PROVIDER == "ollama" and keys:
-                for key in keys:
-                    try:
-                        client = Groq(api_key=key)
-                        resp = client.chat.completions.create(
-                            messages=messages,
-                            model=model or "meta-llama/llama-4-scout-17b-16e-instruct",
-                            response_format={"type": "json_object"} if json_mode else None
-                        )
-                        return resp.choices[0].message.content
-                    except:
-                        continue
-            
-            self.log(f"Final LLM Call failed: {e}")
-            raise e
+        async for token in llm_service.stream(messages, model=model, source=self.name):
+            yield token
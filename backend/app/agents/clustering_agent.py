@@ -1,6 +1,7 @@
 from typing import List
 from app.agents.base import BaseAgent
 from app.schemas.layout import Article
+from app.core.analysis_memo import analysis_memo
 import uuid
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.cluster import DBSCAN
@@ -41,5 +42,10 @@ class ClusteringAgent(BaseAgent):
             # Fallback: Treat all as unique
             for art in articles:
                 art.topic_cluster_id = f"unique_{uuid.uuid4().hex[:8]}"
-                
+
+        # Recorded for provenance only; cluster labels are relative to this run
+        await analysis_memo.store(
+            [art for art in articles if (art.topic_cluster_id or "").startswith("cluster_")],
+            ["topic_cluster_id"]
+        )
         return articles
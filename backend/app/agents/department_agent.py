@@ -1,10 +1,83 @@
-from typing import List
+from typing import Any, Dict, List, Optional
 from app.agents.base import BaseAgent
 from app.schemas.layout import Article
 from app.core.config import settings
+from app.core.analysis_memo import analysis_memo
+from app.core.llm import track_served_routes
+from app.core.department_classifier import CentroidClassifier, article_text, ensure_trained
 from groq import Groq
+import asyncio
 import json
 
+# Granular AP Government Departments
+VALID_DEPARTMENTS = [
+    "Agriculture & Cooperation",
+    "Animal Husbandry & Fisheries",
+    "Backward Classes Welfare",
+    "Energy",
+    "Finance & Planning",
+    "Health, Medical & Family Welfare",
+    "Higher Education",
+    "Home & Law and Order",
+    "Housing",
+    "Irrigation & Water Resources",
+    "Municipal Admin & Urban Dev",
+    "Panchayat Raj & Rural Dev",
+    "Revenue & Land Administration",
+    "School Education",
+    "Social Welfare",
+    "Transport, Roads & Buildings",
+    "Women & Child Welfare",
+    "General Administration", # For CM/Generic Govt news
+    "Civil Supplies"
+]
+DEFAULT_DEPARTMENT = "General Administration"
+
+CLASSIFICATION_RULES = """
+            Rules:
+            1. Analyze the content deeply. If mentions "Polavaram", it is "Irrigation". If "Amma Vodi", it is "School Education".
+            2. If the article is about the Chief Minister (CM) but discusses a specific topic (e.g. CM visits Hospital), classify under that topic (Health).
+            3. If the article is purely political or general administrative news, use "General Administration".
+            4. Support TELUGU text natively.
+"""
+
+
+def _match_department(category: str) -> Optional[str]:
+    """Map raw model output onto VALID_DEPARTMENTS. None if nothing plausible matched."""
+    category = category.strip().replace('"', '').replace("'", "")
+    lowered = category.lower()
+    if not lowered:
+        return None
+
+    # We can't trust LLM 100% to output exact string, so let's try to match
+    for dept in VALID_DEPARTMENTS:
+        if dept.lower() in lowered:
+            return dept
+
+    # Maybe it outputted "Education" instead of "School Education"
+    if "education" in lowered: return "School Education"
+    elif "health" in lowered: return "Health, Medical & Family Welfare"
+    elif "police" in lowered: return "Home & Law and Order"
+    elif "water" in lowered: return "Irrigation & Water Resources"
+    elif "farm" in lowered or "agri" in lowered: return "Agriculture & Cooperation"
+    return None
+
+
+def _embed_documents(texts: List[str]) -> List[List[float]]:
+    # Reuse the multilingual MiniLM model SearchAgent already holds in memory
+    from app.agents.search_agent import search_agent
+    return search_agent.embeddings.embed_documents(texts)
+
+
+department_classifier = CentroidClassifier(
+    VALID_DEPARTMENTS,
+    embed=_embed_documents,
+    min_margin=settings.DEPARTMENT_CLASSIFIER_MIN_MARGIN,
+    min_examples=settings.DEPARTMENT_CLASSIFIER_MIN_EXAMPLES,
+    audit_rate=settings.DEPARTMENT_CLASSIFIER_AUDIT_RATE
+)
+
+
 class DepartmentAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="Neural Department Agent")
@@ -13,90 +86,214 @@ class DepartmentAgent(BaseAgent):
         """
         UPGRADE: Using Neural Classification (LLM) instead of keyword matching.
         This allows the system to handle Telugu, Hindi, and other languages natively.
+        Articles already seen in another edition come from the analysis memo;
+        clear-cut articles are labelled locally by the embedding classifier;
+        the rest are classified DEPARTMENT_BATCH_SIZE at a time, and anything
+        the batch response leaves missing or invalid is retried one by one.
         """
         if not articles:
             return articles
+
+        memo = await analysis_memo.lookup(articles)
+        unseen = []
+        for i, article in enumerate(articles):
+            department = memo.get(i, {}).get("department")
+            if department in VALID_DEPARTMENTS:
+                article.department = department
+            else:
+                unseen.append(article)
+        if len(unseen) < len(articles):
+            self.log(f"Analysis memo supplied departments for {len(articles) - len(unseen)}/{len(articles)} articles")
+        if not unseen:
+            return articles
+
+        local_guesses: Dict[int, str] = {}
+        vectors = None
+        pending = unseen
+        if settings.DEPARTMENT_CLASSIFIER_ENABLED:
+            try:
+                pending, vectors, local_guesses = await self._classify_local(unseen)
+            except Exception as e:
+                self.log(f"Local classifier unavailable ({e}). Using LLM for all articles.")
+
+        failed = []
+        with track_served_routes() as routes:
+            if pending:
+                failed = await self._classify_llm(pending)
+        # Only LLM answers are memoized (under the LLM's version): local centroid labels are cheap to
+        # recompute, and defaults assigned after an error or an unmatched reply are not answers at all
+        failed_ids = {id(article) for article in failed}
+        await analysis_memo.store([a for a in pending if id(a) not in failed_ids], ["department"], routes)
+
+        if vectors is not None:
+            self._learn_from_llm(pending, vectors, local_guesses, failed_ids)
+        return articles
+
+    def _learn_from_llm(self, pending: List[Article], vectors, local_guesses: Dict[int, str], failed_ids: set):
+        """
+        LLM labels train the centroids and measure agreement on audited articles;
+        fallback defaults (failed_ids) would teach the DEFAULT_DEPARTMENT centroid noise.
+        """
+        if not pending:
+            return
+        answered = [row for row, article in enumerate(pending) if id(article) not in failed_ids]
+        if answered:
+            department_classifier.update(vectors[answered], [pending[row].department for row in answered])
+        for article in pending:
+            if id(article) in failed_ids:
+                continue
+            guess = local_guesses.get(id(article))
+            if guess:
+                department_classifier.record_comparison(guess, article.department)
+        stats = department_classifier.stats()
+        if stats["agreement_rate"] is not None:
+            self.log(f"Local/LLM agreement so far: {stats['agreement_rate']:.1%} over {stats['compared_with_llm']} audited articles")
+
+    async def _classify_local(self, articles: List[Article]):
+        """
+        Label articles whose nearest-centroid margin is high enough.
+        Returns (articles needing the LLM, their embeddings, audited local guesses by id()).
+        """
+        import numpy as np
+
+        await ensure_trained(
+            department_classifier,
+            settings.DEPARTMENT_CLASSIFIER_MAX_TRAINING_ROWS,
+            settings.DEPARTMENT_CLASSIFIER_REFRESH_SECONDS
+        )
+        texts = [article_text(article.headline, article.body) for article in articles]
+        vectors = await asyncio.to_thread(department_classifier.embed, texts)
+
+        pending, pending_rows, audited = [], [], {}
+        for row, (article, (label, margin)) in enumerate(zip(articles, department_classifier.predict(vectors))):
+            if label is None:
+                department_classifier.escalations += 1
+                pending.append(article)
+                pending_rows.append(row)
+            elif department_classifier.should_audit():
+                department_classifier.audits += 1
+                audited[id(article)] = label
+                pending.append(article)
+                pending_rows.append(row)
+            else:
+                department_classifier.local_decisions += 1
+                article.department = label
+                self.log(f"Classified locally: '{article.headline[:30]}...' -> {label} (margin {margin:.3f})")
+
+        self.log(f"Local classifier labelled {len(articles) - len(pending)}/{len(articles)} articles; {len(pending)} go to the LLM")
+        return pending, vectors[pending_rows] if pending_rows else np.empty((0, vectors.shape[1])), audited
+
+    async def _classify_llm(self, articles: List[Article]) -> List[Article]:
+        """Returns the articles that fell back to DEFAULT_DEPARTMENT because the model call failed."""
+        batch_size = settings.DEPARTMENT_BATCH_SIZE
+        self.log(f"Neural Classification for {len(articles)} articles (batch size {batch_size})")
+
+        if batch_size <= 1:
+            answered = await self.map_concurrent(articles, self.classify)
+            return [article for article, ok in zip(articles, answered) if not ok]
+
+        batches = [articles[i:i + batch_size] for i in range(0, len(articles), batch_size)]
+        results = await self.map_concurrent(batches, self._classify_batch)
+
+        leftovers = [article for batch_leftovers in results for article in batch_leftovers]
+        if leftovers:
+            self.log(f"Re-running {len(leftovers)} article(s) missing from batch responses one by one")
+            answered = await self.map_concurrent(leftovers, self.classify)
+            return [article for article, ok in zip(leftovers, answered) if not ok]
+        return []
+
+    async def _classify_batch(self, batch: List[Article]) -> List[Article]:
+        """Classify a batch in one call. Returns the articles that still need a department."""
+        department_list = "\n".join(f"{i}. {dept}" for i, dept in enumerate(VALID_DEPARTMENTS))
+        article_list = "\n\n".join(
+            f"[{i}] Headline: {article.headline}\nBody: {article.body[:500]}"
+            for i, article in enumerate(batch)
+        )
+        prompt = f"""
+            Act as a Cabinet Secretary for the Andhra Pradesh Government.
+            Classify EACH of the following news articles into EXACTLY ONE of these official departments (by number):
             
-        self.log(f"Neural Classification for {len(articles)} articles")
-        
-        # We'll batch them to save tokens if possible, but for accuracy let's do 1 by 1 
-        # or in small batches. For this agent, 1 by 1 is safest for high-stakes gov data.
-        
+            {department_list}
+            
+            Articles:
+            {article_list}
+            {CLASSIFICATION_RULES}
+            Return ONLY a JSON object mapping every article index to a department number, e.g. {{"0": 5, "1": 17}}.
+            """
+
+        try:
+            content = await self.call_llm(
+                messages=[
+                    {"role": "system", "content": "You are a government classification AI. Output only valid JSON."},
+                    {"role": "user", "content": prompt}
+                ],
+                json_mode=True
+            )
+            data = json.loads(content.replace("```json", "").replace("```", "").strip())
+        except Exception as e:
+            self.log(f"Batch classification of {len(batch)} articles failed: {e}")
+            return list(batch)
+
+        if isinstance(data, dict) and isinstance(data.get("classifications"), dict):
+            data = data["classifications"]
+        if not isinstance(data, dict):
+            self.log(f"Batch response was not an index mapping: {content[:200]}")
+            return list(batch)
+
+        leftovers = []
+        for i, article in enumerate(batch):
+            matched = self._department_from_batch_value(data.get(str(i)))
+            if matched is None:
+                leftovers.append(article)
+                continue
+            article.department = matched
+            self.log(f"Classified: '{article.headline[:30]}...' -> {matched}")
+        return leftovers
 
-        # Granular AP Government Departments
-        valid_departments = [
-            "Agriculture & Cooperation",
-            "Animal Husbandry & Fisheries",
-            "Backward Classes Welfare",
-            "Energy",
-            "Finance & Planning",
-            "Health, Medical & Family Welfare",
-            "Higher Education",
-            "Home & Law and Order",
-            "Housing",
-            "Irrigation & Water Resources",
-            "Municipal Admin & Urban Dev",
-            "Panchayat Raj & Rural Dev",
-            "Revenue & Land Administration",
-            "School Education",
-            "Social Welfare",
-            "Transport, Roads & Buildings",
-            "Women & Child Welfare",
-            "General Administration", # For CM/Generic Govt news
-            "Civil Supplies"
-        ]
-
-        for article in articles:
-            prompt = f"""
+    @staticmethod
+    def _department_from_batch_value(value: Any) -> Optional[str]:
+        """Accepts a department number (int or numeric string) or a department name."""
+        if isinstance(value, bool) or value is None:
+            return None
+        if isinstance(value, int):
+            return VALID_DEPARTMENTS[value] if 0 <= value < len(VALID_DEPARTMENTS) else None
+        if isinstance(value, str):
+            if value.strip().isdigit():
+                return DepartmentAgent._department_from_batch_value(int(value.strip()))
+            return _match_department(value)
+        return None
+
+    async def classify(self, article: Article) -> bool:
+        """Single-article classification; falls back to DEFAULT_DEPARTMENT on failure or an unmatched reply (returns False)."""
+        prompt = f"""
             Act as a Cabinet Secretary for the Andhra Pradesh Government.
             Classify the following news article into EXACTLY ONE of these official departments:
             
-            {json.dumps(valid_departments, indent=2)}
+            {json.dumps(VALID_DEPARTMENTS, indent=2)}
             
             Article Headline: {article.headline}
             Article Body: {article.body[:800]}
-            
-            Rules:
-            1. Analyze the content deeply. If mentions "Polavaram", it is "Irrigation". If "Amma Vodi", it is "School Education".
-            2. If the article is about the Chief Minister (CM) but discusses a specific topic (e.g. CM visits Hospital), classify under that topic (Health).
-            3. If the article is purely political or general administrative news, use "General Administration".
-            4. Support TELUGU text natively.
-            
+            {CLASSIFICATION_RULES}
             Return ONLY the department name from the list above. No other text.
             """
             
-            try:
-                category = await self.call_llm(
-                    messages=[
-                        {"role": "system", "content": "You are a government classification AI. Output only the exact department name."},
-                        {"role": "user", "content": prompt}
-                    ]
-                )
-                category = category.strip().replace('"', '').replace("'", "")
-                
-                # Fuzzy matching or exact match check
-                # We can't trust LLM 100% to output exact string, so let's try to match
-                matched = "General Administration"
-                for dept in valid_departments:
-                    if dept.lower() in category.lower():
-                        matched = dept
-                        break
+        try:
+            category = await self.call_llm(
+                messages=[
+                    {"role": "system", "content": "You are a government classification AI. Output only the exact department name."},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+            matched = _match_department(category)
+            if matched is None:
+                self.log(f"Unrecognised department '{category.strip()[:40]}' for '{article.headline[:30]}...'. Using {DEFAULT_DEPARTMENT}.")
+                article.department = DEFAULT_DEPARTMENT
+                return False
+            article.department = matched
+            self.log(f"Classified: '{article.headline[:30]}...' -> {matched}")
+            return True
                 
-                # If exact match failed but LLM output something, maybe it outputted "Education" instead of "School Education"
-                if matched == "General Administration" and category != "General Administration":
-                    # Fallback heuristics
-                    if "education" in category.lower(): matched = "School Education"
-                    elif "health" in category.lower(): matched = "Health, Medical & Family Welfare"
-                    elif "police" in category.lower(): matched = "Home & Law and Order"
-                    elif "water" in category.lower(): matched = "Irrigation & Water Resources"
-                    elif "farm" in category.lower() or "agri" in category.lower(): matched = "Agriculture & Cooperation"
-                
-                article.department = matched
-                self.log(f"Classified: '{article.headline[:30]}...' -> {matched}")
-                    
-            except Exception as e:
-                self.log(f"Neural classification failed: {e}")
-                article.department = "General Administration"
-                
-        return articles
-
+        except Exception as e:
+            self.log(f"Neural classification failed: {e}")
+            article.department = DEFAULT_DEPARTMENT
+            return False
@@ -2,6 +2,7 @@ import pytesseract
 from pdf2image import convert_from_path
 from typing import List, Dict, Any
 import time
+from contextlib import ExitStack
 from app.agents.base import BaseAgent
 from app.schemas.ocr import OCRProcessingResult, PageOCRResult, TextBlock, BoundingBox
 from PIL import Image
@@ -22,15 +23,15 @@ class OCRAgent(BaseAgent):
         start_time = time.time()
         
         pages_results = []
+        documents = ExitStack()
         
         try:
-            from app.core.pdf_extractor import PDFExtractor
+            from app.core.pdf_document import open_document
+            from app.core.pdf_workers import pdf_workers
             
-            # Use PyMuPDF to get total page count if possible
-            import fitz
-            doc = fitz.open(file_path)
-            total_pages = len(doc)
-            doc.close()
+            # One open document (and one parse per extraction tier) for every page
+            session = documents.enter_context(open_document(file_path))
+            total_pages = session.page_count
             
             # Helper to load images only if needed
             images = None 
@@ -39,7 +40,7 @@ class OCRAgent(BaseAgent):
                 self.log(f"Processing page {i+1}/{total_pages}")
                 
                 # 1. Try Tiered Digital Extraction
-                extracted_text, method, metrics = PDFExtractor.extract_page_tiered(file_path, i)
+                extracted_text, method, metrics = await pdf_workers.extract_page(session, i)
                 
                 # 2. Heuristic: Is this page scanned or did digital extraction fail?
                 is_scanned = method == "vision_needed" or not extracted_text or len(extracted_text.strip()) < 50
@@ -93,6 +94,8 @@ class OCRAgent(BaseAgent):
         except Exception as e:
             self.log(f"Smart OCR failed: {e}")
             raise e
+        finally:
+            documents.close()
             
         end_time = time.time()
         duration = end_time - start_time
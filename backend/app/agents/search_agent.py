@@ -1,5 +1,5 @@
 import os
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
@@ -11,6 +11,8 @@ from sentence_transformers import CrossEncoder
 import json
 from app.agents.base import BaseAgent
 
+NO_RESULTS_ANSWER = "I couldn't find any relevant news in the database."
+
 class SearchAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="Search Intelligence Agent")
@@ -77,40 +79,38 @@ class SearchAgent(BaseAgent):
         """BaseAgent implementation - same as query for this agent."""
         return await self.query(input_data)
 
-    async def query(self, user_query: str, use_web: bool = False) -> Dict[str, Any]:
-        """Ask a question with Multilingual Retrieval & Rerank."""
-        context_text = ""
-        sources = []
-        
+    async def _retrieve(self, user_query: str, use_web: bool = False):
+        """Build the answer context. Returns (context_text, sources); context_text is None if nothing was found."""
         if use_web:
             print(f"--- RAG: Performing LIVE WEB SEARCH ---")
             web_context = await self._web_search(user_query)
-            context_text = web_context
-            sources = [{"headline": "Live Web Search", "snippet": "Direct info from internet search."}]
-        else:
-            # 1. Broad Retrieval (Multilingual)
-            print(f"--- RAG: Broad Multilingual Retrieval ---")
-            initial_results = self.vector_store.similarity_search(user_query, k=20)
-            
-            if not initial_results:
-                return {"answer": "I couldn't find any relevant news in the database.", "sources": []}
+            return web_context, [{"headline": "Live Web Search", "snippet": "Direct info from internet search."}]
 
-            # 2. Multilingual Reranking
-            print(f"--- RAG: Multilingual Re-ranking ---")
-            pairs = [[user_query, doc.page_content] for doc in initial_results]
-            scores = self.reranker.predict(pairs)
-            
-            scored_docs = sorted(zip(scores, initial_results), key=lambda x: x[0], reverse=True)
-            best_results = [doc for score, doc in scored_docs[:5]]
-            
-            context_text = "\n\n---\n\n".join([doc.page_content for doc in best_results])
-            sources = [
-                {
-                    "headline": doc.metadata["headline"],
-                    "snippet": doc.page_content[:200] + "..."
-                } for doc in best_results
-            ]
+        # 1. Broad Retrieval (Multilingual)
+        print(f"--- RAG: Broad Multilingual Retrieval ---")
+        initial_results = self.vector_store.similarity_search(user_query, k=20)
+        
+        if not initial_results:
+            return None, []
+
+        # 2. Multilingual Reranking
+        print(f"--- RAG: Multilingual Re-ranking ---")
+        pairs = [[user_query, doc.page_content] for doc in initial_results]
+        scores = self.reranker.predict(pairs)
         
+        scored_docs = sorted(zip(scores, initial_results), key=lambda x: x[0], reverse=True)
+        best_results = [doc for score, doc in scored_docs[:5]]
+        
+        context_text = "\n\n---\n\n".join([doc.page_content for doc in best_results])
+        sources = [
+            {
+                "headline": doc.metadata["headline"],
+                "snippet": doc.page_content[:200] + "..."
+            } for doc in best_results
+        ]
+        return context_text, sources
+
+    def _answer_messages(self, user_query: str, context_text: str) -> List[Dict[str, str]]:
         # 3. Generate Answer (Supports Telugu natively)
         system_msg = "You are a professional News Intel Analyst. You are an expert in regional Indian languages, particularly Telugu. You MUST respond in the same language as the user's question."
         prompt = f"""
@@ -127,13 +127,21 @@ class SearchAgent(BaseAgent):
         
         USER QUESTION: {user_query}
         """
+        return [
+            {"role": "system", "content": system_msg},
+            {"role": "user", "content": prompt}
+        ]
+
+    async def query(self, user_query: str, use_web: bool = False) -> Dict[str, Any]:
+        """Ask a question with Multilingual Retrieval & Rerank."""
+        context_text, sources = await self._retrieve(user_query, use_web)
+        if context_text is None:
+            return {"answer": NO_RESULTS_ANSWER, "sources": []}
         
         answer = await self.call_llm(
-            messages=[
-                {"role": "system", "content": system_msg},
-                {"role": "user", "content": prompt}
-            ],
-            model=settings.GROQ_MODEL
+            messages=self._answer_messages(user_query, context_text),
+            model=settings.GROQ_MODEL,
+            hedge=settings.LLM_HEDGE_SEARCH
         )
         
         return {
@@ -141,5 +149,20 @@ class SearchAgent(BaseAgent):
             "sources": sources
         }
 
+    async def stream_query(self, user_query: str, use_web: bool = False) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of `query`. Yields {"type": "token", "text": ...}
+        events as the answer is generated, then {"type": "done", "sources": [...]}.
+        """
+        context_text, sources = await self._retrieve(user_query, use_web)
+        if context_text is None:
+            yield {"type": "token", "text": NO_RESULTS_ANSWER}
+            yield {"type": "done", "sources": []}
+            return
+
+        async for token in self.stream_llm(self._answer_messages(user_query, context_text), model=settings.GROQ_MODEL):
+            yield {"type": "token", "text": token}
+        yield {"type": "done", "sources": sources}
+
 # Global Instance
 search_agent = SearchAgent()
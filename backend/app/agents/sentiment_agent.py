@@ -1,27 +1,85 @@
 import os
-from typing import List
+from typing import Any, List, Optional, Tuple
 from app.agents.base import BaseAgent
 from app.schemas.layout import Article
 from app.core.config import settings
+from app.core.analysis_memo import analysis_memo
+from app.core.llm import track_served_routes
+from app.core import sentiment_lexicon
 from groq import Groq
 import json
 
+SENTIMENT_LABELS = ["Positive", "Negative", "Neutral"]
+
+
+def _normalize_sentiment(label: Any, confidence: Any) -> Optional[Tuple[str, float]]:
+    """Validate a model-reported (label, confidence) pair. None if the label is unusable."""
+    if not isinstance(label, str):
+        return None
+    matched = next((l for l in SENTIMENT_LABELS if l.lower() == label.strip().lower()), None)
+    if matched is None:
+        return None
+    try:
+        confidence = min(1.0, max(0.0, float(confidence)))
+    except (TypeError, ValueError):
+        confidence = 0.5
+    return matched, confidence
+
+
 class SentimentAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="Sentiment Analysis Agent")
 
     async def run(self, articles: List[Article]) -> List[Article]:
         self.log(f"Analyzing sentiment for {len(articles)} articles")
-        
-        for article in articles:
-            try:
-                await self._analyze_llm(article)
-            except Exception as e:
-                self.log(f"LLM analysis failed for article '{article.headline[:30]}...': {e}. Falling back to heuristic.")
-                self._analyze_heuristic(article)
-                
+
+        memo = await analysis_memo.lookup(articles)
+        unseen = []
+        for i, article in enumerate(articles):
+            cached = _normalize_sentiment(memo.get(i, {}).get("sentiment_label"), memo.get(i, {}).get("sentiment_confidence"))
+            if cached:
+                article.sentiment_label, article.sentiment_confidence = cached
+            else:
+                unseen.append(article)
+        if len(unseen) < len(articles):
+            self.log(f"Analysis memo supplied sentiment for {len(articles) - len(unseen)}/{len(articles)} articles")
+
+        unseen = self._settle_with_lexicon(unseen)
+
+        with track_served_routes() as routes:
+            answered = await self.map_concurrent(unseen, self.analyze)
+        # Only model answers are memoized, never the keyword heuristic
+        await analysis_memo.store(
+            [article for article, ok in zip(unseen, answered) if ok],
+            ["sentiment_label", "sentiment_confidence"],
+            routes
+        )
         return articles
 
+    def _settle_with_lexicon(self, articles: List[Article]) -> List[Article]:
+        """Lexicon pre-score: clear-cut articles get their sentiment here. Returns those that still need the LLM."""
+        pending = []
+        scores = sentiment_lexicon.score_many((article.headline, article.body) for article in articles)
+        for article, lexicon_score in zip(articles, scores):
+            if lexicon_score.hits >= settings.SENTIMENT_LEXICON_MIN_HITS and lexicon_score.confidence >= settings.SENTIMENT_LEXICON_SKIP_CONFIDENCE:
+                article.sentiment_label = lexicon_score.label
+                article.sentiment_confidence = lexicon_score.confidence
+            else:
+                pending.append(article)
+        if len(pending) < len(articles):
+            self.log(f"Lexicon settled sentiment for {len(articles) - len(pending)}/{len(articles)} articles without the LLM")
+        return pending
+
+    async def analyze(self, article: Article) -> bool:
+        """LLM sentiment for one article, falling back to the keyword heuristic (returns False)."""
+        try:
+            await self._analyze_llm(article)
+            return True
+        except Exception as e:
+            self.log(f"LLM analysis failed for article '{article.headline[:30]}...': {e}. Falling back to heuristic.")
+            self._analyze_heuristic(article)
+            return False
+
     async def _analyze_llm(self, article: Article):
         prompt = f"""
         Analyze the sentiment of the following news article. 
@@ -50,25 +108,6 @@ class SentimentAgent(BaseAgent):
         article.sentiment_confidence = result.get("confidence", 0.5)
 
     def _analyze_heuristic(self, article: Article):
-        positive_words = ["growth", "success", "victory", "profit", "gain", "improve", "record", "happy", "win"]
-        negative_words = ["loss", "fail", "defeat", "crash", "crisis", "accident", "death", "disaster", "warning"]
-        
-        text = (article.headline + " " + article.body).lower()
-        
-        pos_score = sum(1 for w in positive_words if w in text)
-        neg_score = sum(1 for w in negative_words if w in text)
-        
-        total = pos_score + neg_score
-        
-        if total == 0:
-            article.sentiment_label = "Neutral"
-            article.sentiment_confidence = 0.5
-        elif pos_score > neg_score:
-            article.sentiment_label = "Positive"
-            article.sentiment_confidence = 0.5 + (0.5 * (pos_score / total))
-        elif neg_score > pos_score:
-            article.sentiment_label = "Negative"
-            article.sentiment_confidence = 0.5 + (0.5 * (neg_score / total))
-        else:
-            article.sentiment_label = "Neutral"
-            article.sentiment_confidence = 0.6
+        lexicon_score = sentiment_lexicon.score(article.headline, article.body)
+        article.sentiment_label = lexicon_score.label
+        article.sentiment_confidence = lexicon_score.confidence
@@ -1,4 +1,4 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import base64
 import io
 import json
@@ -8,6 +8,14 @@ from app.schemas.layout import Article, LayoutSegment, SegmentType
 from app.core.config import settings
 from groq import Groq
 
+class PageExtractionError(Exception):
+    """A page did not extract cleanly. Carries whatever was recovered; never cached."""
+
+    def __init__(self, message: str, articles: Optional[List[Article]] = None):
+        super().__init__(message)
+        self.articles = articles or []
+
+
 class VisionAgent(BaseAgent):
     def __init__(self):
         super().__init__(name="Vision Extraction Agent")
@@ -24,28 +32,28 @@ class VisionAgent(BaseAgent):
         self.log(f"Starting Parallel Hybrid Vision Extraction for: {file_path}")
         
         try:
-            from app.core.pdf_extractor import PDFExtractor
-            import fitz
+            from app.core.pdf_document import open_document
             import asyncio
             
-            # Use PyMuPDF to get total page count
-            doc = fitz.open(file_path)
-            total_pages = len(doc)
-            doc.close()
-            
-            self.log(f"PDF has {total_pages} pages. Analyzing strategy...")
-            
-            all_articles = []
-            
-            # Create tasks for all pages to run in parallel
-            # We process ALL pages indiscriminately with the same logic:
-            # Try Digital -> If corrupt/bad -> Fallback to Vision
-            self.log(f"Processing {total_pages} pages parallelly...")
-            tasks = []
-            for i in range(total_pages):
-                tasks.append(self._process_single_page(file_path, i, total_pages))
-            
-            results = await asyncio.gather(*tasks)
+            # One open document (and one parse per extraction tier) shared by all page tasks
+            with open_document(file_path) as session:
+                total_pages = session.page_count
+                # Hash once up front; page results are cached under it
+                await asyncio.to_thread(lambda: session.sha256)
+                
+                self.log(f"PDF has {total_pages} pages. Analyzing strategy...")
+                
+                all_articles = []
+                
+                # Create tasks for all pages to run in parallel
+                # We process ALL pages indiscriminately with the same logic:
+                # Try Digital -> If corrupt/bad -> Fallback to Vision
+                self.log(f"Processing {total_pages} pages parallelly...")
+                tasks = []
+                for i in range(total_pages):
+                    tasks.append(self._process_single_page(session, i, total_pages))
+                
+                results = await asyncio.gather(*tasks)
             
             # Combine results
             for page_articles in results:
@@ -58,74 +66,283 @@ class VisionAgent(BaseAgent):
             self.log(f"Vision Extraction failed: {e}")
             raise RuntimeError(f"Failed to process PDF: {e}")
 
-    async def _process_single_page(self, file_path: str, page_index: int, total_pages: int) -> List[Article]:
-        """Process a single page: Digital Check -> (Optional Vision)"""
-        from app.core.pdf_extractor import PDFExtractor
+    async def _process_single_page(self, session, page_index: int, total_pages: int) -> List[Article]:
+        """
+        Process a single page, reusing the articles of an earlier successful run
+        on the same PDF. Triage first drops pages with no government news.
+        """
+        import asyncio
+        from app.core.llm import track_served_routes
+        from app.core.page_cache import page_cache
+        from app.core.page_triage import triage_page
+        from app.core.telemetry import record_page
         page_num = page_index + 1
+
+        cached = await page_cache.get_articles(session.sha256, page_index)
+        if cached is not None:
+            self.log(f"Page {page_num}: Reusing {len(cached)} cached articles")
+            record_page(page_index, source="cache", articles=len(cached))
+            return cached
+
+        decision = "digital"
+        if settings.PAGE_TRIAGE_ENABLED:
+            triage = await asyncio.to_thread(triage_page, session, page_index)
+            decision = triage.decision
+            self.log(f"Page {page_num}: Triage -> {triage.decision} ({triage.reason})")
+            record_page(page_index, triage=triage.decision, triage_reason=triage.reason, triage_signals=triage.signals)
+            if decision == "skip":
+                return []
+
+        try:
+            with track_served_routes() as routes:
+                articles = await self._extract_page(session, page_index, vision_only=decision == "vision")
+        except PageExtractionError as e:
+            self.log(f"Page {page_num}: Extraction incomplete ({e}). Not caching.")
+            record_page(page_index, source="partial", articles=len(e.articles), error=str(e))
+            return e.articles
+        except Exception as e:
+            self.log(f"Page {page_num}: Unexpected error: {e}")
+            record_page(page_index, source="failed", articles=0, error=str(e))
+            return []
+
+        record_page(page_index, source="extracted", articles=len(articles))
+        if routes <= page_cache.primary_routes():
+            await page_cache.set_articles(session.sha256, page_index, articles)
+        else:
+            self.log(f"Page {page_num}: Answered by a fallback route ({sorted(routes)}). Not caching.")
+        return articles
+
+    async def _extract_page(self, session, page_index: int, vision_only: bool = False) -> List[Article]:
+        """Digital Check -> (Optional Vision). Raises when the page must not be cached."""
+        from app.core.pdf_workers import pdf_workers
+        page_num = page_index + 1
+
+        if vision_only:
+            return await self._extract_page_vision(session, page_index)
+
+        # 1. Digital Extraction
+        extracted_text, method, metrics = await pdf_workers.extract_page(session, page_index)
+        
+        # 2. Decide strategy
+        use_digital = False
+        if method != "vision_needed" and extracted_text:
+            ratio = metrics["attempts"][-1]["ratio"]
+            if len(extracted_text) > 100 and ratio <= 0.2:
+                self.log(f"Page {page_num}: Valid digital text ({len(extracted_text)} chars, ratio: {ratio:.2f}). Using LLM.")
+                use_digital = True
+            else:
+                self.log(f"Page {page_num}: Text corrupt/sparse (ratio: {ratio:.2f}). Fallback to Vision.")
+
+        # 3. Execute Digital, one request per article region when the layout allows it
+        if use_digital:
+            try:
+                regions = []
+                if settings.VISION_SEGMENTATION_ENABLED and method == "pymupdf":
+                    regions = await self._segment_page(session, page_index)
+                if len(regions) > 1:
+                    return await self._extract_from_regions(regions, page_num)
+                return await self._extract_from_text(extracted_text, page_num)
+            except PageExtractionError:
+                raise
+            except Exception as e:
+                self.log(f"Page {page_num}: LLM text extraction failed: {e}")
         
+        # 4. Execute Vision Fallback
+        return await self._extract_page_vision(session, page_index)
+
+    async def _segment_page(self, session, page_index: int) -> list:
+        import asyncio
+        from app.core.page_segmenter import segment_page
+
         try:
-            # 1. Digital Extraction
-            extracted_text, method, metrics = PDFExtractor.extract_page_tiered(file_path, page_index)
-            
-            # 2. Decide strategy
-            use_digital = False
-            if method != "vision_needed" and extracted_text:
-                ratio = metrics["attempts"][-1]["ratio"]
-                if len(extracted_text) > 100 and ratio <= 0.2:
-                    self.log(f"Page {page_num}: Valid digital text ({len(extracted_text)} chars, ratio: {ratio:.2f}). Using LLM.")
-                    use_digital = True
-                else:
-                    self.log(f"Page {page_num}: Text corrupt/sparse (ratio: {ratio:.2f}). Fallback to Vision.")
-
-            # 3. Execute Digital
-            if use_digital:
+            return await asyncio.to_thread(lambda: segment_page(session.page_layout(page_index)))
+        except Exception as e:
+            self.log(f"Page {page_index + 1}: Segmentation failed ({e}). Using whole-page text.")
+            return []
+
+    async def _extract_page_vision(self, session, page_index: int) -> List[Article]:
+        """
+        Climb VISION_LADDER from the cheapest rung: re-render finer only while
+        the result is empty, unparseable or low confidence (short bodies).
+        Every rung taken is recorded in the page metrics as `vision_rungs`,
+        including rungs skipped because they would render at the same size as
+        the rung below (the page is already at its dimension cap).
+        """
+        import asyncio
+        from app.core.telemetry import record_page
+        page_num = page_index + 1
+        ladder = settings.VISION_LADDER or [(1.0, settings.VISION_JPEG_QUALITY, settings.VISION_MAX_DIMENSION)]
+        tiles = await self._plan_tiles(session, page_index) if settings.VISION_TILING_ENABLED else []
+
+        rungs = []
+        best: Optional[List[Article]] = None
+        best_error: Optional[PageExtractionError] = None
+        previous_size = None
+        try:
+            for step, (scale, quality, max_dimension) in enumerate(ladder):
+                rung = {"scale": scale, "quality": quality}
+                rungs.append(rung)
+                size = await asyncio.to_thread(self._rung_render_size, session, page_index, tiles, scale, max_dimension)
+                if size == previous_size:
+                    rung["outcome"] = "skipped"
+                    self.log(f"Page {page_num}: Rung {step + 1}/{len(ladder)} renders at the same size as rung {step}. Skipping.")
+                    continue
+                previous_size = size
                 try:
-                    return await self._extract_from_text(extracted_text, page_num)
+                    articles = await self._extract_vision_rung(session, page_index, tiles, scale, quality, max_dimension, rung)
+                    error = None
+                    rung["outcome"] = self._rung_outcome(articles)
+                except PageExtractionError as e:
+                    articles, error = e.articles, e
+                    rung["outcome"] = "partial" if e.articles else "unparseable"
                 except Exception as e:
-                    self.log(f"Page {page_num}: LLM text extraction failed: {e}")
-                    use_digital = False 
-            
-            # 4. Execute Vision Fallback
-            from pdf2image import convert_from_path
-            
-            poppler_path = None
-            local_poppler = os.path.join(os.getcwd(), "deps", "poppler", "poppler-24.02.0", "Library", "bin")
-            if os.path.exists(local_poppler):
-                poppler_path = local_poppler
-            
+                    # Provider or render failure: a finer image won't help, stop climbing
+                    rung.update(outcome="failed", articles=0, error=str(e))
+                    if not best:
+                        raise
+                    self.log(f"Page {page_num}: Rung {step + 1}/{len(ladder)} failed ({e}). Keeping {len(best)} articles from a lower rung.")
+                    raise PageExtractionError(f"Vision rung {step + 1} failed: {e}", articles=best)
+                rung["articles"] = len(articles)
 
-            # Convert ONLY the current page to image
-            # Lower DPI to 150 to avoid hitting API payload limits (Groq limit ~33MP)
-            images = convert_from_path(
-                file_path, 
-                first_page=page_num, 
-                last_page=page_num, 
-                poppler_path=poppler_path,
-                fmt="jpeg",
-                dpi=150
-            )
-            
-            if not images:
-                return []
-            
-            # Resize logic to ensure we stay well under limits
-            image = images[0]
-            max_dimension = 2000
-            if max(image.size) > max_dimension:
-                scale = max_dimension / max(image.size)
-                new_size = (int(image.size[0] * scale), int(image.size[1] * scale))
-                image = image.resize(new_size)
-                
-            buffered = io.BytesIO()
-            image.save(buffered, format="JPEG")
-            img_str = base64.b64encode(buffered.getvalue()).decode()
-            
-            return await self._extract_from_image(img_str, page_num)
+                if best is None or self._body_chars(articles) > self._body_chars(best):
+                    best, best_error = articles, error
+                if rung["outcome"] == "ok":
+                    return articles
+                if step + 1 < len(ladder):
+                    self.log(f"Page {page_num}: {rung['outcome']} result at rung {step + 1}/{len(ladder)} (x{scale}, q{quality}). Escalating.")
+        finally:
+            record_page(page_index, vision_rungs=rungs)
+
+        # Top of the ladder: keep the most text any rung produced
+        if best_error is not None:
+            raise PageExtractionError(str(best_error), articles=best)
+        return best
 
+    @staticmethod
+    def _body_chars(articles: List[Article]) -> int:
+        return sum(len(article.body) for article in articles)
 
+    @staticmethod
+    def _rung_outcome(articles: List[Article]) -> str:
+        if not articles:
+            return "empty"
+        bodies = sorted(len(article.body) for article in articles)
+        if bodies[len(bodies) // 2] < settings.VISION_LADDER_MIN_BODY_CHARS:
+            return "short"
+        return "ok"
+
+    @staticmethod
+    def _rung_render_size(session, page_index: int, tiles: list, scale: float, max_dimension: int) -> tuple:
+        """Pixel sizes a rung renders the page (or each tile) at."""
+        from app.core.vision_tiles import render_zoom
+        if len(tiles) > 1:
+            sizes = []
+            for tile in tiles:
+                zoom = render_zoom(tile, scale, max_dimension)
+                x0, y0, x1, y1 = tile.rect
+                sizes.append((round((x1 - x0) * zoom), round((y1 - y0) * zoom)))
+            return tuple(sizes)
+        width, height = session.page_size(page_index)
+        zoom = min(max(1, round(settings.VISION_RENDER_DPI * scale)) / 72.0, max_dimension / max(width, height))
+        return round(width * zoom), round(height * zoom)
+
+    async def _extract_vision_rung(
+        self, session, page_index: int, tiles: list, scale: float, quality: int, max_dimension: int, rung: dict
+    ) -> List[Article]:
+        """One vision pass at a ladder rung: the region tiles when the page has several, else the full page."""
+        page_num = page_index + 1
+        if len(tiles) > 1:
+            encoded = await self._render_page_tiles(session, page_index, tiles, scale, quality, max_dimension)
+            if encoded:
+                rung.update(tiles=len(encoded), bytes=sum(len(tile) for tile in encoded))
+                self.log(f"Page {page_num}: Sending {len(encoded)} region tiles ({rung['bytes'] // 1024} KB)")
+                requests = [self._extract_from_image(base64.b64encode(tile).decode(), page_num) for tile in encoded]
+                return await self._extract_parts(requests, page_num)
+
+        dpi = max(1, round(settings.VISION_RENDER_DPI * scale))
+        jpeg_bytes = await self._render_page_jpeg(session, page_index, dpi, max_dimension, quality)
+        if not jpeg_bytes:
+            raise RuntimeError("Page render produced no image")
+        rung.update(dpi=dpi, max_dimension=max_dimension, bytes=len(jpeg_bytes))
+        img_str = base64.b64encode(jpeg_bytes).decode()
+
+        return await self._extract_from_image(img_str, page_num)
+
+    async def _plan_tiles(self, session, page_index: int) -> list:
+        """Region tiles for the page (app/core/vision_tiles.py); [] to use the full page."""
+        import asyncio
+        from app.core.telemetry import record_page
+        from app.core.vision_tiles import plan_tiles
+
+        try:
+            tiles = await asyncio.to_thread(plan_tiles, session, page_index)
         except Exception as e:
-            self.log(f"Page {page_num}: Unexpected error: {e}")
+            self.log(f"Page {page_index + 1}: Tiling failed ({e}). Sending the full page.")
+            return []
+        if len(tiles) <= 1:
             return []
+        record_page(page_index, vision_tiles=len(tiles))
+        return tiles
+
+    async def _render_page_tiles(self, session, page_index: int, tiles: list, scale: float, quality: int, max_dimension: int) -> List[bytes]:
+        """JPEG tiles at a ladder rung; [] to fall back to the full page."""
+        import asyncio
+        from app.core.vision_tiles import encode_tile
+
+        try:
+            return list(await asyncio.gather(*(
+                asyncio.to_thread(encode_tile, session, page_index, tile, scale, quality, max_dimension) for tile in tiles
+            )))
+        except Exception as e:
+            self.log(f"Page {page_index + 1}: Tile encoding failed ({e}). Sending the full page.")
+            return []
+
+    async def _render_page_jpeg(self, session, page_index: int, dpi: int, max_dimension: int, quality: int) -> Optional[bytes]:
+        """
+        Render straight to the vision pixel budget from the open document, one
+        JPEG encode in memory. pdf2image (pdftoppm subprocess) stays as fallback.
+        """
+        import asyncio
+        try:
+            return await asyncio.to_thread(session.render_page_jpeg, page_index, dpi, max_dimension, quality)
+        except Exception as e:
+            self.log(f"Page {page_index + 1}: PyMuPDF render failed ({e}). Falling back to pdf2image.")
+            return await asyncio.to_thread(
+                self._render_page_pdf2image, session.file_path, page_index + 1, dpi, max_dimension, quality
+            )
+
+    def _render_page_pdf2image(self, file_path: str, page_num: int, dpi: int, max_dimension: int, quality: int) -> Optional[bytes]:
+        from pdf2image import convert_from_path
+        
+        poppler_path = None
+        local_poppler = os.path.join(os.getcwd(), "deps", "poppler", "poppler-24.02.0", "Library", "bin")
+        if os.path.exists(local_poppler):
+            poppler_path = local_poppler
+
+        # Convert ONLY the current page to image
+        # Rung DPI (150 at scale 1.0) keeps the image under API payload limits (Groq limit ~33MP)
+        images = convert_from_path(
+            file_path, 
+            first_page=page_num, 
+            last_page=page_num, 
+            poppler_path=poppler_path,
+            fmt="jpeg",
+            dpi=dpi
+        )
+        
+        if not images:
+            return None
+        
+        # Resize logic to ensure we stay well under limits
+        image = images[0]
+        if max(image.size) > max_dimension:
+            scale = max_dimension / max(image.size)
+            new_size = (int(image.size[0] * scale), int(image.size[1] * scale))
+            image = image.resize(new_size)
+            
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=quality)
+        return buffered.getvalue()
 
 
 
@@ -133,11 +350,101 @@ class VisionAgent(BaseAgent):
 
 
     async def _extract_from_text(self, text: str, page_num: int) -> List[Article]:
-        """Use LLM to extract articles from digital text."""
-        # Truncate if too long to avoid token limits
-        if len(text) > 8000:
-            text = text[:8000]
-            
+        """
+        Use LLM to extract articles from digital text.
+        Long pages are split into overlapping token-bounded chunks that are
+        extracted in parallel; articles cut by a chunk boundary are merged back.
+        """
+        from app.core.chunking import chunk_text
+
+        chunks = chunk_text(text, settings.VISION_CHUNK_MAX_TOKENS, settings.VISION_CHUNK_OVERLAP_TOKENS)
+        if len(chunks) <= 1:
+            return await self._extract_from_text_chunk(text, page_num)
+
+        self.log(f"Page {page_num}: Splitting {len(text)} chars into {len(chunks)} chunks for parallel extraction")
+        return await self._extract_parts(self._text_requests(chunks, page_num), page_num)
+
+    async def _extract_from_regions(self, regions, page_num: int) -> List[Article]:
+        """
+        One extraction request per article region (app/core/page_segmenter.py),
+        all in parallel. Oversized regions are chunked like whole pages.
+        """
+        from app.core.chunking import chunk_text
+
+        parts = [
+            chunk
+            for region in regions
+            for chunk in chunk_text(region.text, settings.VISION_CHUNK_MAX_TOKENS, settings.VISION_CHUNK_OVERLAP_TOKENS)
+        ]
+        self.log(f"Page {page_num}: Segmented into {len(regions)} article regions ({len(parts)} requests)")
+        return await self._extract_parts(self._text_requests(parts, page_num), page_num)
+
+    def _text_requests(self, parts: List[str], page_num: int) -> list:
+        return [self._extract_from_text_chunk(part, page_num, chunk_index=i + 1) for i, part in enumerate(parts)]
+
+    async def _extract_parts(self, requests: list, page_num: int) -> List[Article]:
+        """
+        Await the extraction requests for the parts of a page (text chunks,
+        regions or image tiles) in parallel and merge the results. Failed parts
+        raise PageExtractionError carrying the articles that did succeed.
+        """
+        import asyncio
+
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        chunk_articles = []
+        failures = []
+        for i, result in enumerate(results):
+            if isinstance(result, Exception):
+                self.log(f"Page {page_num}: Part {i + 1}/{len(requests)} failed: {result}")
+                failures.append(result)
+                continue
+            chunk_articles.append(result)
+        if not chunk_articles:
+            if all(isinstance(f, PageExtractionError) for f in failures):
+                raise PageExtractionError(f"All {len(requests)} parts returned unparseable output")
+            raise RuntimeError(f"All {len(requests)} parts failed")
+
+        merged = self._merge_chunk_articles(chunk_articles)
+        self.log(f"Page {page_num}: Merged {sum(len(a) for a in chunk_articles)} part articles into {len(merged)}")
+        if failures:
+            raise PageExtractionError(f"{len(failures)}/{len(requests)} parts failed", articles=merged)
+        return merged
+
+    @staticmethod
+    def _merge_chunk_articles(chunk_articles: List[List[Article]]) -> List[Article]:
+        """
+        Dedupe articles seen in more than one chunk (overlap) and stitch the
+        halves of articles split at a boundary. Chunks are in page order.
+        Articles are only combined when their headlines match and their bodies
+        actually overlap; empty headlines never match.
+        """
+        from difflib import SequenceMatcher
+        from app.core.chunking import merge_overlapping_text, normalize_for_match
+
+        merged: List[Article] = []
+        keys: List[str] = []
+        for articles in chunk_articles:
+            for article in articles:
+                key = normalize_for_match(article.headline)
+                stitched = None
+                for idx, existing_key in enumerate(keys):
+                    if not key or not existing_key:
+                        continue
+                    if existing_key != key and SequenceMatcher(None, existing_key, key).ratio() < 0.9:
+                        continue
+                    body = merge_overlapping_text(merged[idx].body, article.body)
+                    if body is not None:
+                        stitched = idx
+                        merged[idx] = merged[idx].model_copy(update={"body": body})
+                        break
+                if stitched is None:
+                    merged.append(article)
+                    keys.append(key)
+        return merged
+
+    async def _extract_from_text_chunk(self, text: str, page_num: int, chunk_index: int = 0) -> List[Article]:
+        """Single extraction request for (part of) a page's digital text."""
+        label = f"Page {page_num}" + (f" chunk {chunk_index}" if chunk_index else "")
         prompt = f"""
         Analyze this newspaper page text. Extract ONLY news articles related to the "Andhra Pradesh Government".
         For each article, identify the "Headline" and the "Body" text.
@@ -165,7 +472,7 @@ class VisionAgent(BaseAgent):
         {text}
         """
 
-        self.log(f"Page {page_num}: Digital Text Sample: {text[:200]}")
+        self.log(f"{label}: Digital Text Sample: {text[:200]}")
         
         result_content = await self.call_llm(
             messages=[
@@ -181,9 +488,9 @@ class VisionAgent(BaseAgent):
             json_mode=True
         )
         
-        self.log(f"Page {page_num}: Received result content (len: {len(result_content)})")
+        self.log(f"{label}: Received result content (len: {len(result_content)})")
         if not result_content.strip():
-            self.log(f"Page {page_num}: WARNING - Received empty response from LLM")
+            self.log(f"{label}: WARNING - Received empty response from LLM")
         
         return self._parse_json_result(result_content, page_num)
 
@@ -234,7 +541,7 @@ class VisionAgent(BaseAgent):
                 }
             ],
             json_mode=True,
-            model="meta-llama/llama-4-scout-17b-16e-instruct"
+            model=settings.GROQ_VISION_MODEL
         )
         
         return self._parse_json_result(result_content, page_num)
@@ -264,4 +571,4 @@ class VisionAgent(BaseAgent):
             return articles
         except Exception as e:
             self.log(f"Page {page_num}: Failed to parse JSON from model: {e}. Raw content: {content[:500]}...")
-            return []
+            raise PageExtractionError(f"Unparseable model output: {e}")
@@ -1,5 +1,5 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import upload, ocr, pipeline, export, analytics, search, auth
+from app.api.v1.endpoints import upload, ocr, pipeline, export, analytics, search, auth, llm
 
 
 
@@ -13,6 +13,7 @@ api_router.include_router(export.router, prefix="/export", tags=["export"])
 api_router.include_router(analytics.router, prefix="/analytics", tags=["analytics"])
 api_router.include_router(search.router, prefix="/search", tags=["search"])
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
+api_router.include_router(llm.router, prefix="/llm", tags=["llm"])
 
 
 
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from app.api import deps
+from app.db import models
+
+router = APIRouter()
+
+@router.get("/status")
+async def get_llm_status(
+    current_user: models.User = Depends(deps.get_current_staff_user)
+):
+    """Live view of the LLM layer: adaptive concurrency limits, queue depth, Groq key headroom, circuit states and local classifier hit rate."""
+    from app.core.circuit_breaker import circuit_breakers
+    from app.core.concurrency import groq_limiter, ollama_limiter
+    from app.core.groq_scheduler import groq_scheduler
+    from app.core.llm import groq_latency, llm_cache, llm_service, ollama_latency
+    from app.core.llm_replay import llm_replay
+    from app.agents.department_agent import department_classifier
+    from app.core.analysis_memo import analysis_memo
+    from app.core.page_cache import page_cache
+
+    return {
+        "limiters": [groq_limiter.snapshot(), ollama_limiter.snapshot()],
+        "groq_keys": groq_scheduler.snapshot(),
+        "circuit_breakers": circuit_breakers.snapshot(),
+        "latency": [groq_latency.snapshot(), ollama_latency.snapshot()],
+        "hedged_requests": llm_service.hedged_requests,
+        "cache": llm_cache.stats(),
+        "replay": llm_replay.stats(),
+        "department_classifier": department_classifier.stats(),
+        "analysis_memo": analysis_memo.stats(),
+        "page_cache": page_cache.stats()
+    }
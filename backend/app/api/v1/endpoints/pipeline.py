@@ -3,15 +3,16 @@ from app.api import deps
 from app.db import models as db_models
 from sqlalchemy.orm import Session
 from app.db.session import get_db
-from app.db.models import DBFile, DBArticle
+from app.db.models import DBFile, DBArticle, DBPipelineRun
 from app.schemas.layout import LayoutResult
 from app.graph.workflow import app as pipeline_graph
 from pydantic import BaseModel
 from datetime import datetime
+import json
 import os
 
 from app.core.config import settings
-from groq import Groq
+from app.core import telemetry
 
 router = APIRouter()
 
@@ -27,6 +28,7 @@ class BriefingRequest(BaseModel):
     file_ids: List[str]
 
 from app.core.audit import log_audit
+from app.core.sse import SSE_HEADERS, format_sse
 from fastapi import Request
 
 @router.post("/download-briefing-pdf")
@@ -43,26 +45,13 @@ async def download_briefing_pdf(
         headers={"Content-Disposition": f"attachment; filename={filename}"}
     )
 
-@router.post("/generate-briefing")
-async def generate_briefing(
-    request: BriefingRequest, 
-    req_raw: Request,
-    db: Session = Depends(get_db),
-    current_user: db_models.User = Depends(deps.get_current_staff_user)
-):
-    """Generate a formal executive briefing from selected files."""
-    log_audit(
-        db, 
-        "GENERATE_BRIEFING", 
-        user_id=current_user.id, 
-        details=f"Files: {', '.join(request.file_ids)}",
-        ip_address=req_raw.client.host
-    )
-    if not request.file_ids:
+def _build_briefing_messages(db: Session, file_ids: List[str]):
+    """Fetch the selected files' articles and build the briefing prompt. Returns (messages, articles)."""
+    if not file_ids:
         raise HTTPException(status_code=400, detail="No files selected")
         
     # 1. Fetch all articles for these files
-    articles = db.query(DBArticle).filter(DBArticle.file_id.in_(request.file_ids)).all()
+    articles = db.query(DBArticle).filter(DBArticle.file_id.in_(file_ids)).all()
     
     if not articles:
         raise HTTPException(status_code=404, detail="No data found in selected files")
@@ -81,7 +70,7 @@ async def generate_briefing(
     You are a Senior Strategic Analyst for a Government Department.
     Generate a FORMAL EXECUTIVE BRIEFING based on the following processed news data.
     
-    DATA SOURCE: {len(request.file_ids)} Documents, {len(articles)} Articles.
+    DATA SOURCE: {len(file_ids)} Documents, {len(articles)} Articles.
     
     CONTEXT DATA:
     {context_text}
@@ -98,62 +87,43 @@ async def generate_briefing(
     9. MULTILINGUAL RULE: The source articles may be in Telugu or other regional languages. You MUST accurately reflect the content of these articles. Provide the briefing in English, but incorporate key Telugu terms or headlines where appropriate to maintain source integrity.
     """
 
-    try:
-        from app.core.ollama import ollama_service
-        from groq import Groq, RateLimitError
-        
-        briefing_text = None
-        keys = settings.GROQ_API_KEYS
-        
-        # Priority 1: Groq with Rotation
-        if settings.LLM_PROVIDER == "groq" and keys:
-            for i, key in enumerate(keys):
-                try:
-                    client = Groq(api_key=key)
-                    completion = client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": "You are a professional government analyst."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        model=settings.GROQ_MODEL,
-                        temperature=0.3
-                    )
-                    briefing_text = completion.choices[0].message.content
-                    break # Success!
-                except RateLimitError:
-                    print(f"Briefing: Key {i+1} rate limited. Trying next...")
-                    continue
-                except Exception as e:
-                    print(f"Briefing: Groq error with key {i+1}: {e}")
-                    continue
+    messages = [
+        {"role": "system", "content": "You are a professional government analyst."},
+        {"role": "user", "content": prompt}
+    ]
+    return messages, articles
 
-        # Priority 2: Try Ollama (either as preference or fallback)
-        if not briefing_text:
-            try:
-                briefing_text = ollama_service.chat([
-                    {"role": "system", "content": "You are a professional government analyst."},
-                    {"role": "user", "content": prompt}
-                ])
-            except Exception as e:
-                print(f"Briefing: Ollama failed: {e}")
+@router.post("/generate-briefing")
+async def generate_briefing(
+    request: BriefingRequest, 
+    req_raw: Request,
+    db: Session = Depends(get_db),
+    current_user: db_models.User = Depends(deps.get_current_staff_user)
+):
+    """Generate a formal executive briefing from selected files."""
+    log_audit(
+        db, 
+        "GENERATE_BRIEFING", 
+        user_id=current_user.id, 
+        details=f"Files: {', '.join(request.file_ids)}",
+        ip_address=req_raw.client.host
+    )
+    messages, _ = _build_briefing_messages(db, request.file_ids)
 
-        # Last Resort: If Ollama was preferred but failed, try Groq rotation
-        if not briefing_text and keys:
-            for key in keys:
-                try:
-                    client = Groq(api_key=key)
-                    completion = client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": "You are a professional government analyst."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        model=settings.GROQ_MODEL,
-                        temperature=0.3
-                    )
-                    briefing_text = completion.choices[0].message.content
-                    break
-                except:
-                    continue
+    try:
+        from app.core.llm import llm_service
+
+        briefing_text = None
+        try:
+            # Groq rotation -> Ollama fallback, shared with the agents' LLM layer
+            briefing_text = await llm_service.chat(
+                messages,
+                model=settings.GROQ_MODEL,
+                temperature=0.3,
+                source="Briefing"
+            )
+        except Exception as e:
+            print(f"Briefing: All providers failed: {e}")
             
         if not briefing_text:
             raise HTTPException(status_code=500, detail="All LLM providers failed to generate briefing")
@@ -162,6 +132,44 @@ async def generate_briefing(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Briefing generation failed: {str(e)}")
 
+@router.post("/generate-briefing/stream")
+async def generate_briefing_stream(
+    request: BriefingRequest, 
+    req_raw: Request,
+    db: Session = Depends(get_db),
+    current_user: db_models.User = Depends(deps.get_current_staff_user)
+):
+    """
+    Server-Sent Events variant of /generate-briefing: `token` events carry the
+    markdown as it is generated, a final `done` event lists the source articles.
+    """
+    log_audit(
+        db, 
+        "GENERATE_BRIEFING", 
+        user_id=current_user.id, 
+        details=f"Files: {', '.join(request.file_ids)} | Stream",
+        ip_address=req_raw.client.host
+    )
+    # Everything that touches the DB happens before streaming starts
+    messages, articles = _build_briefing_messages(db, request.file_ids)
+    sources = [
+        {"id": art.id, "file_id": art.file_id, "headline": art.headline, "department": art.department}
+        for art in articles
+    ]
+
+    async def event_stream():
+        from app.core.llm import llm_service
+
+        try:
+            async for token in llm_service.stream(messages, model=settings.GROQ_MODEL, temperature=0.3, source="Briefing"):
+                yield format_sse("token", {"text": token})
+            yield format_sse("done", {"sources": sources})
+        except Exception as e:
+            print(f"Briefing: Stream failed: {e}")
+            yield format_sse("error", {"detail": f"Briefing generation failed: {str(e)}"})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @router.post("/{file_id}/pipeline", response_model=LayoutResult)
 async def run_pipeline(
     file_id: str, 
@@ -198,9 +206,11 @@ async def run_pipeline(
     }
     
     try:
-        final_state = await pipeline_graph.ainvoke(initial_state)
+        with telemetry.track_run(file_id) as run_telemetry:
+            final_state = await pipeline_graph.ainvoke(initial_state)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Graph Execution Failed: {str(e)}")
+    run_summary = run_telemetry.summary()
         
     if final_state.get("error"):
         raise HTTPException(status_code=500, detail=f"Pipeline Error: {final_state['error']}")
@@ -231,6 +241,14 @@ async def run_pipeline(
                 topic_cluster_id=art.topic_cluster_id
             )
             db.add(db_article)
+
+        db.add(DBPipelineRun(
+            file_id=file_id,
+            started_at=datetime.utcfromtimestamp(run_telemetry.started_at),
+            duration_seconds=run_summary["wall_seconds"],
+            article_count=len(articles),
+            llm_summary=json.dumps(run_summary)
+        ))
         
         db.commit()
         
@@ -256,6 +274,22 @@ async def get_history(
         "article_count": len(f.articles)
     } for f in files]
 
+@router.get("/{file_id}/runs")
+async def get_pipeline_runs(
+    file_id: str,
+    db: Session = Depends(get_db),
+    current_user: db_models.User = Depends(deps.get_current_staff_user)
+):
+    """LLM telemetry summaries (calls, tokens, latency, retries, fallbacks, cache hits) for each run of a file."""
+    runs = db.query(DBPipelineRun).filter(DBPipelineRun.file_id == file_id).order_by(DBPipelineRun.started_at.desc()).all()
+    return [{
+        "id": r.id,
+        "started_at": r.started_at,
+        "duration_seconds": r.duration_seconds,
+        "article_count": r.article_count,
+        "llm_summary": json.loads(r.llm_summary) if r.llm_summary else None
+    } for r in runs]
+
 @router.get("/all-articles")
 async def get_all_articles(
     db: Session = Depends(get_db),
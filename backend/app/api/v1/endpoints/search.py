@@ -19,6 +19,8 @@ from app.core.audit import log_audit
 from fastapi import Request
 from sqlalchemy.orm import Session
 from app.db.session import get_db
+from app.core.sse import SSE_HEADERS, format_sse
+from fastapi.responses import StreamingResponse
 
 @router.post("/query", response_model=SearchResponse)
 async def perform_search(
@@ -39,3 +41,34 @@ async def perform_search(
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/query/stream")
+async def perform_search_stream(
+    request: SearchRequest,
+    req_raw: Request,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(deps.get_current_active_user)
+):
+    """
+    Server-Sent Events variant of /query: `token` events carry answer text as
+    it is generated, a final `done` event carries the sources.
+    """
+    log_audit(
+        db, 
+        "SEARCH_QUERY", 
+        user_id=current_user.id, 
+        details=f"Query: {request.query} | Use Web: {request.use_web} | Stream",
+        ip_address=req_raw.client.host
+    )
+
+    async def event_stream():
+        try:
+            async for event in search_agent.stream_query(request.query, use_web=request.use_web):
+                if event["type"] == "token":
+                    yield format_sse("token", {"text": event["text"]})
+                else:
+                    yield format_sse("done", {"sources": event["sources"]})
+        except Exception as e:
+            yield format_sse("error", {"detail": str(e)})
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,156 @@
+"""
+Cross-edition memo of article analysis results.
+
+The same wire story shows up in several district editions and in reprints.
+Articles are keyed by a hash of their normalized headline + body
+(`PDFExtractor.normalize_text`, whitespace collapsed, case folded), so a copy
+re-flowed into different columns still maps to the same row. Results are only
+served back when they were produced by the current primary provider/model
+and prompt version; answers that came from a fallback provider are not stored.
+
+Department and sentiment are served back to the agents; the cluster id is
+recorded for provenance only, since cluster labels are relative to one run.
+"""
+import asyncio
+import hashlib
+import re
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy.exc import IntegrityError
+from app.core.config import settings
+from app.core.pdf_extractor import PDFExtractor
+from app.schemas.layout import Article
+
+MEMO_FIELDS = ("department", "sentiment_label", "sentiment_confidence", "topic_cluster_id")
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def content_hash(headline: str, body: str) -> str:
+    def normalize(text: str) -> str:
+        return WHITESPACE_RE.sub(' ', PDFExtractor.normalize_text(text or "")).strip().casefold()
+
+    return hashlib.sha256(f"{normalize(headline)}\n{normalize(body)}".encode("utf-8")).hexdigest()
+
+
+def memo_version(route: Optional[Tuple[str, str]] = None) -> str:
+    from app.core.llm import primary_route
+
+    provider, model = route or primary_route()
+    return f"{provider}:{model}:{settings.LLM_PROMPT_VERSION}"
+
+
+class AnalysisMemo:
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.writes = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ANALYSIS_MEMO_ENABLED
+
+    def _lookup(self, hashes: List[str]) -> Dict[str, Dict[str, object]]:
+        from app.db.models import DBAnalysisMemo
+        from app.db.session import SessionLocal
+
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(DBAnalysisMemo)
+                .filter(DBAnalysisMemo.content_hash.in_(hashes), DBAnalysisMemo.version == memo_version())
+                .all()
+            )
+            found = {row.content_hash: {field: getattr(row, field) for field in MEMO_FIELDS} for row in rows}
+            for row in rows:
+                row.hits = (row.hits or 0) + 1
+            db.commit()
+            return found
+        finally:
+            db.close()
+
+    def _store(self, entries: Dict[str, Dict[str, object]]):
+        from app.db.models import DBAnalysisMemo
+        from app.db.session import SessionLocal
+
+        version = memo_version()
+        db = SessionLocal()
+        try:
+            for key, values in entries.items():
+                for attempt in range(2):
+                    row = db.get(DBAnalysisMemo, key)
+                    if row is None:
+                        row = DBAnalysisMemo(content_hash=key, version=version, hits=0)
+                        db.add(row)
+                    elif row.version != version:
+                        # Results from an older model/prompt are dropped wholesale
+                        for field in MEMO_FIELDS:
+                            setattr(row, field, None)
+                        row.version = version
+                    for field, value in values.items():
+                        setattr(row, field, value)
+                    row.updated_at = datetime.utcnow()
+                    try:
+                        db.commit()
+                        break
+                    except IntegrityError:
+                        # Another agent inserted the same hash concurrently; update its row instead
+                        db.rollback()
+        finally:
+            db.close()
+
+    async def lookup(self, articles: List[Article]) -> Dict[int, Dict[str, object]]:
+        """Memoized results by article position. Empty when disabled or the database is unavailable."""
+        if not self.enabled or not articles:
+            return {}
+        hashes = [content_hash(a.headline, a.body) for a in articles]
+        try:
+            found = await asyncio.to_thread(self._lookup, sorted(set(hashes)))
+        except Exception as e:
+            print(f"[Analysis Memo] Lookup failed: {e}")
+            return {}
+        self.lookups += len(articles)
+        results = {i: found[h] for i, h in enumerate(hashes) if h in found}
+        self.hits += len(results)
+        return results
+
+    async def store(self, articles: List[Article], fields: List[str], routes: Optional[Set[Tuple[str, str]]] = None):
+        """
+        Upsert the given fields for each article; other memoized fields are left
+        alone. `routes` are the LLM routes that produced the values (see
+        `llm.track_served_routes`); nothing is stored if any of them is not the
+        primary route, since the memo is only read back under that version.
+        """
+        if not self.enabled or not articles:
+            return
+        if routes:
+            from app.core.llm import primary_route
+
+            fallbacks = routes - {primary_route()}
+            if fallbacks:
+                print(f"[Analysis Memo] Not storing {', '.join(fields)}: answers came from fallback route(s) {sorted(fallbacks)}")
+                return
+        entries: Dict[str, Dict[str, object]] = {}
+        for article in articles:
+            values = {field: getattr(article, field) for field in fields}
+            if all(v is None for v in values.values()):
+                continue
+            entries[content_hash(article.headline, article.body)] = values
+        if not entries:
+            return
+        try:
+            await asyncio.to_thread(self._store, entries)
+            self.writes += len(entries)
+        except Exception as e:
+            print(f"[Analysis Memo] Store failed: {e}")
+
+    def stats(self) -> Dict[str, Optional[float]]:
+        return {
+            "version": memo_version(),
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else None,
+            "writes": self.writes
+        }
+
+
+analysis_memo = AnalysisMemo()
@@ -0,0 +1,144 @@
+"""
+Token-aware chunking of page text for LLM extraction.
+
+Page text is split at paragraph/column breaks (blank lines, form feeds), then
+single lines, then sentences, and packed greedily into chunks under a token
+budget. Consecutive chunks share a tail of `overlap_tokens` so an article that
+straddles a boundary appears whole in at least one chunk, or in two pieces
+that `merge_overlapping_text` can stitch back together.
+
+Token counts use tiktoken when it is installed. Otherwise they are estimated
+per script: Latin text runs ~4 chars/token, while Telugu and other Indic
+scripts run close to one token per character on Llama-family tokenizers.
+"""
+import re
+from difflib import SequenceMatcher
+from typing import List, Optional, Tuple
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # not installed, or encoding files unavailable offline
+    _encoding = None
+
+PARAGRAPH_BREAK_RE = re.compile(r'(?:\n[ \t]*){2,}|\f')
+SENTENCE_END_RE = re.compile(r'(?<=[.!?।])\s+')
+WHITESPACE_RE = re.compile(r'\s+')
+WORD_RE = re.compile(r'\S+')
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    ascii_chars = sum(1 for c in text if c < '\x80')
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+def _split_oversized(unit: str, max_tokens: int) -> List[str]:
+    """Break a unit that is too big on its own: lines, then sentences, then a hard cut."""
+    for pattern in (re.compile(r'\n'), SENTENCE_END_RE):
+        parts = [p for p in pattern.split(unit) if p.strip()]
+        if len(parts) > 1:
+            pieces: List[str] = []
+            for part in parts:
+                if count_tokens(part) > max_tokens:
+                    pieces.extend(_split_oversized(part, max_tokens))
+                else:
+                    pieces.append(part)
+            return pieces
+
+    # No natural break left: cut proportionally by characters
+    pieces = []
+    step = max(1, int(len(unit) * max_tokens / max(count_tokens(unit), 1)))
+    for start in range(0, len(unit), step):
+        pieces.append(unit[start:start + step])
+    return pieces
+
+
+def split_units(text: str, max_tokens: int) -> List[str]:
+    units: List[str] = []
+    for paragraph in PARAGRAPH_BREAK_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph) > max_tokens:
+            units.extend(_split_oversized(paragraph, max_tokens))
+        else:
+            units.append(paragraph)
+    return units
+
+
+def chunk_text(text: str, max_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """Split `text` into chunks of at most ~max_tokens, overlapping by ~overlap_tokens."""
+    if count_tokens(text) <= max_tokens:
+        return [text] if text.strip() else []
+
+    units = split_units(text, max_tokens)
+    sizes = [count_tokens(u) for u in units]
+    chunks: List[str] = []
+    current: List[int] = []
+    current_tokens = 0
+
+    for i, size in enumerate(sizes):
+        if current and current_tokens + size > max_tokens:
+            chunks.append("\n\n".join(units[j] for j in current))
+            # Carry trailing units forward as overlap (never the whole chunk)
+            carried: List[int] = []
+            carried_tokens = 0
+            for j in reversed(current[1:]):
+                if carried_tokens + sizes[j] > overlap_tokens or carried_tokens + sizes[j] + size > max_tokens:
+                    break
+                carried.insert(0, j)
+                carried_tokens += sizes[j]
+            current, current_tokens = carried, carried_tokens
+        current.append(i)
+        current_tokens += size
+
+    if current:
+        chunks.append("\n\n".join(units[j] for j in current))
+    return chunks
+
+
+def normalize_for_match(text: str) -> str:
+    return WHITESPACE_RE.sub(' ', text).strip().lower()
+
+
+def _collapse_whitespace(text: str) -> Tuple[str, List[int]]:
+    """Words joined by single spaces, plus the index in `text` of every kept character."""
+    parts: List[str] = []
+    positions: List[int] = []
+    for match in WORD_RE.finditer(text):
+        if parts:
+            parts.append(' ')
+            positions.append(match.start() - 1)
+        parts.append(match.group())
+        positions.extend(range(match.start(), match.end()))
+    return "".join(parts), positions
+
+
+def merge_overlapping_text(first: str, second: str, min_overlap: int = 40) -> Optional[str]:
+    """
+    Join two extractions of the same article from adjacent chunks. Drops the
+    duplicated span when the end of `first` overlaps the start of `second`,
+    keeping both texts' own line and paragraph breaks. Returns None when
+    neither contains the other and they don't overlap: they are most likely
+    different articles.
+    """
+    a, a_positions = _collapse_whitespace(first)
+    b, b_positions = _collapse_whitespace(second)
+    if not b or b in a:
+        return first
+    if not a or a in b:
+        return second
+
+    window = 1000
+    tail_start = max(0, len(a) - window)
+    matcher = SequenceMatcher(None, a[tail_start:], b[:window], autojunk=False)
+    match = matcher.find_longest_match(0, len(a) - tail_start, 0, min(len(b), window))
+    if match.size < min_overlap:
+        return None
+    first_end = a_positions[tail_start + match.a + match.size - 1] + 1
+    second_end = b_positions[match.b + match.size - 1] + 1
+    return first[:first_end] + second[second_end:]
@@ -0,0 +1,159 @@
+"""
+Circuit breakers for LLM providers and individual Groq keys.
+
+A breaker watches the failure rate of recent calls. Once it crosses the
+threshold the circuit opens and callers skip that provider immediately
+instead of waiting for another connection timeout. After a cool-off the
+breaker goes half-open and lets a few probe requests through; a successful
+probe closes it again, a failed one re-opens it. A probe that ends without a
+verdict on the provider (cancelled, or failed for reasons of its own) hands
+its slot back with `release_probe`.
+"""
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Deque, Dict, Tuple
+from app.core.config import settings
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when every usable provider is behind an open circuit."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        failure_rate_threshold: float,
+        window_seconds: float,
+        min_calls: int,
+        open_seconds: float,
+        half_open_probes: int
+    ):
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._probes_started: Deque[float] = deque()
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._probes_started.clear()
+        return self._state
+
+    def is_open(self) -> bool:
+        return self.state == CircuitState.OPEN
+
+    def allow_request(self) -> bool:
+        """Closed: always. Open: never. Half-open: only up to `half_open_probes` concurrent probes."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.OPEN:
+            return False
+
+        now = time.monotonic()
+        # Probes that never reported back (e.g. cancelled) expire after one open period
+        while self._probes_started and now - self._probes_started[0] > self.open_seconds:
+            self._probes_started.popleft()
+        if len(self._probes_started) >= self.half_open_probes:
+            return False
+        self._probes_started.append(now)
+        return True
+
+    def release_probe(self):
+        """Give back a half-open probe slot without changing state (the call said nothing about the provider)."""
+        if self._state == CircuitState.HALF_OPEN and self._probes_started:
+            self._probes_started.popleft()
+
+    def _trim(self, now: float):
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def failure_rate(self) -> float:
+        self._trim(time.monotonic())
+        if not self._outcomes:
+            return 0.0
+        failures = sum(1 for _, ok in self._outcomes if not ok)
+        return failures / len(self._outcomes)
+
+    def record_success(self):
+        if self.state == CircuitState.HALF_OPEN:
+            self._close()
+            return
+        self._outcomes.append((time.monotonic(), True))
+
+    def record_failure(self):
+        now = time.monotonic()
+        if self.state == CircuitState.HALF_OPEN:
+            self._open(now)
+            return
+        self._outcomes.append((now, False))
+        self._trim(now)
+        if len(self._outcomes) >= self.min_calls and self.failure_rate() >= self.failure_rate_threshold:
+            self._open(now)
+
+    def _open(self, now: float):
+        self._state = CircuitState.OPEN
+        self._opened_at = now
+        self._outcomes.clear()
+        self._probes_started.clear()
+        self.times_opened += 1
+        print(f"[Circuit Breaker] {self.name} OPEN for {self.open_seconds:.0f}s")
+
+    def _close(self):
+        self._state = CircuitState.CLOSED
+        self._outcomes.clear()
+        self._probes_started.clear()
+        print(f"[Circuit Breaker] {self.name} CLOSED (probe succeeded)")
+
+    def snapshot(self) -> Dict[str, Any]:
+        state = self.state
+        return {
+            "name": self.name,
+            "state": state.value,
+            "failure_rate": round(self.failure_rate(), 3),
+            "calls_in_window": len(self._outcomes),
+            "reopens_in_seconds": round(max(0.0, self._opened_at + self.open_seconds - time.monotonic()), 1) if state == CircuitState.OPEN else 0.0,
+            "times_opened": self.times_opened
+        }
+
+
+class CircuitBreakerRegistry:
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, name: str) -> CircuitBreaker:
+        breaker = self._breakers.get(name)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                name,
+                failure_rate_threshold=settings.LLM_BREAKER_FAILURE_RATE,
+                window_seconds=settings.LLM_BREAKER_WINDOW_SECONDS,
+                min_calls=settings.LLM_BREAKER_MIN_CALLS,
+                open_seconds=settings.LLM_BREAKER_OPEN_SECONDS,
+                half_open_probes=settings.LLM_BREAKER_HALF_OPEN_PROBES
+            )
+            self._breakers[name] = breaker
+        return breaker
+
+    def snapshot(self) -> list:
+        return [b.snapshot() for b in self._breakers.values()]
+
+
+circuit_breakers = CircuitBreakerRegistry()
@@ -0,0 +1,94 @@
+"""
+Process-wide adaptive concurrency limits for outbound model calls.
+
+Each provider has its own AIMD limiter: the limit grows additively while
+calls succeed and is cut multiplicatively on 429s and timeouts, so the
+pipeline settles near the highest throughput the provider sustains.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+from app.core.config import settings
+
+
+class AdaptiveLimiter:
+    def __init__(
+        self,
+        name: str,
+        initial: int,
+        min_limit: int,
+        max_limit: int,
+        decrease_factor: float = 0.5,
+        cooldown_seconds: float = 2.0
+    ):
+        self.name = name
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.cooldown_seconds = cooldown_seconds
+
+        self.in_flight = 0
+        self.waiting = 0
+        self.successes = 0
+        self.overloads = 0
+        self._last_decrease = 0.0
+        self._cond = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator["AdaptiveLimiter"]:
+        """Hold one in-flight slot for the duration of a provider request."""
+        async with self._cond:
+            self.waiting += 1
+            try:
+                await self._cond.wait_for(lambda: self.in_flight < int(self.limit))
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+        try:
+            yield self
+        finally:
+            async with self._cond:
+                self.in_flight -= 1
+                self._cond.notify_all()
+
+    def on_success(self):
+        """Additive increase: roughly +1 per full window of successful calls."""
+        self.successes += 1
+        self.limit = min(float(self.max_limit), self.limit + 1.0 / max(self.limit, 1.0))
+
+    def on_overload(self):
+        """Multiplicative decrease, at most once per cooldown so one burst of 429s counts once."""
+        self.overloads += 1
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown_seconds:
+            return
+        self._last_decrease = now
+        self.limit = max(float(self.min_limit), self.limit * self.decrease_factor)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "limit": int(self.limit),
+            "limit_exact": round(self.limit, 2),
+            "in_flight": self.in_flight,
+            "queued": self.waiting,
+            "successes": self.successes,
+            "overloads": self.overloads
+        }
+
+
+groq_limiter = AdaptiveLimiter(
+    "groq",
+    initial=settings.LLM_GROQ_CONCURRENCY_INITIAL,
+    min_limit=settings.LLM_GROQ_CONCURRENCY_MIN,
+    max_limit=settings.LLM_GROQ_CONCURRENCY_MAX
+)
+
+ollama_limiter = AdaptiveLimiter(
+    "ollama",
+    initial=settings.LLM_OLLAMA_CONCURRENCY_INITIAL,
+    min_limit=settings.LLM_OLLAMA_CONCURRENCY_MIN,
+    max_limit=settings.LLM_OLLAMA_CONCURRENCY_MAX
+)
@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import List, Tuple
 import os
 
 class Settings(BaseSettings):
@@ -14,6 +15,7 @@ class Settings(BaseSettings):
     POSTGRES_PORT: str = os.getenv("POSTGRES_PORT", "5432")
     GROQ_API_KEY: str = os.getenv("GROQ_API_KEY", "")
     GROQ_MODEL: str = os.getenv("GROQ_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
+    GROQ_VISION_MODEL: str = os.getenv("GROQ_VISION_MODEL", "meta-llama/llama-4-scout-17b-16e-instruct")
     
     @property
     def GROQ_API_KEYS(self) -> list[str]:
@@ -31,6 +33,133 @@ class Settings(BaseSettings):
     OLLAMA_MODEL: str = os.getenv("OLLAMA_MODEL", "llama3.2")
     LLM_PROVIDER: str = os.getenv("LLM_PROVIDER", "groq") # 'groq' or 'ollama'
 
+    # Shared async LLM client pool (see app/core/llm.py)
+    LLM_HTTP2: bool = True
+    LLM_MAX_CONNECTIONS: int = 100
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_TIMEOUT_SECONDS: float = 120.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+
+    # Groq multi-key scheduler (see app/core/groq_scheduler.py).
+    # Per-key limits are starting points; x-ratelimit-* headers refine them.
+    GROQ_RPM_PER_KEY: int = 30
+    GROQ_TPM_PER_KEY: int = 30000
+    GROQ_EXPECTED_COMPLETION_TOKENS: int = 1024
+    GROQ_QUEUE_MAX_WAIT_SECONDS: float = 60.0
+
+    # Adaptive (AIMD) in-flight limits per provider (see app/core/concurrency.py)
+    LLM_GROQ_CONCURRENCY_INITIAL: int = 8
+    LLM_GROQ_CONCURRENCY_MIN: int = 1
+    LLM_GROQ_CONCURRENCY_MAX: int = 64
+    LLM_OLLAMA_CONCURRENCY_INITIAL: int = 2
+    LLM_OLLAMA_CONCURRENCY_MIN: int = 1
+    LLM_OLLAMA_CONCURRENCY_MAX: int = 8
+
+    # Circuit breakers per provider and per Groq key (see app/core/circuit_breaker.py)
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_WINDOW_SECONDS: float = 60.0
+    LLM_BREAKER_MIN_CALLS: int = 4
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_BREAKER_HALF_OPEN_PROBES: int = 1
+
+    # Request hedging (see app/core/hedging.py). Off for bulk ingestion,
+    # on for interactive search answers.
+    LLM_HEDGE_DEFAULT: bool = False
+    LLM_HEDGE_SEARCH: bool = True
+    LLM_HEDGE_PERCENTILE: float = 0.95
+    LLM_HEDGE_DEFAULT_DELAY_SECONDS: float = 4.0
+    LLM_HEDGE_SECONDARY: str = "auto" # 'auto', 'groq' (another key) or 'ollama'
+
+    # Record/replay of provider calls for offline benchmarks (see app/core/llm_replay.py)
+    LLM_REPLAY_MODE: str = "off" # 'off', 'record' or 'replay'
+    LLM_REPLAY_DIR: str = os.path.join(os.getcwd(), "fixtures", "llm")
+    LLM_REPLAY_LATENCY_SCALE: float = 1.0 # 0 disables simulated latency
+    LLM_REPLAY_RATE_LIMIT_RATE: float = 0.0 # probability of an injected 429 per request
+    LLM_REPLAY_SEED: int = 1234
+
+    # On-disk LLM response cache (see app/core/disk_cache.py)
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_PATH: str = os.path.join(os.getcwd(), "cache", "llm_responses.sqlite3")
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    LLM_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    # Bump when prompts change so stale cached answers are not reused
+    LLM_PROMPT_VERSION: str = "1"
+
+    # Token-aware chunking of digital page text (see app/core/chunking.py).
+    # The model echoes article bodies back, so chunks must also fit the completion budget.
+    VISION_CHUNK_MAX_TOKENS: int = 2500
+    VISION_CHUNK_OVERLAP_TOKENS: int = 250
+
+    # Article-region segmentation of digital pages (see app/core/page_segmenter.py)
+    VISION_SEGMENTATION_ENABLED: bool = True
+    VISION_SEGMENT_MIN_REGION_CHARS: int = 200 # smaller regions are folded into a neighbour
+
+    # CPU-bound page extraction (see app/core/pdf_workers.py)
+    PDF_WORKER_PROCESSES: int = 0 # 0 = one per CPU, 1 = run in a thread without a pool
+    PDF_WORKER_SESSION_CACHE: int = 4 # open documents kept per worker
+
+    # Vision fallback rasterization; keeps page images under the Groq payload limit
+    VISION_RENDER_DPI: int = 150
+    VISION_MAX_DIMENSION: int = 2000 # longest side, px
+    VISION_JPEG_QUALITY: int = 75
+
+    # Vision resolution ladder: (scale, JPEG quality, max dimension px) rungs, cheapest first. The
+    # scale multiplies VISION_RENDER_DPI (full page) or each tile's zoom; the rung's own max dimension
+    # caps the longest side. A page climbs a rung when its result is empty, unparseable or short;
+    # a rung that would render at the same size as the one below it is skipped.
+    VISION_LADDER: List[Tuple[float, int, int]] = [(0.67, 60, 1400), (1.0, 75, 2000), (1.33, 85, 2660)]
+    VISION_LADDER_MIN_BODY_CHARS: int = 150 # median article body shorter than this is low confidence
+
+    # Region tiles for the vision fallback (see app/core/vision_tiles.py)
+    VISION_TILING_ENABLED: bool = True
+    VISION_TILE_MAX_SIDE_FRACTION: float = 0.5 # regions with a longer side (vs the page's) are split further
+    VISION_TILE_BASE_DIMENSION: int = 1280 # longest side, px, before the small-print boost
+    VISION_MAX_TILES: int = 8
+    VISION_TILE_MIN_LINE_PX: int = 16 # rendered text line height to aim for
+    VISION_TILE_MAX_DPI: int = 300
+    VISION_TILE_MAX_BYTES: int = 300 * 1024
+    VISION_TILE_MIN_JPEG_QUALITY: int = 40
+
+    # Page triage before extraction (see app/core/page_triage.py)
+    PAGE_TRIAGE_ENABLED: bool = True
+    PAGE_TRIAGE_MIN_TEXT_CHARS: int = 200 # below this the page has no usable text layer
+    PAGE_TRIAGE_MIN_TEXT_DENSITY: float = 0.5 # chars per 1000 pt^2; news pages run 2-6, ads with fine print far less
+    PAGE_TRIAGE_MIN_KEYWORD_HITS: int = 1 # AP government mentions that count as on-topic (fewer never skips alone)
+    PAGE_TRIAGE_OFF_TOPIC_MIN_HITS: int = 20 # sports/markets/classifieds terms before a page can be ruled off-topic
+    PAGE_TRIAGE_OFF_TOPIC_RATIO: float = 5.0 # off-topic hits per government hit to skip anyway
+    PAGE_TRIAGE_THUMBNAIL: bool = True # render a grayscale preview to tell blank, photo/ad and scanned pages apart
+    PAGE_TRIAGE_BLANK_INK_RATIO: float = 0.01
+    PAGE_TRIAGE_MIN_TEXT_LINE_SHARE: float = 0.25 # inked preview rows in text-line runs; scans 0.45+, photos/ads under 0.05
+
+    # Per-page extraction results keyed by PDF hash (see app/core/page_cache.py)
+    PAGE_CACHE_ENABLED: bool = True
+    PAGE_CACHE_PATH: str = os.path.join(os.getcwd(), "cache", "pages.sqlite3")
+    PAGE_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+
+    # Articles per department-classification call (1 = one call per article)
+    DEPARTMENT_BATCH_SIZE: int = 20
+
+    # Local embedding classifier in front of the LLM (see app/core/department_classifier.py)
+    DEPARTMENT_CLASSIFIER_ENABLED: bool = True
+    DEPARTMENT_CLASSIFIER_MIN_MARGIN: float = 0.05 # top-1 minus top-2 cosine similarity
+    DEPARTMENT_CLASSIFIER_MIN_EXAMPLES: int = 5 # labelled articles before a department can win locally
+    DEPARTMENT_CLASSIFIER_AUDIT_RATE: float = 0.05 # share of confident predictions re-checked by the LLM
+    DEPARTMENT_CLASSIFIER_MAX_TRAINING_ROWS: int = 5000
+    DEPARTMENT_CLASSIFIER_REFRESH_SECONDS: float = 3600.0
+
+    # 'split' runs DepartmentAgent and SentimentAgent side by side;
+    # 'fused' gets both from one call per batch (see app/agents/analysis_agent.py)
+    ANALYSIS_MODE: str = "split"
+    ANALYSIS_BATCH_SIZE: int = 15
+    # Max articles (or batches) each analysis agent has in flight at once
+    ANALYSIS_CONCURRENCY: int = 8
+    # Reuse department/sentiment results for identical articles across editions (see app/core/analysis_memo.py)
+    ANALYSIS_MEMO_ENABLED: bool = True
+
+    # Lexicon pre-score in SentimentAgent (see app/core/sentiment_lexicon.py); > 1.0 disables skipping the LLM
+    SENTIMENT_LEXICON_SKIP_CONFIDENCE: float = 0.9
+    SENTIMENT_LEXICON_MIN_HITS: int = 3
+
     # Pydantic V2 Config
     model_config = SettingsConfigDict(
         env_file=".env",
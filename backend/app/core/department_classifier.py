@@ -0,0 +1,182 @@
+"""
+Local nearest-centroid department classifier.
+
+Articles are embedded with the multilingual MiniLM model that SearchAgent
+already loads, and compared (cosine) against one centroid per department.
+Centroids are built from labelled DBArticle rows and updated in-process as
+the LLM labels new articles. A prediction is only trusted when:
+
+- the winning department has at least `min_examples` labelled articles, and
+- the margin between the top two similarities is at least `min_margin`.
+
+Everything else escalates to the LLM. A small random sample of confident
+predictions is also sent to the LLM (`audit_rate`) so agreement between the
+two can be measured over time.
+"""
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+
+
+def article_text(headline: str, body: str) -> str:
+    return f"{headline}\n{(body or '')[:500]}"
+
+
+class CentroidClassifier:
+    def __init__(
+        self,
+        labels: List[str],
+        embed: Callable[[List[str]], List[List[float]]],
+        min_margin: float,
+        min_examples: int,
+        audit_rate: float = 0.0
+    ):
+        self.labels = list(labels)
+        self._index = {label: i for i, label in enumerate(self.labels)}
+        self._embed = embed
+        self.min_margin = min_margin
+        self.min_examples = min_examples
+        self.audit_rate = audit_rate
+
+        self._sums: Optional[np.ndarray] = None
+        self._counts = np.zeros(len(self.labels), dtype=np.int64)
+        self._centroids: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+        self.trained_at: Optional[float] = None
+
+        self.local_decisions = 0
+        self.escalations = 0
+        self.audits = 0
+        self.compared = 0
+        self.agreed = 0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.asarray(self._embed(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def fit(self, examples: List[Tuple[str, str]]):
+        """Rebuild centroids from (text, label) pairs; unknown labels are ignored."""
+        examples = [(text, label) for text, label in examples if label in self._index]
+        if not examples:
+            return
+        vectors = self.embed([text for text, _ in examples])
+        sums = np.zeros((len(self.labels), vectors.shape[1]), dtype=np.float32)
+        counts = np.zeros(len(self.labels), dtype=np.int64)
+        for vector, (_, label) in zip(vectors, examples):
+            i = self._index[label]
+            sums[i] += vector
+            counts[i] += 1
+        with self._lock:
+            self._sums, self._counts = sums, counts
+            self._refresh_centroids()
+            self.trained_at = time.time()
+
+    def update(self, vectors: np.ndarray, labels: List[str]):
+        """Fold newly labelled articles into the running centroids."""
+        with self._lock:
+            if self._sums is None:
+                self._sums = np.zeros((len(self.labels), vectors.shape[1]), dtype=np.float32)
+            for vector, label in zip(vectors, labels):
+                i = self._index.get(label)
+                if i is None:
+                    continue
+                self._sums[i] += vector
+                self._counts[i] += 1
+            self._refresh_centroids()
+
+    def _refresh_centroids(self):
+        norms = np.linalg.norm(self._sums, axis=1, keepdims=True)
+        self._centroids = self._sums / np.maximum(norms, 1e-12)
+
+    def predict(self, vectors: np.ndarray) -> List[Tuple[Optional[str], float]]:
+        """(label, margin) per vector; label is None when the prediction should escalate."""
+        with self._lock:
+            centroids = self._centroids
+            counts = self._counts.copy()
+        if centroids is None:
+            return [(None, 0.0)] * len(vectors)
+
+        scores = vectors @ centroids.T
+        # Rank over every department seen at least once, so the margin reflects real competitors
+        scores[:, counts < 1] = -np.inf
+        ready = counts >= max(self.min_examples, 1)
+        results = []
+        for row in scores:
+            order = np.argsort(row)[::-1]
+            best, second = row[order[0]], row[order[1]] if len(order) > 1 else -np.inf
+            if not np.isfinite(best) or not np.isfinite(second):
+                # Nothing (or only one department) to compare against
+                results.append((None, 0.0))
+                continue
+            margin = float(best - second)
+            # Departments without enough labelled examples can't win locally
+            confident = ready[order[0]] and margin >= self.min_margin
+            results.append((self.labels[order[0]] if confident else None, margin))
+        return results
+
+    def should_audit(self) -> bool:
+        return self.audit_rate > 0 and random.random() < self.audit_rate
+
+    def record_comparison(self, local_label: str, llm_label: str):
+        self.compared += 1
+        if local_label == llm_label:
+            self.agreed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        decided = self.local_decisions + self.escalations
+        return {
+            "trained_at": self.trained_at,
+            "examples": int(self._counts.sum()),
+            "departments_ready": int((self._counts >= max(self.min_examples, 1)).sum()),
+            "local_decisions": self.local_decisions,
+            "escalations": self.escalations,
+            "local_rate": round(self.local_decisions / decided, 3) if decided else None,
+            "audits": self.audits,
+            "compared_with_llm": self.compared,
+            "agreement_rate": round(self.agreed / self.compared, 3) if self.compared else None
+        }
+
+
+def load_labelled_examples(labels: List[str], limit: int) -> List[Tuple[str, str]]:
+    """Most recent labelled articles from the database."""
+    from app.db.models import DBArticle, DBFile
+    from app.db.session import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rows = (
+            db.query(DBArticle.headline, DBArticle.body, DBArticle.department)
+            .join(DBFile, DBArticle.file_id == DBFile.id)
+            .filter(DBArticle.department.in_(labels))
+            .order_by(DBFile.upload_date.desc())
+            .limit(limit)
+            .all()
+        )
+    finally:
+        db.close()
+    return [(article_text(headline or "", body or ""), department) for headline, body, department in rows]
+
+
+_training_lock = asyncio.Lock()
+
+
+def _is_fresh(classifier: CentroidClassifier, refresh_seconds: float) -> bool:
+    return classifier.trained_at is not None and time.time() - classifier.trained_at < refresh_seconds
+
+
+async def ensure_trained(classifier: CentroidClassifier, max_rows: int, refresh_seconds: float):
+    """Fit from the database on first use and again once the model is older than refresh_seconds."""
+    if _is_fresh(classifier, refresh_seconds):
+        return
+    # Concurrent runs (several editions at once) wait for one fit instead of each loading the table
+    async with _training_lock:
+        if _is_fresh(classifier, refresh_seconds):
+            return
+        examples = await asyncio.to_thread(load_labelled_examples, classifier.labels, max_rows)
+        await asyncio.to_thread(classifier.fit, examples)
+        # Even with nothing to learn from, don't hit the database on every run
+        classifier.trained_at = time.time()
@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class DiskCache:
+    """
+    Small SQLite-backed key/value cache on local disk.
+
+    - TTL: entries older than `ttl_seconds` are treated as misses and purged.
+    - LRU: every hit refreshes `accessed_at`; when the stored payload exceeds
+      `max_bytes` the least recently used entries are evicted.
+    - Hit/miss/eviction counters are kept per process (see `stats`).
+
+    All methods are blocking; async callers should use `asyncio.to_thread`.
+    """
+
+    def __init__(self, path: str, max_bytes: int, ttl_seconds: Optional[float] = None, name: str = "cache"):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.name = name
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._total_bytes = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+            if self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE created_at < ?", (time.time() - self.ttl_seconds,))
+            self._total_bytes = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute("SELECT value, size, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, size, created_at = row
+            now = time.time()
+            if self.ttl_seconds and created_at < now - self.ttl_seconds:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self.misses += 1
+                return None
+
+            conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: str):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            conn = self._connect()
+            previous = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            self.writes += 1
+
+            if self._total_bytes > self.max_bytes:
+                self._evict(conn, target=int(self.max_bytes * 0.9))
+
+    def _evict(self, conn: sqlite3.Connection, target: int):
+        """Drop least recently used entries until the payload fits under `target` bytes."""
+        while self._total_bytes > target:
+            rows = conn.execute("SELECT key, size FROM entries ORDER BY accessed_at LIMIT 100").fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            victims = []
+            for key, size in rows:
+                victims.append((key,))
+                self._total_bytes -= size
+                if self._total_bytes <= target:
+                    break
+            conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+            self.evictions += len(victims)
+
+    def clear(self):
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM entries")
+            self._total_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        with self._lock:
+            entries = self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            total_bytes = self._total_bytes
+        return {
+            "name": self.name,
+            "entries": entries,
+            "bytes": total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions
+        }
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,279 @@
+"""
+Rate-limit-aware scheduler for multiple Groq API keys.
+
+Each key gets two token buckets (requests per minute and tokens per minute).
+Buckets refill continuously and are corrected from the `x-ratelimit-*`
+headers Groq returns on every response. Every call is routed to the key with
+the most headroom; when all keys are exhausted callers wait until a key frees
+up instead of failing over to the (much slower) Ollama. The wait is computed
+per caller from the keys it may use, and taken outside the scheduler lock, so
+a caller starved on one key never holds up callers that can use another.
+"""
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+from app.core.config import settings
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+# Rough prompt cost of one image part (Groq bills images as prompt tokens)
+IMAGE_TOKEN_ESTIMATE = 1500
+
+
+class GroqCapacityExhausted(Exception):
+    """No Groq key can serve the request before the caller's deadline."""
+
+
+def parse_reset_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse Groq reset/retry values such as '7.66s', '2m59.56s', '450ms' or '12'."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_RE.findall(value)
+    if not parts:
+        return None
+    return sum(float(amount) * _UNIT_SECONDS[unit] for amount, unit in parts)
+
+
+def _header_int(headers: Mapping[str, str], name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except ValueError:
+        return None
+
+
+def estimate_request_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Cheap pre-flight estimate of prompt + completion tokens for bucket accounting."""
+    chars = 0
+    images = 0
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, list):
+            for part in content:
+                if part.get("type") == "text":
+                    chars += len(part.get("text", ""))
+                elif part.get("type") == "image_url":
+                    images += 1
+        elif content:
+            chars += len(str(content))
+    # ~3 chars/token is conservative for mixed English/Telugu text
+    return chars // 3 + images * IMAGE_TOKEN_ESTIMATE + settings.GROQ_EXPECTED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, per_minute: float):
+        self.capacity = float(capacity)
+        self.per_minute = float(per_minute)
+        self.level = float(capacity)
+        self.updated = time.monotonic()
+
+    def refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.level = min(self.capacity, self.level + elapsed * self.per_minute / 60.0)
+            self.updated = now
+
+    def seconds_until(self, amount: float, now: float) -> float:
+        self.refill(now)
+        missing = min(amount, self.capacity) - self.level
+        if missing <= 0:
+            return 0.0
+        return missing * 60.0 / self.per_minute
+
+    def consume(self, amount: float):
+        # Negative amounts refund a reservation
+        self.level = min(self.capacity, self.level - amount)
+
+    def sync(self, remaining: Optional[int], limit: Optional[int] = None):
+        """Trust the server: it also sees traffic from other processes using the key."""
+        if limit:
+            self.capacity = float(limit)
+            self.per_minute = float(limit)
+        if remaining is not None:
+            self.level = min(self.level, float(remaining))
+
+
+@dataclass
+class GroqKeyState:
+    index: int
+    key: str
+    requests: TokenBucket
+    tokens: TokenBucket
+    blocked_until: float = 0.0
+    in_flight: int = 0
+    successes: int = 0
+    rate_limited: int = 0
+
+    def headroom(self, now: float) -> float:
+        self.requests.refill(now)
+        self.tokens.refill(now)
+        return min(self.requests.level / self.requests.capacity, self.tokens.level / self.tokens.capacity)
+
+    def seconds_until_ready(self, estimated_tokens: int, now: float) -> float:
+        return max(
+            self.blocked_until - now,
+            self.requests.seconds_until(1, now),
+            self.tokens.seconds_until(estimated_tokens, now)
+        )
+
+
+@dataclass
+class GroqLease:
+    state: GroqKeyState
+    estimated_tokens: int
+    done: bool = False
+
+    @property
+    def key(self) -> str:
+        return self.state.key
+
+    @property
+    def index(self) -> int:
+        return self.state.index
+
+
+class GroqKeyScheduler:
+    def __init__(self):
+        self._states: Dict[str, GroqKeyState] = {}
+        self._lock = asyncio.Lock()
+        self.waiting = 0
+
+    def _sync_keys(self) -> List[GroqKeyState]:
+        keys = settings.GROQ_API_KEYS
+        for i, key in enumerate(keys):
+            if key not in self._states:
+                self._states[key] = GroqKeyState(
+                    index=i,
+                    key=key,
+                    requests=TokenBucket(settings.GROQ_RPM_PER_KEY, settings.GROQ_RPM_PER_KEY),
+                    tokens=TokenBucket(settings.GROQ_TPM_PER_KEY, settings.GROQ_TPM_PER_KEY)
+                )
+        return [self._states[key] for key in keys]
+
+    def _candidates(self, exclude: Iterable[int]) -> List[GroqKeyState]:
+        excluded = set(exclude)
+        return [s for s in self._sync_keys() if s.index not in excluded]
+
+    def _try_acquire(self, estimated_tokens: int, now: float, exclude: Iterable[int]) -> Optional[GroqLease]:
+        best = None
+        best_score = None
+        for state in self._candidates(exclude):
+            if state.seconds_until_ready(estimated_tokens, now) > 0:
+                continue
+            score = (state.headroom(now), -state.in_flight)
+            if best_score is None or score > best_score:
+                best, best_score = state, score
+        if best is None:
+            return None
+
+        cost = min(estimated_tokens, best.tokens.capacity)
+        best.requests.consume(1)
+        best.tokens.consume(cost)
+        best.in_flight += 1
+        return GroqLease(state=best, estimated_tokens=int(cost))
+
+    async def acquire(self, estimated_tokens: int, deadline: Optional[float] = None, exclude: Iterable[int] = ()) -> GroqLease:
+        """
+        Reserve capacity on the key with the most headroom. Waits while every
+        usable key is exhausted; raises GroqCapacityExhausted if no key can be
+        ready before `deadline` (a time.monotonic() value).
+        """
+        exclude = tuple(exclude)
+        self.waiting += 1
+        try:
+            while True:
+                async with self._lock:
+                    now = time.monotonic()
+                    lease = self._try_acquire(estimated_tokens, now, exclude)
+                    if lease:
+                        return lease
+
+                    candidates = self._candidates(exclude)
+                    if not candidates:
+                        raise GroqCapacityExhausted("No usable Groq API keys")
+                    wait = min(s.seconds_until_ready(estimated_tokens, now) for s in candidates)
+                    if deadline is not None and now + wait > deadline:
+                        raise GroqCapacityExhausted(f"All Groq keys exhausted for the next {wait:.1f}s")
+                # Sleep without the lock so callers that can use other keys get through
+                await asyncio.sleep(min(max(wait, 0.05), 1.0))
+        finally:
+            self.waiting -= 1
+
+    def _finish(self, lease: GroqLease) -> bool:
+        if lease.done:
+            return False
+        lease.done = True
+        lease.state.in_flight -= 1
+        return True
+
+    def record_success(self, lease: GroqLease, headers: Mapping[str, str], total_tokens: Optional[int] = None):
+        if not self._finish(lease):
+            return
+        state = lease.state
+        state.successes += 1
+        if total_tokens is not None:
+            # Settle the reservation against what the call really cost
+            state.tokens.consume(total_tokens - lease.estimated_tokens)
+
+        state.tokens.sync(
+            _header_int(headers, "x-ratelimit-remaining-tokens"),
+            _header_int(headers, "x-ratelimit-limit-tokens")
+        )
+        # x-ratelimit-*-requests is the daily quota; block the key once it runs out
+        if _header_int(headers, "x-ratelimit-remaining-requests") == 0:
+            reset = parse_reset_seconds(headers.get("x-ratelimit-reset-requests")) or 60.0
+            state.blocked_until = max(state.blocked_until, time.monotonic() + reset)
+
+    def record_rate_limit(self, lease: GroqLease, headers: Mapping[str, str]):
+        if not self._finish(lease):
+            return
+        state = lease.state
+        state.rate_limited += 1
+        retry_after = (
+            parse_reset_seconds(headers.get("retry-after"))
+            or parse_reset_seconds(headers.get("x-ratelimit-reset-tokens"))
+            or parse_reset_seconds(headers.get("x-ratelimit-reset-requests"))
+            or 2.0
+        )
+        state.blocked_until = max(state.blocked_until, time.monotonic() + retry_after)
+        state.tokens.sync(_header_int(headers, "x-ratelimit-remaining-tokens"))
+
+    def release(self, lease: GroqLease):
+        """Call failed for a non rate-limit reason: give the reservation back."""
+        if not self._finish(lease):
+            return
+        lease.state.requests.consume(-1)
+        lease.state.tokens.consume(-lease.estimated_tokens)
+
+    def snapshot(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "queued": self.waiting,
+            "keys": [
+                {
+                    "key_index": s.index + 1,
+                    "headroom": round(s.headroom(now), 3),
+                    "requests_available": round(s.requests.level, 1),
+                    "tokens_available": int(s.tokens.level),
+                    "tokens_per_minute": int(s.tokens.capacity),
+                    "blocked_for_seconds": round(max(0.0, s.blocked_until - now), 1),
+                    "in_flight": s.in_flight,
+                    "successes": s.successes,
+                    "rate_limited": s.rate_limited
+                }
+                for s in self._sync_keys()
+            ]
+        }
+
+
+groq_scheduler = GroqKeyScheduler()
@@ -0,0 +1,89 @@
+"""
+Request hedging for tail latency.
+
+The primary request starts immediately. If it has not answered within a
+percentile of the provider's recent latency, a second copy of the request is
+sent to a secondary (another Groq key or the local Ollama). The first valid
+answer wins and the loser is cancelled.
+"""
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class LatencyTracker:
+    """Rolling window of recent successful call latencies for one provider."""
+
+    def __init__(self, name: str, window: int = 200, min_samples: int = 10):
+        self.name = name
+        self.min_samples = min_samples
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p in [0, 1]. None until enough samples have been seen."""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "provider": self.name,
+            "samples": len(self._samples),
+            "p50": self.percentile(0.5),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99)
+        }
+
+
+async def hedged_race(
+    primary: Callable[[], Awaitable[T]],
+    secondary: Callable[[], Awaitable[T]],
+    delay: float,
+    is_valid: Callable[[T], bool],
+    on_hedge: Optional[Callable[[], None]] = None
+) -> T:
+    """
+    Start `primary`; after `delay` seconds without an answer also start
+    `secondary`. Return the first valid result and cancel the other task.
+    If both fail, the primary's error is raised.
+    """
+    primary_task = asyncio.ensure_future(primary())
+    try:
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+    except asyncio.CancelledError:
+        primary_task.cancel()
+        raise
+    if done:
+        return primary_task.result()
+
+    if on_hedge:
+        on_hedge()
+    secondary_task = asyncio.ensure_future(secondary())
+    pending = {primary_task, secondary_task}
+    fallback_result: Optional[T] = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    continue
+                result = task.result()
+                if is_valid(result):
+                    return result
+                if fallback_result is None:
+                    fallback_result = result
+    finally:
+        for task in pending:
+            task.cancel()
+
+    if fallback_result is not None:
+        return fallback_result
+    # Both failed: surface the primary's error
+    return primary_task.result()
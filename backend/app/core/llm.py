@@ -0,0 +1,729 @@
+"""
+Shared async LLM client layer.
+
+Every LLM call in the backend (agents, executive briefing, search answers)
+goes through `llm_service.chat`. Groq clients are created once per API key
+and share a single pooled HTTP/2 connection pool, so concurrent calls from
+`asyncio.gather` really run concurrently instead of blocking the event loop.
+Responses are cached on disk, keyed by a hash of the request and the
+provider/model it is routed to; only answers from that route are cached (a
+fallback answer is never served as the primary provider's). Groq keys
+are picked by the rate-limit-aware scheduler in `groq_scheduler`. In-flight
+requests per provider are bounded by the AIMD limiters in `concurrency`, and
+providers or keys that are known to be down are skipped via `circuit_breaker`.
+Latency-sensitive callers can opt into request hedging (see `hedging`), and
+`llm_service.stream` yields tokens as they arrive for SSE endpoints. Every
+provider call, retry, fallback and cache lookup is reported to `telemetry`.
+Provider requests can be recorded to / replayed from fixtures (`llm_replay`).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Set, Tuple
+import asyncio
+import hashlib
+import json
+import time
+import httpx
+import ollama
+from groq import APIConnectionError, APIStatusError, APITimeoutError, AsyncGroq, RateLimitError
+from app.core.circuit_breaker import CircuitOpenError, CircuitState, circuit_breakers
+from app.core.concurrency import groq_limiter, ollama_limiter
+from app.core.config import settings
+from app.core.disk_cache import DiskCache
+from app.core.groq_scheduler import GroqCapacityExhausted, estimate_request_tokens, groq_scheduler
+from app.core.hedging import LatencyTracker, hedged_race
+from app.core.llm_replay import llm_replay
+from app.core.ollama import ollama_service
+from app.core import telemetry
+
+# Model used when Groq is only reached as a last resort behind Ollama
+GROQ_FALLBACK_MODEL = "meta-llama/llama-4-scout-17b-16e-instruct"
+
+LLMRoute = Tuple[str, str] # (provider, model) that answers a request
+
+# Routes that answered chat/stream calls in the current context (see track_served_routes)
+_served_routes: ContextVar[Optional[Set[LLMRoute]]] = ContextVar("llm_served_routes", default=None)
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def is_overload_error(error: Exception) -> bool:
+    """Errors that mean 'back off': rate limits, server overload and timeouts."""
+    if isinstance(error, (RateLimitError, APITimeoutError, httpx.TimeoutException, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, ollama.ResponseError) and error.status_code in (429, 503):
+        return True
+    return False
+
+
+def is_provider_failure(error: Exception) -> bool:
+    """Errors that say the provider itself is unhealthy (counted by circuit breakers)."""
+    if isinstance(error, RateLimitError):
+        return False
+    if isinstance(error, (APIConnectionError, httpx.TransportError, ConnectionError, asyncio.TimeoutError)):
+        return True
+    if isinstance(error, (APIStatusError, ollama.ResponseError)):
+        return error.status_code >= 500
+    return False
+
+
+def primary_route(model: Optional[str] = None) -> LLMRoute:
+    """Provider and model a request goes to first under the current settings."""
+    if settings.LLM_PROVIDER == "groq" and settings.GROQ_API_KEYS:
+        return "groq", model or settings.GROQ_MODEL
+    return "ollama", settings.OLLAMA_MODEL
+
+
+@contextmanager
+def track_served_routes() -> Iterator[Set[LLMRoute]]:
+    """
+    Collect the routes that answer LLM calls made inside the block, including
+    calls from tasks it spawns (they share the set). Cache hits count as the
+    primary route.
+    """
+    routes: Set[LLMRoute] = set()
+    token = _served_routes.set(routes)
+    try:
+        yield routes
+    finally:
+        _served_routes.reset(token)
+
+
+def _note_route(route: LLMRoute):
+    routes = _served_routes.get()
+    if routes is not None:
+        routes.add(route)
+
+
+def llm_cache_key(
+    messages: List[Dict[str, Any]],
+    route: LLMRoute,
+    json_mode: bool,
+    temperature: Optional[float] = None
+) -> str:
+    """Content address of a request: sha256 over (provider, model, messages, json_mode, prompt version)."""
+    provider, model = route
+    payload = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "messages": messages,
+            "json_mode": json_mode,
+            "temperature": temperature,
+            "prompt_version": settings.LLM_PROMPT_VERSION
+        },
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def is_valid_answer(text: Optional[str], json_mode: bool) -> bool:
+    """A hedged answer only wins the race if it is usable."""
+    if not text or not text.strip():
+        return False
+    if json_mode:
+        try:
+            json.loads(text.replace("```json", "").replace("```", "").strip())
+        except ValueError:
+            return False
+    return True
+
+
+groq_latency = LatencyTracker("groq")
+ollama_latency = LatencyTracker("ollama")
+
+llm_cache = DiskCache(
+    settings.LLM_CACHE_PATH,
+    max_bytes=settings.LLM_CACHE_MAX_BYTES,
+    ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+    name="llm_responses"
+)
+
+
+class LLMService:
+    def __init__(self):
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._groq_clients: Dict[str, AsyncGroq] = {}
+        self.hedged_requests = 0
+
+    def log(self, source: str, message: str):
+        print(f"[{source}] {message}")
+
+    def _get_http_client(self) -> httpx.AsyncClient:
+        """Single connection pool shared by every Groq key (same host)."""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                http2=settings.LLM_HTTP2 and _http2_available(),
+                limits=httpx.Limits(
+                    max_connections=settings.LLM_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS
+                ),
+                timeout=httpx.Timeout(
+                    settings.LLM_TIMEOUT_SECONDS,
+                    connect=settings.LLM_CONNECT_TIMEOUT_SECONDS
+                )
+            )
+            # Clients bound to a closed pool are useless, rebuild them lazily
+            self._groq_clients = {}
+        return self._http_client
+
+    def groq_client(self, key: str) -> AsyncGroq:
+        """Return the pooled AsyncGroq client for an API key."""
+        http_client = self._get_http_client()
+        client = self._groq_clients.get(key)
+        if client is None:
+            # Retries are handled by the key scheduler, not inside the SDK
+            client = AsyncGroq(api_key=key, http_client=http_client, max_retries=0)
+            self._groq_clients[key] = client
+        return client
+
+    async def _groq_chat(
+        self,
+        key: str,
+        messages: List[Dict[str, Any]],
+        model: str,
+        json_mode: bool = False,
+        temperature: Optional[float] = None
+    ):
+        """Single Groq request. Returns (completion, response headers)."""
+        if llm_replay.replaying:
+            return await llm_replay.replay_groq(messages, model, json_mode, temperature)
+
+        kwargs: Dict[str, Any] = {"messages": messages, "model": model}
+        if json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+
+        started = time.monotonic()
+        raw = await self.groq_client(key).chat.completions.with_raw_response.create(**kwargs)
+        completion = await raw.parse()
+        if llm_replay.recording:
+            usage = completion.usage
+            llm_replay.record(
+                messages, json_mode, temperature, "groq", model,
+                completion.choices[0].message.content or "",
+                time.monotonic() - started,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0
+            )
+        return completion, raw.headers
+
+    async def _call_groq(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        json_mode: bool,
+        temperature: Optional[float],
+        source: str,
+        avoid_keys: Optional[Set[int]] = None,
+        holding: Optional[Set[int]] = None
+    ) -> str:
+        """
+        Run a request on whichever key the scheduler picks. Rate-limited calls
+        are re-queued; other errors retire that key for this request, and keys
+        behind an open circuit are never tried. Raises once no key can serve
+        it within GROQ_QUEUE_MAX_WAIT_SECONDS. Keys in `avoid_keys` (read on
+        every attempt) are skipped; the key in use is published in `holding`,
+        so a hedge can steer clear of it.
+        """
+        keys = settings.GROQ_API_KEYS
+        provider_breaker = circuit_breakers.get("groq")
+        estimated_tokens = estimate_request_tokens(messages)
+        deadline = time.monotonic() + settings.GROQ_QUEUE_MAX_WAIT_SECONDS
+        failed_keys = set()
+        last_error: Optional[Exception] = None
+        retry_reason: Optional[str] = None
+
+        while True:
+            # Limiter slot before the key lease: requests queued on the limiter hold no key capacity
+            async with groq_limiter.slot():
+                open_keys = {i for i in range(len(keys)) if circuit_breakers.get(f"groq:key{i+1}").is_open()}
+                try:
+                    lease = await groq_scheduler.acquire(estimated_tokens, deadline=deadline, exclude=failed_keys | open_keys | (avoid_keys or set()))
+                except GroqCapacityExhausted as e:
+                    raise last_error or e
+                if holding is not None:
+                    holding.clear()
+                    holding.add(lease.index)
+
+                key_breaker = circuit_breakers.get(f"groq:key{lease.index+1}")
+                key_probe = key_breaker.state == CircuitState.HALF_OPEN
+                if not key_breaker.allow_request():
+                    # Half-open key already has its probe in flight
+                    groq_scheduler.release(lease)
+                    failed_keys.add(lease.index)
+                    continue
+
+                if retry_reason:
+                    telemetry.record_retry(source, "groq", retry_reason)
+                started = time.monotonic()
+                try:
+                    completion, headers = await self._groq_chat(lease.key, messages, model, json_mode, temperature)
+                except asyncio.CancelledError:
+                    # Lost a hedged race (or the caller went away): hand the reservation back
+                    groq_scheduler.release(lease)
+                    if key_probe:
+                        key_breaker.release_probe()
+                    raise
+                except RateLimitError as e:
+                    # A 429 means the key is alive, just busy
+                    key_breaker.record_success()
+                    groq_limiter.on_overload()
+                    groq_scheduler.record_rate_limit(lease, e.response.headers)
+                    telemetry.record_call(source, "groq", model, "rate_limited", time.monotonic() - started, key_index=lease.index)
+                    self.log(source, f"Key {lease.index+1}/{len(keys)} rate limited. Re-queueing...")
+                    last_error = e
+                    retry_reason = "rate_limit"
+                    continue
+                except Exception as e:
+                    if is_overload_error(e):
+                        groq_limiter.on_overload()
+                    if is_provider_failure(e):
+                        key_breaker.record_failure()
+                        provider_breaker.record_failure()
+                    else:
+                        key_breaker.record_success()
+                    groq_scheduler.release(lease)
+                    telemetry.record_call(source, "groq", model, "error", time.monotonic() - started, key_index=lease.index)
+                    self.log(source, f"Groq error with key {lease.index+1}: {e}")
+                    failed_keys.add(lease.index)
+                    last_error = e
+                    retry_reason = "error"
+                    continue
+
+            latency = time.monotonic() - started
+            groq_latency.record(latency)
+            groq_limiter.on_success()
+            key_breaker.record_success()
+            provider_breaker.record_success()
+            usage = getattr(completion, "usage", None)
+            groq_scheduler.record_success(lease, headers, usage.total_tokens if usage else None)
+            telemetry.record_call(
+                source, "groq", model, "success", latency,
+                key_index=lease.index,
+                prompt_tokens=usage.prompt_tokens if usage else 0,
+                completion_tokens=usage.completion_tokens if usage else 0
+            )
+            return completion.choices[0].message.content
+
+    async def _call_ollama(
+        self,
+        messages: List[Dict[str, Any]],
+        json_mode: bool,
+        temperature: Optional[float],
+        source: str = "LLM"
+    ) -> str:
+        breaker = circuit_breakers.get("ollama")
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Ollama circuit is {breaker.state.value}")
+        started = time.monotonic()
+        try:
+            async with ollama_limiter.slot():
+                response = await ollama_service.chat_response(messages, schema=True if json_mode else None, temperature=temperature)
+        except Exception as e:
+            if is_overload_error(e):
+                ollama_limiter.on_overload()
+            if is_provider_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            telemetry.record_call(source, "ollama", settings.OLLAMA_MODEL, "error", time.monotonic() - started)
+            raise
+        latency = time.monotonic() - started
+        ollama_latency.record(latency)
+        ollama_limiter.on_success()
+        breaker.record_success()
+        telemetry.record_call(
+            source, "ollama", settings.OLLAMA_MODEL, "success", latency,
+            prompt_tokens=getattr(response, "prompt_eval_count", None) or 0,
+            completion_tokens=getattr(response, "eval_count", None) or 0
+        )
+        return response['message']['content']
+
+    async def _hedged_groq(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        json_mode: bool,
+        temperature: Optional[float],
+        source: str
+    ) -> Tuple[str, LLMRoute]:
+        """
+        Groq call that is duplicated to a secondary once it runs past the
+        latency percentile. Returns the winning answer and the route that gave it.
+        """
+        delay = groq_latency.percentile(settings.LLM_HEDGE_PERCENTILE)
+        if delay is None:
+            delay = settings.LLM_HEDGE_DEFAULT_DELAY_SECONDS
+        secondary_is_groq = settings.LLM_HEDGE_SECONDARY == "groq" or (
+            settings.LLM_HEDGE_SECONDARY == "auto" and len(settings.GROQ_API_KEYS) > 1
+        )
+
+        # Key the primary is on; the Groq secondary must land on a different one
+        primary_keys: Set[int] = set()
+
+        async def primary() -> Tuple[str, LLMRoute]:
+            answer = await self._call_groq(messages, model, json_mode, temperature, source, holding=primary_keys)
+            return answer, ("groq", model)
+
+        async def secondary() -> Tuple[str, LLMRoute]:
+            if secondary_is_groq:
+                answer = await self._call_groq(messages, model, json_mode, temperature, source, avoid_keys=primary_keys)
+                return answer, ("groq", model)
+            return await self._call_ollama(messages, json_mode, temperature, source), ("ollama", settings.OLLAMA_MODEL)
+
+        def on_hedge():
+            self.hedged_requests += 1
+            telemetry.record_hedge(source)
+            self.log(source, f"No answer after {delay:.2f}s. Hedging to {'another Groq key' if secondary_is_groq else 'Ollama'}...")
+
+        return await hedged_race(
+            primary,
+            secondary,
+            delay,
+            lambda answer: is_valid_answer(answer[0], json_mode),
+            on_hedge=on_hedge
+        )
+
+    async def chat(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        json_mode: bool = False,
+        temperature: Optional[float] = None,
+        source: str = "LLM",
+        cache: bool = True,
+        hedge: Optional[bool] = None
+    ) -> str:
+        """
+        Cached entry point for every LLM call. Identical requests are served
+        from the on-disk cache; misses go through `_dispatch`, and only answers
+        from the primary route are written back. `hedge` overrides
+        LLM_HEDGE_DEFAULT for this call.
+        """
+        route = primary_route(model)
+        cache_key = None
+        if cache and settings.LLM_CACHE_ENABLED:
+            cache_key = llm_cache_key(messages, route, json_mode, temperature)
+            try:
+                cached = await asyncio.to_thread(llm_cache.get, cache_key)
+            except Exception as e:
+                self.log(source, f"LLM cache read failed: {e}")
+                cached = None
+            telemetry.record_cache(source, hit=cached is not None)
+            if cached is not None:
+                self.log(source, f"LLM Cache hit. Result len: {len(cached)}")
+                _note_route(route)
+                return cached
+
+        if hedge is None:
+            hedge = settings.LLM_HEDGE_DEFAULT
+        result, served = await self._dispatch(messages, model, json_mode, temperature, source, hedge)
+        _note_route(served)
+
+        if cache_key and served == route and result and result.strip():
+            try:
+                await asyncio.to_thread(llm_cache.set, cache_key, result)
+            except Exception as e:
+                self.log(source, f"LLM cache write failed: {e}")
+        return result
+
+    async def _dispatch(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str],
+        json_mode: bool,
+        temperature: Optional[float],
+        source: str,
+        hedge: bool = False
+    ) -> Tuple[str, LLMRoute]:
+        """
+        Scheduled Groq keys with Ollama fallback (or the reverse when
+        LLM_PROVIDER is 'ollama'). Returns the answer and the route that served it.
+        """
+        keys = settings.GROQ_API_KEYS
+
+        groq_breaker = circuit_breakers.get("groq")
+
+        # Case 1: Groq via the key scheduler
+        if settings.LLM_PROVIDER == "groq" and keys:
+            probe = groq_breaker.state == CircuitState.HALF_OPEN
+            if groq_breaker.allow_request():
+                try:
+                    groq_model = model or settings.GROQ_MODEL
+                    if hedge:
+                        result, served = await self._hedged_groq(messages, groq_model, json_mode, temperature, source)
+                    else:
+                        result, served = await self._call_groq(messages, groq_model, json_mode, temperature, source), ("groq", groq_model)
+                    self.log(source, f"LLM Call Success. Provider: {served[0]}, Model: {served[1]}, Result len: {len(result) if result else 0}")
+                    return result, served
+                except Exception as e:
+                    self.log(source, f"Groq unavailable ({e}). Falling back to Ollama...")
+                finally:
+                    # Success and provider failures settled the probe; any other exit hands it back
+                    if probe:
+                        groq_breaker.release_probe()
+            else:
+                self.log(source, "Groq circuit open. Skipping straight to Ollama...")
+            telemetry.record_fallback(source, "groq", "ollama")
+
+        # Case 2: Manual Ollama or Fallback
+        try:
+            return await self._call_ollama(messages, json_mode, temperature, source), ("ollama", settings.OLLAMA_MODEL)
+        except Exception as e:
+            # Final try: if Ollama was requested but failed, try Groq as last resort
+            probe = groq_breaker.state == CircuitState.HALF_OPEN
+            if settings.LLM_PROVIDER == "ollama" and keys and groq_breaker.allow_request():
+                telemetry.record_fallback(source, "ollama", "groq")
+                try:
+                    groq_model = model or GROQ_FALLBACK_MODEL
+                    return await self._call_groq(messages, groq_model, json_mode, temperature, source), ("groq", groq_model)
+                except Exception:
+                    pass
+                finally:
+                    if probe:
+                        groq_breaker.release_probe()
+
+            self.log(source, f"Final LLM Call failed: {e}")
+            raise e
+
+    async def stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+        source: str = "LLM",
+        cache: bool = True
+    ) -> AsyncIterator[str]:
+        """
+        Token-streaming variant of `chat` with the same provider order and
+        cache. A cached answer is replayed as a single chunk; a completed
+        stream from the primary route is written to the cache.
+        """
+        route = primary_route(model)
+        cache_key = None
+        if cache and settings.LLM_CACHE_ENABLED:
+            cache_key = llm_cache_key(messages, route, False, temperature)
+            try:
+                cached = await asyncio.to_thread(llm_cache.get, cache_key)
+            except Exception as e:
+                self.log(source, f"LLM cache read failed: {e}")
+                cached = None
+            telemetry.record_cache(source, hit=cached is not None)
+            if cached is not None:
+                self.log(source, f"LLM Cache hit (stream). Result len: {len(cached)}")
+                _note_route(route)
+                yield cached
+                return
+
+        parts: List[str] = []
+        served: Dict[str, LLMRoute] = {}
+        started = time.monotonic()
+        async for token in self._dispatch_stream(messages, model, temperature, source, served):
+            parts.append(token)
+            yield token
+
+        result = "".join(parts)
+        if llm_replay.recording and result:
+            llm_replay.record(messages, False, temperature, "stream", model or settings.GROQ_MODEL, result, time.monotonic() - started)
+        self.log(source, f"LLM Stream complete. Result len: {len(result)}")
+        if "route" in served:
+            _note_route(served["route"])
+        if cache_key and served.get("route") == route and result.strip():
+            try:
+                await asyncio.to_thread(llm_cache.set, cache_key, result)
+            except Exception as e:
+                self.log(source, f"LLM cache write failed: {e}")
+
+    async def _dispatch_stream(
+        self,
+        messages: List[Dict[str, Any]],
+        model: Optional[str],
+        temperature: Optional[float],
+        source: str,
+        served: Dict[str, LLMRoute]
+    ) -> AsyncIterator[str]:
+        """
+        Same provider order as `_dispatch`. Failover is only possible before
+        the first token has been sent; after that errors propagate. The route
+        that produced the tokens is stored in `served["route"]`.
+        """
+        if llm_replay.replaying:
+            served["route"] = primary_route(model)
+            async for token in llm_replay.replay_stream(messages, temperature):
+                yield token
+            return
+
+        keys = settings.GROQ_API_KEYS
+        if settings.LLM_PROVIDER == "groq" and keys:
+            order = [("groq", model or settings.GROQ_MODEL), ("ollama", settings.OLLAMA_MODEL)]
+        else:
+            order = [("ollama", settings.OLLAMA_MODEL)]
+            if keys:
+                order.append(("groq", model or GROQ_FALLBACK_MODEL))
+
+        last_error: Optional[Exception] = None
+        groq_breaker = circuit_breakers.get("groq")
+        for provider, provider_model in order:
+            probe = False
+            if provider == "groq":
+                probe = groq_breaker.state == CircuitState.HALF_OPEN
+                if not groq_breaker.allow_request():
+                    self.log(source, "Groq circuit open. Skipping...")
+                    continue
+                tokens = self._stream_groq(messages, provider_model, temperature, source)
+            else:
+                tokens = self._stream_ollama(messages, temperature, source)
+
+            started = False
+            try:
+                async for token in tokens:
+                    if not started:
+                        started = True
+                        served["route"] = (provider, provider_model)
+                    yield token
+                return
+            except Exception as e:
+                if started:
+                    raise
+                last_error = e
+                self.log(source, f"{provider} stream unavailable ({e}). Trying next provider...")
+                telemetry.record_fallback(source, provider, "next")
+            finally:
+                if probe:
+                    groq_breaker.release_probe()
+
+        raise last_error or CircuitOpenError("No LLM provider available for streaming")
+
+    async def _stream_groq(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        temperature: Optional[float],
+        source: str
+    ) -> AsyncIterator[str]:
+        """Streaming counterpart of `_call_groq`: scheduled keys, re-queue on 429 before the first token."""
+        keys = settings.GROQ_API_KEYS
+        provider_breaker = circuit_breakers.get("groq")
+        estimated_tokens = estimate_request_tokens(messages)
+        deadline = time.monotonic() + settings.GROQ_QUEUE_MAX_WAIT_SECONDS
+        failed_keys = set()
+        last_error: Optional[Exception] = None
+
+        kwargs: Dict[str, Any] = {"messages": messages, "model": model, "stream": True}
+        if temperature is not None:
+            kwargs["temperature"] = temperature
+
+        while True:
+            # Same order as _call_groq: limiter slot first, then the key lease
+            async with groq_limiter.slot():
+                open_keys = {i for i in range(len(keys)) if circuit_breakers.get(f"groq:key{i+1}").is_open()}
+                try:
+                    lease = await groq_scheduler.acquire(estimated_tokens, deadline=deadline, exclude=failed_keys | open_keys)
+                except GroqCapacityExhausted as e:
+                    raise last_error or e
+
+                key_breaker = circuit_breakers.get(f"groq:key{lease.index+1}")
+                key_probe = key_breaker.state == CircuitState.HALF_OPEN
+                if not key_breaker.allow_request():
+                    groq_scheduler.release(lease)
+                    failed_keys.add(lease.index)
+                    continue
+
+                started = time.monotonic()
+                emitted = False
+                try:
+                    stream = await self.groq_client(lease.key).chat.completions.create(**kwargs)
+                    async for chunk in stream:
+                        if chunk.choices and chunk.choices[0].delta.content:
+                            emitted = True
+                            yield chunk.choices[0].delta.content
+                except RateLimitError as e:
+                    key_breaker.record_success()
+                    groq_limiter.on_overload()
+                    groq_scheduler.record_rate_limit(lease, e.response.headers)
+                    telemetry.record_call(source, "groq", model, "rate_limited", time.monotonic() - started, key_index=lease.index)
+                    if emitted:
+                        raise
+                    self.log(source, f"Key {lease.index+1}/{len(keys)} rate limited. Re-queueing stream...")
+                    last_error = e
+                    continue
+                except Exception as e:
+                    if is_overload_error(e):
+                        groq_limiter.on_overload()
+                    if is_provider_failure(e):
+                        key_breaker.record_failure()
+                        provider_breaker.record_failure()
+                    else:
+                        # The key answered; the error is ours (bad request, parsing), so settle a half-open probe
+                        key_breaker.record_success()
+                    groq_scheduler.release(lease)
+                    telemetry.record_call(source, "groq", model, "error", time.monotonic() - started, key_index=lease.index)
+                    if emitted:
+                        raise
+                    self.log(source, f"Groq stream error with key {lease.index+1}: {e}")
+                    failed_keys.add(lease.index)
+                    last_error = e
+                    continue
+                except BaseException:
+                    # Client disconnected or task cancelled mid-stream
+                    groq_scheduler.release(lease)
+                    if key_probe:
+                        key_breaker.release_probe()
+                    raise
+
+            latency = time.monotonic() - started
+            groq_latency.record(latency)
+            groq_limiter.on_success()
+            key_breaker.record_success()
+            provider_breaker.record_success()
+            groq_scheduler.record_success(lease, {})
+            telemetry.record_call(source, "groq", model, "success", latency, key_index=lease.index)
+            return
+
+    async def _stream_ollama(
+        self,
+        messages: List[Dict[str, Any]],
+        temperature: Optional[float],
+        source: str = "LLM"
+    ) -> AsyncIterator[str]:
+        breaker = circuit_breakers.get("ollama")
+        if not breaker.allow_request():
+            raise CircuitOpenError(f"Ollama circuit is {breaker.state.value}")
+        started = time.monotonic()
+        try:
+            async with ollama_limiter.slot():
+                async for token in ollama_service.stream_chat(messages, temperature=temperature):
+                    yield token
+        except Exception as e:
+            if is_overload_error(e):
+                ollama_limiter.on_overload()
+            if is_provider_failure(e):
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            telemetry.record_call(source, "ollama", settings.OLLAMA_MODEL, "error", time.monotonic() - started)
+            raise
+        ollama_limiter.on_success()
+        breaker.record_success()
+        telemetry.record_call(source, "ollama", settings.OLLAMA_MODEL, "success", time.monotonic() - started)
+
+    async def aclose(self):
+        """Release pooled connections (called on application shutdown)."""
+        if self._http_client is not None and not self._http_client.is_closed:
+            await self._http_client.aclose()
+        self._http_client = None
+        self._groq_clients = {}
+        await ollama_service.aclose()
+        llm_cache.close()
+
+
+llm_service = LLMService()
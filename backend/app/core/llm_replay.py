@@ -0,0 +1,230 @@
+"""
+Record/replay provider for deterministic, offline pipeline benchmarks.
+
+LLM_REPLAY_MODE=record  Real Groq/Ollama calls are made and every
+                        request/response pair (with its latency and token
+                        usage) is written to a JSON fixture in LLM_REPLAY_DIR.
+LLM_REPLAY_MODE=replay  No network: responses are served from the fixtures,
+                        optionally sleeping for the recorded latency
+                        (LLM_REPLAY_LATENCY_SCALE) and injecting 429s
+                        (LLM_REPLAY_RATE_LIMIT_RATE) so the key scheduler,
+                        limiters and breakers are exercised like in production.
+
+Fixtures are keyed by a hash of (messages, json_mode, temperature) only, so a
+request recorded against one provider replays no matter which provider the
+fallback chain picks. Whether an attempt gets an injected 429 is a hash of
+(LLM_REPLAY_SEED, request key, attempt number), so the same requests see the
+same 429s however concurrent calls interleave.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import httpx
+from app.core.config import settings
+
+REPLAY_RATE_LIMIT_HEADERS = {
+    "retry-after": "1",
+    "x-ratelimit-remaining-tokens": "0",
+    "x-ratelimit-reset-tokens": "1s"
+}
+
+
+class ReplayMiss(Exception):
+    """Replay mode found no fixture for a request."""
+
+
+class LLMReplay:
+    def __init__(self):
+        self.mode = settings.LLM_REPLAY_MODE
+        self.directory = settings.LLM_REPLAY_DIR
+        self.latency_scale = settings.LLM_REPLAY_LATENCY_SCALE
+        self.rate_limit_rate = settings.LLM_REPLAY_RATE_LIMIT_RATE
+        self.seed = settings.LLM_REPLAY_SEED
+        self._attempts: Dict[str, int] = {}
+        self._fixtures: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.served = 0
+        self.misses = 0
+        self.recorded = 0
+        self.injected_rate_limits = 0
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    @staticmethod
+    def request_key(messages: List[Dict[str, Any]], json_mode: bool, temperature: Optional[float]) -> str:
+        payload = json.dumps(
+            {"messages": messages, "json_mode": json_mode, "temperature": temperature},
+            sort_keys=True,
+            ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _inject_rate_limit(self, key: str) -> bool:
+        if self.rate_limit_rate <= 0:
+            return False
+        with self._lock:
+            attempt = self._attempts.get(key, 0)
+            self._attempts[key] = attempt + 1
+        digest = hashlib.sha256(f"{self.seed}:{key}:{attempt}".encode("utf-8")).digest()
+        return int.from_bytes(digest[:8], "big") / 2 ** 64 < self.rate_limit_rate
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if key in self._fixtures:
+                return self._fixtures[key]
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            fixture = json.load(f)
+        with self._lock:
+            self._fixtures[key] = fixture
+        return fixture
+
+    def record(
+        self,
+        messages: List[Dict[str, Any]],
+        json_mode: bool,
+        temperature: Optional[float],
+        provider: str,
+        model: str,
+        content: str,
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0
+    ):
+        key = self.request_key(messages, json_mode, temperature)
+        fixture = {
+            "key": key,
+            "provider": provider,
+            "model": model,
+            "json_mode": json_mode,
+            "temperature": temperature,
+            # Prompts can embed base64 page images; keep only a readable preview
+            "prompt_preview": _prompt_preview(messages),
+            "content": content,
+            "latency": round(latency, 4),
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "recorded_at": time.time()
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = self._path(key) + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self._path(key))
+        with self._lock:
+            self._fixtures[key] = fixture
+            self.recorded += 1
+
+    async def _serve(self, messages: List[Dict[str, Any]], json_mode: bool, temperature: Optional[float]) -> Tuple[Dict[str, Any], bool]:
+        """Look up a fixture and simulate its latency. Returns (fixture, inject_rate_limit)."""
+        key = self.request_key(messages, json_mode, temperature)
+        fixture = self.load(key)
+        if fixture is None:
+            self.misses += 1
+            raise ReplayMiss(f"No replay fixture for request {key[:12]}")
+
+        inject = self._inject_rate_limit(key)
+        if inject:
+            self.injected_rate_limits += 1
+            # A rejected request comes back fast
+            await asyncio.sleep(0.05 * self.latency_scale)
+        elif self.latency_scale > 0:
+            await asyncio.sleep(fixture.get("latency", 0.0) * self.latency_scale)
+        if not inject:
+            self.served += 1
+        return fixture, inject
+
+    async def replay_groq(self, messages: List[Dict[str, Any]], model: str, json_mode: bool, temperature: Optional[float]):
+        """Stand-in for a Groq request. Returns (ChatCompletion, headers) like LLMService._groq_chat."""
+        from groq import RateLimitError
+        from groq.types.chat import ChatCompletion
+
+        fixture, inject = await self._serve(messages, json_mode, temperature)
+        if inject:
+            response = httpx.Response(
+                429,
+                headers=REPLAY_RATE_LIMIT_HEADERS,
+                request=httpx.Request("POST", "https://api.groq.com/openai/v1/chat/completions")
+            )
+            raise RateLimitError("Injected rate limit (replay)", response=response, body=None)
+
+        prompt_tokens = fixture.get("prompt_tokens", 0)
+        completion_tokens = fixture.get("completion_tokens", 0)
+        completion = ChatCompletion.model_validate({
+            "id": f"replay-{fixture['key'][:12]}",
+            "object": "chat.completion",
+            "created": int(fixture.get("recorded_at", 0)),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "finish_reason": "stop",
+                "message": {"role": "assistant", "content": fixture["content"]}
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        })
+        return completion, {}
+
+    async def replay_ollama(self, messages: List[Dict[str, Any]], model: str, json_mode: bool, temperature: Optional[float]):
+        """Stand-in for an Ollama chat request. Returns an ollama.ChatResponse."""
+        import ollama
+
+        fixture, inject = await self._serve(messages, json_mode, temperature)
+        if inject:
+            raise ollama.ResponseError("Injected overload (replay)", status_code=429)
+        return ollama.ChatResponse(
+            model=model,
+            message=ollama.Message(role="assistant", content=fixture["content"]),
+            prompt_eval_count=fixture.get("prompt_tokens", 0),
+            eval_count=fixture.get("completion_tokens", 0)
+        )
+
+    async def replay_stream(self, messages: List[Dict[str, Any]], temperature: Optional[float], chunk_chars: int = 24) -> AsyncIterator[str]:
+        """Stand-in for a token stream: the recorded answer in small chunks."""
+        fixture, _ = await self._serve(messages, False, temperature)
+        content = fixture["content"]
+        for i in range(0, len(content), chunk_chars):
+            yield content[i:i + chunk_chars]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "directory": self.directory,
+            "served": self.served,
+            "misses": self.misses,
+            "recorded": self.recorded,
+            "injected_rate_limits": self.injected_rate_limits
+        }
+
+
+def _prompt_preview(messages: List[Dict[str, Any]], limit: int = 300) -> str:
+    texts = []
+    for msg in messages:
+        content = msg.get("content")
+        if isinstance(content, list):
+            texts.extend(part.get("text", "[image]") if part.get("type") == "text" else "[image]" for part in content)
+        elif content:
+            texts.append(str(content))
+    preview = " | ".join(t.strip() for t in texts)
+    return preview[:limit]
+
+
+llm_replay = LLMReplay()
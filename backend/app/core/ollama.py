@@ -1,14 +1,19 @@
+import time
 import ollama
 from app.core.config import settings
-from typing import List, Dict, Any, Optional
+from app.core.llm_replay import llm_replay
+from typing import List, Dict, Any, Optional, AsyncIterator
 
 class OllamaService:
     def __init__(self):
         self.base_url = settings.OLLAMA_BASE_URL
         self.model = settings.OLLAMA_MODEL
-        self.client = ollama.Client(host=self.base_url)
+        # Async client keeps one pooled connection to the Ollama server
+        # and never blocks the event loop while a model is generating.
+        self.client = ollama.AsyncClient(host=self.base_url)
 
-    def chat(self, messages: List[Dict[str, Any]], schema: Optional[Any] = None) -> str:
+    @staticmethod
+    def to_ollama_messages(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         # Adapter to convert OpenAI-style multimodal messages to Ollama format
         cleaned_messages = []
         for msg in messages:
@@ -39,16 +44,56 @@ class OllamaService:
                 cleaned_messages.append(new_msg)
             else:
                 cleaned_messages.append(msg)
+        return cleaned_messages
+
+    async def chat_response(self, messages: List[Dict[str, Any]], schema: Optional[Any] = None, temperature: Optional[float] = None):
+        """Full Ollama response, including prompt_eval_count/eval_count token counts."""
+        if llm_replay.replaying:
+            return await llm_replay.replay_ollama(messages, self.model, bool(schema), temperature)
+
+        cleaned_messages = self.to_ollama_messages(messages)
+        options = {"temperature": temperature} if temperature is not None else None
 
         try:
-            response = self.client.chat(
+            started = time.monotonic()
+            response = await self.client.chat(
                 model=self.model,
                 messages=cleaned_messages,
-                format="json" if schema else None
+                format="json" if schema else None,
+                options=options
             )
-            return response['message']['content']
+            if llm_replay.recording:
+                llm_replay.record(
+                    messages, bool(schema), temperature, "ollama", self.model,
+                    response['message']['content'],
+                    time.monotonic() - started,
+                    prompt_tokens=response.prompt_eval_count or 0,
+                    completion_tokens=response.eval_count or 0
+                )
+            return response
         except Exception as e:
             print(f"Ollama error: {e}")
             raise e
 
+    async def chat(self, messages: List[Dict[str, Any]], schema: Optional[Any] = None, temperature: Optional[float] = None) -> str:
+        response = await self.chat_response(messages, schema=schema, temperature=temperature)
+        return response['message']['content']
+
+    async def stream_chat(self, messages: List[Dict[str, Any]], temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """Yield content tokens as Ollama generates them."""
+        options = {"temperature": temperature} if temperature is not None else None
+        stream = await self.client.chat(
+            model=self.model,
+            messages=self.to_ollama_messages(messages),
+            options=options,
+            stream=True
+        )
+        async for chunk in stream:
+            content = chunk['message']['content']
+            if content:
+                yield content
+
+    async def aclose(self):
+        await self.client.close()
+
 ollama_service = OllamaService()
@@ -0,0 +1,110 @@
+"""
+Persistent per-page extraction cache.
+
+Editions are re-uploaded and re-run (retries after a failed page, prompt
+tweaks, reprocessing), and every page costs a tiered text extraction and an
+LLM or vision call. Page results are stored on local disk keyed by the PDF's
+SHA-256 and the page index, so a re-run only redoes the pages that did not
+succeed last time:
+
+- `extract:` the tiered text extraction (text, method, metrics). Versioned by
+  PAGE_EXTRACTOR_VERSION; bump it when PDFExtractor's tiers or normalization
+  change.
+- `articles:` the parsed VisionAgent articles for the page. Also versioned by
+  the provider and models of the primary text and vision routes and by
+  LLM_PROMPT_VERSION, so a prompt or model change invalidates them.
+
+Only pages that extracted cleanly on the primary routes are written;
+failures, partial pages and pages a fallback provider answered are retried
+on the next run. Storage is a `DiskCache` capped at
+PAGE_CACHE_MAX_BYTES with least-recently-used eviction.
+"""
+import asyncio
+import json
+from typing import Any, Dict, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.core.disk_cache import DiskCache
+from app.core.llm import LLMRoute, primary_route
+from app.schemas.layout import Article
+
+PAGE_EXTRACTOR_VERSION = "2"
+
+
+class PageCache:
+    def __init__(self):
+        self._cache = DiskCache(settings.PAGE_CACHE_PATH, max_bytes=settings.PAGE_CACHE_MAX_BYTES, name="pages")
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PAGE_CACHE_ENABLED
+
+    @staticmethod
+    def _extraction_key(pdf_hash: str, page_index: int) -> str:
+        return f"extract:{pdf_hash}:{page_index}:{PAGE_EXTRACTOR_VERSION}"
+
+    @staticmethod
+    def primary_routes() -> Set[LLMRoute]:
+        """Routes page extraction may be answered by for its articles to be cached."""
+        return {primary_route(), primary_route(settings.GROQ_VISION_MODEL)}
+
+    @staticmethod
+    def _articles_key(pdf_hash: str, page_index: int) -> str:
+        text_provider, text_model = primary_route()
+        _, vision_model = primary_route(settings.GROQ_VISION_MODEL)
+        return (
+            f"articles:{pdf_hash}:{page_index}:{PAGE_EXTRACTOR_VERSION}:"
+            f"{settings.LLM_PROMPT_VERSION}:{text_provider}:{text_model}:{vision_model}"
+        )
+
+    async def _get(self, key: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            raw = await asyncio.to_thread(self._cache.get, key)
+            return json.loads(raw) if raw is not None else None
+        except Exception as e:
+            print(f"[Page Cache] Lookup failed: {e}")
+            return None
+
+    async def _set(self, key: str, value: Any):
+        if not self.enabled:
+            return
+        try:
+            await asyncio.to_thread(self._cache.set, key, json.dumps(value, ensure_ascii=False))
+        except Exception as e:
+            print(f"[Page Cache] Store failed: {e}")
+
+    async def get_extraction(self, pdf_hash: str, page_index: int) -> Optional[Tuple[str, str, dict]]:
+        value = await self._get(self._extraction_key(pdf_hash, page_index))
+        if value is None:
+            return None
+        text, method, metrics = value
+        return text, method, metrics
+
+    async def set_extraction(self, pdf_hash: str, page_index: int, result: Tuple[str, str, dict]):
+        await self._set(self._extraction_key(pdf_hash, page_index), list(result))
+
+    async def get_articles(self, pdf_hash: str, page_index: int) -> Optional[List[Article]]:
+        value = await self._get(self._articles_key(pdf_hash, page_index))
+        if value is None:
+            return None
+        try:
+            return [Article.model_validate(item) for item in value]
+        except Exception as e:
+            print(f"[Page Cache] Discarding unreadable articles entry: {e}")
+            return None
+
+    async def set_articles(self, pdf_hash: str, page_index: int, articles: List[Article]):
+        await self._set(
+            self._articles_key(pdf_hash, page_index),
+            [article.model_dump(mode="json") for article in articles]
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {"enabled": self.enabled, "extractor_version": PAGE_EXTRACTOR_VERSION, **self._cache.stats()}
+
+    def close(self):
+        self._cache.close()
+
+
+page_cache = PageCache()
@@ -0,0 +1,172 @@
+"""
+Geometry-based segmentation of digital pages into article regions.
+
+`get_text("text", sort=True)` reads a broadsheet line by line across all
+columns, so neighbouring articles are interleaved and the model has to
+untangle a whole page at once. Instead, from the `get_text("dict")` blocks:
+
+1. Headline blocks are those whose largest span is HEADLINE_SIZE_FACTOR times
+   the page's body font size.
+2. A recursive XY-cut orders the blocks: at each node the gaps between block
+   extents are found with a sort and a running maximum over NumPy arrays; full
+   width horizontal gaps split bands first, then column gutters split columns.
+   The leaf order is the reading order.
+3. Each body block joins the nearest headline above it that overlaps it
+   horizontally (one vectorized blocks x headlines comparison). Blocks with
+   no headline above them (continuations, briefs) are grouped per XY-cut leaf.
+4. Regions smaller than VISION_SEGMENT_MIN_REGION_CHARS (folios, bylines,
+   teasers) are folded into their neighbour in reading order.
+
+Each region is normalized text, headline first, ready for its own extraction
+request. Without NumPy, `segment_page` returns no regions and callers keep
+using the whole-page text.
+"""
+from typing import Any, Dict, List, NamedTuple, Tuple
+from app.core.config import settings
+from app.core.page_triage import HEADLINE_SIZE_FACTOR
+from app.core.pdf_extractor import PDFExtractor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+COLUMN_GAP_FACTOR = 0.6 # min gutter width, in body font sizes
+ROW_GAP_FACTOR = 0.6 # min horizontal gap between bands, in body font sizes
+HEADLINE_OVERLAP = 0.3 # share of a block's width a headline must cover to own it
+
+
+class Region(NamedTuple):
+    headline: str
+    text: str
+    bbox: Tuple[float, float, float, float]
+    blocks: int
+
+
+def _blocks(layout: dict) -> List[Dict[str, Any]]:
+    blocks = []
+    for block in layout.get("blocks", []):
+        if block.get("type", 0) != 0:
+            continue
+        lines = ["".join(span["text"] for span in line["spans"]) for line in block.get("lines", [])]
+        text = "\n".join(line for line in lines if line.strip())
+        sizes = [(span["size"], len(span["text"].strip())) for line in block["lines"] for span in line["spans"]]
+        chars = sum(n for _, n in sizes)
+        if not chars:
+            continue
+        blocks.append({
+            "bbox": tuple(block["bbox"]),
+            "text": text,
+            "chars": chars,
+            "size": max(size for size, n in sizes if n),
+            "sizes": sizes
+        })
+    return blocks
+
+
+def _body_size(blocks: List[Dict[str, Any]]) -> float:
+    sizes = np.array([size for b in blocks for size, n in b["sizes"] if n])
+    weights = np.array([n for b in blocks for _, n in b["sizes"] if n], dtype=float)
+    order = np.argsort(sizes)
+    cumulative = np.cumsum(weights[order])
+    return float(sizes[order][np.searchsorted(cumulative, cumulative[-1] / 2)])
+
+
+def _gaps(lo: "np.ndarray", hi: "np.ndarray", min_gap: float) -> "np.ndarray":
+    """Cut positions where no extent [lo, hi] covers a gap of at least `min_gap`."""
+    order = np.argsort(lo, kind="stable")
+    lo, hi = lo[order], hi[order]
+    reach = np.maximum.accumulate(hi)
+    gaps = lo[1:] - reach[:-1]
+    where = np.nonzero(gaps >= min_gap)[0]
+    return (reach[where] + lo[where + 1]) / 2
+
+
+def xy_cut(boxes: "np.ndarray", column_gap: float, row_gap: float) -> List["np.ndarray"]:
+    """Leaves (arrays of box indices) in reading order: bands top to bottom, columns left to right."""
+    leaves: List[np.ndarray] = []
+    stack = [np.arange(len(boxes))]
+    while stack:
+        indices = stack.pop()
+        if len(indices) > 1:
+            sub = boxes[indices]
+            for lo_axis, hi_axis, min_gap in ((1, 3, row_gap), (0, 2, column_gap)):
+                cuts = _gaps(sub[:, lo_axis], sub[:, hi_axis], min_gap)
+                if len(cuts):
+                    labels = np.searchsorted(cuts, sub[:, lo_axis])
+                    # Pushed in reverse so the first part is processed first
+                    stack.extend(indices[labels == label] for label in range(len(cuts), -1, -1))
+                    break
+            else:
+                leaves.append(indices[np.lexsort((sub[:, 0], sub[:, 1]))])
+            continue
+        leaves.append(indices)
+    return leaves
+
+
+def segment_page(layout: dict) -> List[Region]:
+    if np is None:
+        return []
+    blocks = _blocks(layout)
+    if len(blocks) < 2:
+        return []
+
+    body_size = _body_size(blocks)
+    boxes = np.array([b["bbox"] for b in blocks], dtype=float)
+    leaves = xy_cut(boxes, body_size * COLUMN_GAP_FACTOR, body_size * ROW_GAP_FACTOR)
+
+    rank = np.empty(len(blocks), dtype=int)
+    leaf_of = np.empty(len(blocks), dtype=int)
+    position = 0
+    for leaf_index, leaf in enumerate(leaves):
+        rank[leaf] = np.arange(position, position + len(leaf))
+        leaf_of[leaf] = leaf_index
+        position += len(leaf)
+
+    is_headline = np.array([b["size"] >= body_size * HEADLINE_SIZE_FACTOR for b in blocks])
+    headlines = np.nonzero(is_headline)[0]
+
+    # owner[i]: headline block owning block i, or -(leaf + 1) for headline-less blocks
+    owner = -(leaf_of + 1)
+    owner[headlines] = headlines
+    body = np.nonzero(~is_headline)[0]
+    if len(headlines) and len(body):
+        h, b = boxes[headlines], boxes[body]
+        overlap = np.minimum(h[None, :, 2], b[:, None, 2]) - np.maximum(h[None, :, 0], b[:, None, 0])
+        widths = np.maximum(b[:, 2] - b[:, 0], 1.0)
+        above = h[None, :, 3] <= b[:, None, 1] + body_size * 0.5
+        candidates = above & (overlap >= widths[:, None] * HEADLINE_OVERLAP)
+        # Nearest = lowest headline bottom among the candidates
+        bottoms = np.where(candidates, h[None, :, 3], -np.inf)
+        nearest = np.argmax(bottoms, axis=1)
+        owned = candidates.any(axis=1)
+        owner[body[owned]] = headlines[nearest[owned]]
+
+    groups: Dict[int, List[int]] = {int(i): [int(i)] for i in headlines}
+    for i in np.argsort(rank):
+        if not is_headline[i]:
+            groups.setdefault(int(owner[i]), []).append(int(i))
+    ordered = sorted(groups.values(), key=lambda members: rank[members[0]] if is_headline[members[0]] else min(rank[m] for m in members))
+
+    regions: List[List[int]] = []
+    for members in ordered:
+        if regions and sum(blocks[m]["chars"] for m in regions[-1]) < settings.VISION_SEGMENT_MIN_REGION_CHARS:
+            regions[-1].extend(members)
+        else:
+            regions.append(list(members))
+    if len(regions) > 1 and sum(blocks[m]["chars"] for m in regions[-1]) < settings.VISION_SEGMENT_MIN_REGION_CHARS:
+        tail = regions.pop()
+        regions[-1].extend(tail)
+
+    results = []
+    for members in regions:
+        titles = [m for m in members if is_headline[m]]
+        headline = blocks[max(titles, key=lambda m: blocks[m]["size"])]["text"] if titles else ""
+        bbox = boxes[members]
+        results.append(Region(
+            headline=PDFExtractor.normalize_text(headline.replace("\n", " ")).strip(),
+            text=PDFExtractor.normalize_text("\n\n".join(blocks[m]["text"] for m in members)),
+            bbox=(float(bbox[:, 0].min()), float(bbox[:, 1].min()), float(bbox[:, 2].max()), float(bbox[:, 3].max())),
+            blocks=len(members)
+        ))
+    return results
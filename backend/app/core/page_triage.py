@@ -0,0 +1,226 @@
+"""
+Page triage before extraction.
+
+Sports, markets, world news, classifieds and puzzle pages are extracted and
+sent to the model only for the prompt to tell it to ignore them. Triage looks
+at each page with cheap PyMuPDF signals first and labels it:
+
+- `skip`: nothing for the government digest; no extraction, no LLM call.
+  Only decided on positive evidence: a readable text layer dominated by
+  off-topic terms, a listing page without headline type, or a blank page.
+  Missing government keywords alone never skip a page (keyword lists miss
+  too much), those pages go to `digital`. Pages without a usable text layer
+  are skipped when they are blank or when their raster has no text lines
+  (full-page ads, photos, weather graphics).
+- `vision`: no usable text layer but the raster is set in text lines (a
+  scan); go straight to the rasterized vision path instead of running the
+  text tiers.
+- `digital`: everything else, including text layers too garbled to read
+  keywords from; the extraction tiers decide as before.
+
+Signals: text chars and density from `get_text("dict")` spans, the corruption
+ratio of that text (app/core/text_quality.py), image area coverage, the
+font-size distribution (share of headline-sized type, body size against the
+page height), keyword hits for AP government entities and for off-topic
+sections (English and Telugu), and, for pages with little text, the ink ratio
+and text-line share of a grayscale preview.
+
+Image coverage cannot tell a scan from a photo page: a scan is one full-page
+image too, and e-paper editions embed a full-page image under their text
+layer. What tells them apart is texture. Body text rasterizes into short
+row runs (one per line) in every column, photos and ads into long solid
+runs, so the share of inked rows lying in line-height runs separates them
+(scans and e-paper pages 0.45-0.78, photo/ad pages under 0.05).
+"""
+import re
+from statistics import median
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+from app.core import text_quality
+from app.core.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+AP_GOVERNMENT_TERMS = [
+    # English
+    "andhra", "andhra pradesh", "amaravati", "chandrababu", "naidu", "lokesh", "pawan kalyan", "jagan",
+    "tdp", "ysrcp", "janasena", "ap govt", "ap government", "state government", "chief minister",
+    "collector", "district collector", "gvmc", "vmrda", "apsrtc", "sachivalayam", "mandal", "panchayat",
+    "secretariat", "legislative assembly", "government", "govt", "minister", "ministers", "cm", "mla",
+    "mlas", "municipal", "commissioner",
+    # Telugu (stems; any suffix may follow)
+    "ఆంధ్ర", "అమరావతి", "చంద్రబాబు", "లోకేశ్", "లోకేష్", "పవన్", "జగన్", "ముఖ్యమంత్రి", "సీఎం",
+    "ప్రభుత్వ", "మంత్రి", "కలెక్టర్", "ఎమ్మెల్యే", "మండల", "పంచాయతీ", "సచివాలయ", "జీవీఎంసీ", "పథక"
+]
+
+OFF_TOPIC_TERMS = [
+    # English
+    "cricket", "wicket", "wickets", "innings", "match", "matches", "tournament", "league", "squad",
+    "captain", "coach", "goal", "goals", "olympic", "olympics", "sensex", "nifty", "stocks", "shares",
+    "box office", "actor", "actress", "movie", "film", "horoscope", "sudoku", "crossword", "classifieds",
+    "matrimonial", "to let", "for sale", "weather", "forecast",
+    # Telugu
+    "క్రికెట్", "మ్యాచ్", "టోర్నీ", "సినిమా", "హీరో", "హీరోయిన్", "రాశి", "వాతావరణ", "సెన్సెక్స్"
+]
+
+HEADLINE_SIZE_FACTOR = 1.6 # spans this much larger than the median body size count as headline type
+NO_HEADLINE_SHARE = 0.002 # below this share of headline-sized chars the page is a listing, not news
+DISPLAY_FONT_RATIO = 12.0 # body size per 1000 pt of page height above which the text is display type (ads)
+PREVIEW_MAX_DIMENSION = 1000 # px, longest side of the grayscale preview for low-text pages
+DARK_PIXEL_BYTES = bytes(range(160)) # grayscale values counted as ink
+INK_LEVEL = 160
+LINE_STRIPS = 24 # column strips the row profile is taken over
+LINE_ROW_FILL = 0.02 # strip rows with at least this share of ink are inked
+TEXT_LINE_MAX_PT = 20.0 # inked row runs up to this height are text lines
+
+
+def _terms_re(terms: List[str]) -> "re.Pattern":
+    telugu = text_quality.TELUGU_RANGE
+    is_telugu = re.compile(f"[{telugu}]")
+
+    def alternation(words: List[str]) -> str:
+        return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+    english = alternation([t for t in terms if not is_telugu.search(t)])
+    stems = alternation([t for t in terms if is_telugu.search(t)])
+    # Telugu case markers attach to the word, so Telugu stems take any suffix
+    return re.compile(rf"(?<![\w{telugu}])(?:(?:{english})(?![\w{telugu}])|(?:{stems})[{telugu}]*)")
+
+
+AP_GOVERNMENT_RE = _terms_re(AP_GOVERNMENT_TERMS)
+OFF_TOPIC_RE = _terms_re(OFF_TOPIC_TERMS)
+
+
+class PageTriage(NamedTuple):
+    decision: str # skip / digital / vision
+    reason: str
+    signals: Dict[str, Any]
+
+
+def _rect_area(rect, page_rect) -> float:
+    x0, y0 = max(rect[0], page_rect[0]), max(rect[1], page_rect[1])
+    x1, y1 = min(rect[2], page_rect[2]), min(rect[3], page_rect[3])
+    return max(0.0, x1 - x0) * max(0.0, y1 - y0)
+
+
+def _text_and_sizes(layout: dict) -> Tuple[str, List[Tuple[float, int]]]:
+    lines = []
+    sizes = []
+    for block in layout.get("blocks", []):
+        for line in block.get("lines", []):
+            line_text = "".join(span["text"] for span in line["spans"])
+            lines.append(line_text)
+            for span in line["spans"]:
+                chars = len(span["text"].strip())
+                if chars:
+                    sizes.append((span["size"], chars))
+    return "\n".join(lines), sizes
+
+
+def ink_ratio(width: int, height: int, samples: bytes) -> float:
+    if not samples:
+        return 0.0
+    # Deleting the dark bytes leaves the light ones; the difference is ink
+    return (len(samples) - len(samples.translate(None, DARK_PIXEL_BYTES))) / len(samples)
+
+
+def text_line_share(width: int, height: int, samples: bytes, max_line_px: int) -> Optional[float]:
+    """Share of inked strip rows that lie in runs no taller than a text line; None without numpy."""
+    if np is None or not samples:
+        return None
+    ink = np.frombuffer(samples, dtype=np.uint8).reshape(height, width) < INK_LEVEL
+    strip = max(1, width // LINE_STRIPS)
+    inked = 0
+    in_lines = 0
+    for x in range(0, width - strip + 1, strip):
+        rows = ink[:, x:x + strip].mean(axis=1) >= LINE_ROW_FILL
+        edges = np.diff(np.concatenate(([0], rows.astype(np.int8), [0])))
+        runs = np.nonzero(edges == -1)[0] - np.nonzero(edges == 1)[0]
+        inked += int(runs.sum())
+        in_lines += int(runs[runs <= max_line_px].sum())
+    return in_lines / inked if inked else 0.0
+
+
+def _low_text(signals: Dict[str, Any]) -> bool:
+    return (signals["text_chars"] < settings.PAGE_TRIAGE_MIN_TEXT_CHARS
+            or signals["text_density"] < settings.PAGE_TRIAGE_MIN_TEXT_DENSITY)
+
+
+def collect_signals(session, page_index: int) -> Dict[str, Any]:
+    layout = session.page_layout(page_index)
+    width, height = layout["width"], layout["height"]
+    page_rect = (0.0, 0.0, width, height)
+    page_area = max(1.0, width * height)
+
+    text, sizes = _text_and_sizes(layout)
+    quality = text_quality.assess(text)
+    text_chars = sum(chars for _, chars in sizes)
+
+    body_size = 0.0
+    headline_share = 0.0
+    if sizes:
+        body_size = median(size for size, chars in sizes for _ in range(min(chars, 50)))
+        headline_chars = sum(chars for size, chars in sizes if size >= body_size * HEADLINE_SIZE_FACTOR)
+        headline_share = headline_chars / max(1, text_chars)
+
+    lowered = text.lower()
+    signals = {
+        "text_chars": text_chars,
+        "text_density": round(text_chars / page_area * 1000, 3), # chars per 1000 pt^2
+        "corruption_ratio": round(quality.corruption_ratio, 4) if text else None,
+        "fffds": quality.fffd_count,
+        "image_coverage": round(min(1.0, sum(_rect_area(r, page_rect) for r in layout.get("images", [])) / page_area), 3),
+        "body_font_size": round(body_size, 1),
+        "body_font_ratio": round(body_size / max(1.0, height) * 1000, 2), # body size per 1000 pt of page height
+        "headline_share": round(headline_share, 4),
+        "government_hits": len(AP_GOVERNMENT_RE.findall(lowered)),
+        "off_topic_hits": len(OFF_TOPIC_RE.findall(lowered))
+    }
+    if settings.PAGE_TRIAGE_THUMBNAIL and _low_text(signals):
+        preview_w, preview_h, samples = session.render_page_gray(page_index, PREVIEW_MAX_DIMENSION)
+        signals["ink_ratio"] = round(ink_ratio(preview_w, preview_h, samples), 4)
+        lines = text_line_share(preview_w, preview_h, samples, max(2, round(TEXT_LINE_MAX_PT * preview_h / max(1.0, height))))
+        if lines is not None:
+            signals["text_line_share"] = round(lines, 3)
+    return signals
+
+
+def decide(signals: Dict[str, Any]) -> Tuple[str, str]:
+    if _low_text(signals):
+        if signals["text_chars"] >= settings.PAGE_TRIAGE_MIN_TEXT_CHARS and signals["government_hits"] >= settings.PAGE_TRIAGE_MIN_KEYWORD_HITS:
+            return "digital", f"sparse text layer with {signals['government_hits']} AP government mentions"
+        ink = signals.get("ink_ratio")
+        if ink is not None and ink < settings.PAGE_TRIAGE_BLANK_INK_RATIO:
+            return "skip", "blank page"
+        if signals["text_chars"] and signals.get("body_font_ratio", 0.0) >= DISPLAY_FONT_RATIO:
+            return "skip", f"full-page ad/photo (only display type, body {signals['body_font_size']} pt)"
+        lines = signals.get("text_line_share")
+        if lines is not None and lines < settings.PAGE_TRIAGE_MIN_TEXT_LINE_SHARE:
+            kind = "ad/photo" if signals["image_coverage"] >= 0.5 else "graphic"
+            return "skip", f"full-page {kind} ({lines:.0%} text-line rows, images cover {signals['image_coverage']:.0%})"
+        return "vision", "no usable text layer"
+
+    if signals["fffds"] or signals["corruption_ratio"] > 0.15:
+        return "digital", "text layer too garbled for keywords; extraction tiers decide"
+
+    government = signals["government_hits"]
+    off_topic = signals["off_topic_hits"]
+    if off_topic >= settings.PAGE_TRIAGE_OFF_TOPIC_MIN_HITS and off_topic >= government * settings.PAGE_TRIAGE_OFF_TOPIC_RATIO:
+        return "skip", f"off-topic section ({off_topic} off-topic vs {government} government terms)"
+    if signals["headline_share"] < NO_HEADLINE_SHARE and government < settings.PAGE_TRIAGE_MIN_KEYWORD_HITS * 3:
+        return "skip", "no headline type (classifieds or listings)"
+    if government < settings.PAGE_TRIAGE_MIN_KEYWORD_HITS:
+        return "digital", f"no AP government keywords ({off_topic} off-topic terms); extraction decides"
+    return "digital", f"{government} AP government mentions"
+
+
+def triage_page(session, page_index: int) -> PageTriage:
+    """Blocking; call through `asyncio.to_thread`. Any failure errs towards extracting the page."""
+    try:
+        signals = collect_signals(session, page_index)
+    except Exception as e:
+        return PageTriage("digital", f"triage failed: {e}", {})
+    decision, reason = decide(signals)
+    return PageTriage(decision, reason, signals)
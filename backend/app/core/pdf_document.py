@@ -0,0 +1,241 @@
+"""
+One open PDF per pipeline run.
+
+`PDFDocumentSession` opens the document with PyMuPDF once and caches per-page
+text for every extraction tier, so page tasks stop re-parsing the xref and
+font tables:
+
+- PyMuPDF: the single open document, one page at a time on demand.
+- pdfminer: per page, memoized. Its cost is layout analysis of each page
+  it is given, so parsing the whole document when one page falls through
+  PyMuPDF would only add work.
+- poppler: the whole document is converted once on first use and split on
+  form feeds (one `\f` per page), instead of one subprocess per page.
+- The tiered result per page, so agents sharing a session never redo a page.
+- Page rasters for the vision fallback, rendered from the same document.
+- Page layout (`get_text("dict")` spans plus image placements) for triage.
+
+Sessions are reference counted per path through `open_document`, so the
+agents of one run share a handle and it is closed (and caches dropped) as
+soon as the last user exits.
+
+Worker processes (app/core/pdf_workers.py) open their own sessions with
+`whole_document_tiers=False`: pages are already spread across processes, so
+each worker parses only the pages it is given.
+"""
+import hashlib
+import logging
+import os
+import subprocess
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fitz  # PyMuPDF
+except ImportError:
+    fitz = None
+
+logger = logging.getLogger(__name__)
+
+
+def _split_pages(text: str, page_count: int) -> List[Optional[str]]:
+    pages: List[Optional[str]] = text.split("\f")[:page_count]
+    return pages + [None] * (page_count - len(pages))
+
+
+class PDFDocumentSession:
+    def __init__(self, file_path: str, whole_document_tiers: bool = True):
+        self.file_path = file_path
+        self.whole_document_tiers = whole_document_tiers
+        self._doc = None
+        self._page_count: Optional[int] = None
+        self._sha256: Optional[str] = None
+        self._pymupdf_text: Dict[int, Optional[str]] = {}
+        self._poppler_pages: Optional[List[Optional[str]]] = None
+        self._page_fallback_text: Dict[Tuple[str, int], Optional[str]] = {}
+        self._tiered: Dict[int, Tuple[str, str, dict]] = {}
+        self._layouts: Dict[int, dict] = {}
+        # PyMuPDF documents are not thread-safe; tiers parse at most once
+        self._doc_lock = threading.RLock()
+        self._poppler_lock = threading.Lock()
+        self.closed = False
+
+    @property
+    def doc(self):
+        if self.closed:
+            raise ValueError(f"PDF session for {self.file_path} is closed")
+        if self._doc is None:
+            with self._doc_lock:
+                if self._doc is None:
+                    if not fitz:
+                        raise RuntimeError("PyMuPDF is not installed")
+                    self._doc = fitz.open(self.file_path)
+        return self._doc
+
+    @property
+    def page_count(self) -> int:
+        if self._page_count is None:
+            self._page_count = len(self.doc)
+        return self._page_count
+
+    @property
+    def sha256(self) -> str:
+        """Content hash of the file, so re-uploads of the same edition share cache entries."""
+        if self._sha256 is None:
+            digest = hashlib.sha256()
+            with open(self.file_path, "rb") as f:
+                for block in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(block)
+            self._sha256 = digest.hexdigest()
+        return self._sha256
+
+    def pymupdf_text(self, page_index: int) -> Optional[str]:
+        if page_index not in self._pymupdf_text:
+            try:
+                with self._doc_lock:
+                    text = self.doc.load_page(page_index).get_text("text", sort=True)
+            except Exception as e:
+                logger.error(f"PyMuPDF extraction failed: {e}")
+                text = None
+            self._pymupdf_text[page_index] = text
+        return self._pymupdf_text[page_index]
+
+    def pdfminer_text(self, page_index: int) -> Optional[str]:
+        key = ("pdfminer", page_index)
+        if key not in self._page_fallback_text:
+            from app.core.pdf_extractor import PDFExtractor
+            self._page_fallback_text[key] = PDFExtractor.extract_with_pdfminer(self.file_path, page_index)
+        return self._page_fallback_text[key]
+
+    def poppler_text(self, page_index: int) -> Optional[str]:
+        if not self.whole_document_tiers:
+            key = ("poppler", page_index)
+            if key not in self._page_fallback_text:
+                from app.core.pdf_extractor import PDFExtractor
+                self._page_fallback_text[key] = PDFExtractor.extract_with_poppler(self.file_path, page_index)
+            return self._page_fallback_text[key]
+        if self._poppler_pages is None:
+            with self._poppler_lock:
+                if self._poppler_pages is None:
+                    self._poppler_pages = self._run_poppler()
+        return self._poppler_pages[page_index] if page_index < len(self._poppler_pages) else None
+
+    def _run_poppler(self) -> List[Optional[str]]:
+        poppler_bin = "pdftotext"
+        local_poppler_path = os.path.join(os.getcwd(), "deps", "poppler", "poppler-24.02.0", "Library", "bin", "pdftotext.exe")
+        if os.path.exists(local_poppler_path):
+            poppler_bin = local_poppler_path
+        try:
+            cmd = [poppler_bin, "-enc", "UTF-8", self.file_path, "-"]
+            result = subprocess.run(cmd, capture_output=True, text=True, check=True, encoding='utf-8', errors='ignore')
+            return _split_pages(result.stdout, self.page_count)
+        except Exception as e:
+            logger.error(f"Poppler pdftotext failed: {e}")
+            return [None] * self.page_count
+
+    def page_layout(self, page_index: int) -> dict:
+        """
+        Text blocks/lines/spans with fonts and bboxes (image bytes excluded),
+        image placements and page size; memoized per page.
+        """
+        if page_index not in self._layouts:
+            with self._doc_lock:
+                page = self.doc.load_page(page_index)
+                layout = page.get_text("dict", flags=fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES, sort=True)
+                layout["images"] = [info["bbox"] for info in page.get_image_info()]
+            self._layouts[page_index] = layout
+        return self._layouts[page_index]
+
+    def page_size(self, page_index: int) -> Tuple[float, float]:
+        with self._doc_lock:
+            rect = self.doc.load_page(page_index).rect
+        return rect.width, rect.height
+
+    def render_page_pixmap(self, page_index: int, zoom: float, clip: Optional[Tuple[float, float, float, float]] = None):
+        """RGB pixmap of the page (or of `clip`, in PDF points) at `zoom` x 72 dpi."""
+        with self._doc_lock:
+            page = self.doc.load_page(page_index)
+            return page.get_pixmap(
+                matrix=fitz.Matrix(zoom, zoom),
+                colorspace=fitz.csRGB,
+                alpha=False,
+                clip=fitz.Rect(clip) if clip else None
+            )
+
+    def render_page_gray(self, page_index: int, max_dimension: int) -> Tuple[int, int, bytes]:
+        """Small grayscale raster (width, height, samples) for cheap ink checks."""
+        with self._doc_lock:
+            page = self.doc.load_page(page_index)
+            zoom = max_dimension / max(page.rect.width, page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csGRAY, alpha=False)
+        return pix.width, pix.height, pix.samples
+
+    def render_page_jpeg(self, page_index: int, max_dpi: int, max_dimension: int, jpeg_quality: int) -> bytes:
+        """
+        Rasterize a page at the largest zoom that respects both max_dpi and
+        max_dimension (longest side, px), encoded once as JPEG in memory.
+        """
+        with self._doc_lock:
+            page = self.doc.load_page(page_index)
+            rect = page.rect
+            zoom = min(max_dpi / 72.0, max_dimension / max(rect.width, rect.height))
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), colorspace=fitz.csRGB, alpha=False)
+        return pix.tobytes("jpeg", jpg_quality=jpeg_quality)
+
+    def extract_page_tiered(self, page_index: int) -> Tuple[str, str, dict]:
+        """PDFExtractor.extract_page_tiered over this session's cached tiers; memoized per page."""
+        if page_index not in self._tiered:
+            from app.core.pdf_extractor import PDFExtractor
+            self._tiered[page_index] = PDFExtractor.extract_page_tiered(self.file_path, page_index, session=self)
+        return self._tiered[page_index]
+
+    def cached_tiered(self, page_index: int) -> Optional[Tuple[str, str, dict]]:
+        return self._tiered.get(page_index)
+
+    def store_tiered(self, page_index: int, result: Tuple[str, str, dict]):
+        """Record a tiered result computed elsewhere (e.g. in a worker process)."""
+        self._tiered[page_index] = result
+
+    def close(self):
+        with self._doc_lock:
+            if self._doc is not None:
+                self._doc.close()
+                self._doc = None
+            self._pymupdf_text.clear()
+            self._poppler_pages = None
+            self._page_fallback_text.clear()
+            self._tiered.clear()
+            self._layouts.clear()
+            self.closed = True
+
+    def __enter__(self) -> "PDFDocumentSession":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_sessions: Dict[str, Tuple[PDFDocumentSession, int]] = {}
+_sessions_lock = threading.Lock()
+
+
+@contextmanager
+def open_document(file_path: str) -> Iterator[PDFDocumentSession]:
+    """Shared session for `file_path`; closed when the last concurrent user exits."""
+    key = os.path.abspath(file_path)
+    with _sessions_lock:
+        session, users = _sessions.get(key, (None, 0))
+        if session is None:
+            session = PDFDocumentSession(file_path)
+        _sessions[key] = (session, users + 1)
+    try:
+        yield session
+    finally:
+        with _sessions_lock:
+            session, users = _sessions[key]
+            if users <= 1:
+                del _sessions[key]
+                session.close()
+            else:
+                _sessions[key] = (session, users - 1)
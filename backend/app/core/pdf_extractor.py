@@ -1,9 +1,8 @@
 import os
-import re
-import unicodedata
 import subprocess
 from typing import Optional, Tuple, List
 import logging
+from app.core import text_quality
 
 try:
     import fitz  # PyMuPDF
@@ -27,73 +26,24 @@ class PDFExtractor:
     4. Fallback to vision (indicated by returning None or low quality score)
     """
 
-    TELUGU_RANGE = r'\u0C00-\u0C7F'
-    # Added common newspaper punctuation, quotes, and zero-width characters used in Indic scripts
-    STANDARD_PUNCT = r'\s\.,!\?\(\)\[\]\{\}:;"\'\/\\%\$\#\*\+\-\=_@\|«»„""‘’' + r'\u200B\u200C\u200D\u2010-\u201F'
-    ALPHANUM = r'a-zA-Z0-9'
-    
-    # Combined allowed characters: Telugu + Standard Punct + Alphanum
-    ALLOWED_CHARS_RE = re.compile(f'[^{TELUGU_RANGE}{STANDARD_PUNCT}{ALPHANUM}]')
+    # Character set and scoring live in app/core/text_quality.py
+    TELUGU_RANGE = text_quality.TELUGU_RANGE
+    STANDARD_PUNCT = text_quality.STANDARD_PUNCT
+    ALPHANUM = text_quality.ALPHANUM
+    ALLOWED_CHARS_RE = text_quality.DISALLOWED_CHAR_RE
 
     @staticmethod
     def normalize_text(text: str) -> str:
-        if not text:
-            return ""
-        
-        # 1. NFC/NFKC normalization
-        text = unicodedata.normalize('NFKC', text)
-        
-        # 2. Replace non-breaking spaces and zero-width characters
-        text = text.replace('\u00A0', ' ')  # NBSP
-        text = text.replace('\u200B', '')   # Zero-width space
-        text = text.replace('\u200C', '')   # ZWNJ (sometimes needed in Telugu, but user asked to remove zero-width chars)
-        text = text.replace('\u200D', '')   # ZWJ
-        
-        # 3. Remove control characters outside Telugu and standard range
-        # We keep Telugu, alphanum, and standard punctuation. 
-        # Everything else is removed or replaced if it's a control char.
-        # However, let's keep newlines as they preserve layout.
-        
-        def filter_chars(char):
-            if char in '\n\r\t':
-                return char
-            if PDFExtractor.ALLOWED_CHARS_RE.match(char):
-                # If it matches the "NOT ALLOWED" regex, it's a candidate for removal
-                # but we should be careful not to remove valid Telugu characters.
-                # The regex [^\u0C00-\u0C7F...] matches everything EXCEPT Telugu etc.
-                return ''
-            return char
-
-        # Simplified filter using regex
-        # We want to keep: Telugu, Alphanum, Punctuation, and common whitespace (space, nl, tab)
-        # We want to remove: Control characters, Mojibake, etc.
-        
-        # Actually, let's just use the inverse of allowed
-        cleaned = "".join(filter_chars(c) for c in text)
-        return cleaned
+        """NFKC, drop NBSP/zero-width characters and anything outside Telugu, alphanumerics and punctuation."""
+        return text_quality.normalize(text)
 
     @staticmethod
     def calculate_corruption_ratio(text: str) -> Tuple[float, int]:
         """
         Returns (corruption_ratio, fffd_count)
         """
-        if not text:
-            return 1.0, 0
-        
-        fffd_count = text.count('\uFFFD')
-        
-        # Mojibake detection: characters that are unlikely in Telugu or English text
-        # If we see many unexpected characters, it's likely corrupt.
-        # For simplicity, we can count characters outside our allowed set (excluding whitespace)
-        total_len = len(text)
-        if total_len == 0:
-            return 0.0, 0
-            
-        # Count characters that are NOT Telugu, English Alphanum, or Standard Punct
-        unexpected_chars = len(PDFExtractor.ALLOWED_CHARS_RE.findall(text))
-        
-        corruption_ratio = unexpected_chars / total_len
-        return corruption_ratio, fffd_count
+        quality = text_quality.assess(text)
+        return quality.corruption_ratio, quality.fffd_count
 
     @classmethod
     def extract_with_pymupdf(cls, file_path: str, page_index: int) -> Optional[str]:
@@ -145,9 +95,11 @@ class PDFExtractor:
             return None
 
     @classmethod
-    def extract_page_tiered(cls, file_path: str, page_index: int) -> Tuple[str, str, dict]:
+    def extract_page_tiered(cls, file_path: str, page_index: int, session=None) -> Tuple[str, str, dict]:
         """
         Executes the tiered strategy for a single page.
+        With a PDFDocumentSession (app/core/pdf_document.py) the tiers read from
+        its already-open document and once-per-document parses.
         Returns: (extracted_text, method_used, metrics)
         """
         metrics = {
@@ -155,11 +107,12 @@ class PDFExtractor:
         }
         
         # 1. PyMuPDF
-        text = cls.extract_with_pymupdf(file_path, page_index)
+        text = session.pymupdf_text(page_index) if session else cls.extract_with_pymupdf(file_path, page_index)
         method = "pymupdf"
         if text:
-            ratio, fffds = cls.calculate_corruption_ratio(text)
-            metrics["attempts"].append({"method": "pymupdf", "ratio": ratio, "fffds": fffds})
+            quality = text_quality.assess(text)
+            ratio, fffds = quality.corruption_ratio, quality.fffd_count
+            metrics["attempts"].append({"method": "pymupdf", "ratio": ratio, "fffds": fffds, "scripts": quality.scripts, "sampled": quality.sampled})
             
             # Thresholds: ratio > 0.15 or any FFFD (relaxed slightly)
             if fffds > 0 or ratio > 0.15:
@@ -170,11 +123,12 @@ class PDFExtractor:
 
         # 2. pdfminer.six
         if text is None:
-            text = cls.extract_with_pdfminer(file_path, page_index)
+            text = session.pdfminer_text(page_index) if session else cls.extract_with_pdfminer(file_path, page_index)
             method = "pdfminer"
             if text:
-                ratio, fffds = cls.calculate_corruption_ratio(text)
-                metrics["attempts"].append({"method": "pdfminer", "ratio": ratio, "fffds": fffds})
+                quality = text_quality.assess(text)
+                ratio, fffds = quality.corruption_ratio, quality.fffd_count
+                metrics["attempts"].append({"method": "pdfminer", "ratio": ratio, "fffds": fffds, "scripts": quality.scripts, "sampled": quality.sampled})
                 if fffds > 0 or ratio > 0.1:
                     logger.info(f"Page {page_index} pdfminer corrupt. Trying poppler...")
                     text = None
@@ -183,11 +137,12 @@ class PDFExtractor:
 
         # 3. Poppler pdftotext
         if text is None:
-            text = cls.extract_with_poppler(file_path, page_index)
+            text = session.poppler_text(page_index) if session else cls.extract_with_poppler(file_path, page_index)
             method = "poppler"
             if text:
-                ratio, fffds = cls.calculate_corruption_ratio(text)
-                metrics["attempts"].append({"method": "poppler", "ratio": ratio, "fffds": fffds})
+                quality = text_quality.assess(text)
+                ratio, fffds = quality.corruption_ratio, quality.fffd_count
+                metrics["attempts"].append({"method": "poppler", "ratio": ratio, "fffds": fffds, "scripts": quality.scripts, "sampled": quality.sampled})
                 if fffds > 0 or ratio > 0.1:
                     logger.info(f"Page {page_index} poppler corrupt. Fallback to vision.")
                     text = None
@@ -0,0 +1,106 @@
+"""
+Process pool for CPU-bound page extraction.
+
+PyMuPDF text extraction, pdfminer, the pdftotext subprocess and
+`PDFExtractor.normalize_text` are all synchronous and CPU-heavy. Run inline
+they serialize every page onto one core and stall the event loop (and with it
+every other request the API is serving). Pages are instead submitted to a
+`ProcessPoolExecutor` and awaited as futures.
+
+Each worker keeps a small LRU of open `PDFDocumentSession`s so consecutive
+pages of the same edition reuse one document handle inside that worker.
+
+PDF_WORKER_PROCESSES: 0 = one worker per CPU, 1 = no pool (extraction runs in
+a thread of the API process, still off the event loop).
+"""
+import asyncio
+import atexit
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+from app.core.config import settings
+
+# Per worker process: (path, mtime) -> PDFDocumentSession
+_worker_sessions: "OrderedDict[Tuple[str, float], object]" = OrderedDict()
+
+
+def _worker_session(file_path: str):
+    from app.core.pdf_document import PDFDocumentSession
+
+    key = (os.path.abspath(file_path), os.path.getmtime(file_path))
+    session = _worker_sessions.get(key)
+    if session is not None:
+        _worker_sessions.move_to_end(key)
+        return session
+
+    session = PDFDocumentSession(file_path, whole_document_tiers=False)
+    _worker_sessions[key] = session
+    while len(_worker_sessions) > settings.PDF_WORKER_SESSION_CACHE:
+        _, evicted = _worker_sessions.popitem(last=False)
+        evicted.close()
+    return session
+
+
+def _extract_page_in_worker(file_path: str, page_index: int) -> Tuple[str, str, dict]:
+    return _worker_session(file_path).extract_page_tiered(page_index)
+
+
+class PDFWorkerPool:
+    def __init__(self):
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def processes(self) -> int:
+        configured = settings.PDF_WORKER_PROCESSES
+        return configured if configured > 0 else (os.cpu_count() or 1)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    # spawn: the API process holds threads and model weights that must not be forked
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.processes,
+                        mp_context=multiprocessing.get_context("spawn")
+                    )
+        return self._executor
+
+    async def extract_page(self, session, page_index: int) -> Tuple[str, str, dict]:
+        """
+        Tiered extraction of one page of `session`'s document, off the event loop.
+        Results persist in the page cache, so a re-run of the same PDF skips extraction.
+        """
+        from app.core.page_cache import page_cache
+
+        cached = session.cached_tiered(page_index)
+        if cached is not None:
+            return cached
+
+        pdf_hash = await asyncio.to_thread(lambda: session.sha256)
+        cached = await page_cache.get_extraction(pdf_hash, page_index)
+        if cached is not None:
+            session.store_tiered(page_index, cached)
+            return cached
+
+        if self.processes <= 1:
+            result = await asyncio.to_thread(session.extract_page_tiered, page_index)
+        else:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._get_executor(), _extract_page_in_worker, session.file_path, page_index)
+            session.store_tiered(page_index, result)
+        await page_cache.set_extraction(pdf_hash, page_index, result)
+        return result
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+pdf_workers = PDFWorkerPool()
+atexit.register(pdf_workers.shutdown)
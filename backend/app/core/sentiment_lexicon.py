@@ -0,0 +1,234 @@
+"""
+Weighted English/Telugu sentiment lexicon.
+
+All terms and negators are compiled into one regex, so an article is scanned
+once regardless of lexicon size; `score_many` joins a whole batch and scans
+it in a single pass, splitting the matches back per article by offset. Boundaries are script-aware: Python's `\b`
+splits Telugu words at vowel signs (combining marks are not `\w`), so the
+left boundary is spelled out over word chars and the Telugu block instead.
+
+- English terms match whole words with a few inflection suffixes
+  ("win" matches "wins", never "window").
+- Telugu terms match as stems followed by any Telugu suffix, because case
+  markers and postpositions attach to the word (అభివృద్ధికి, ప్రమాదంలో).
+- Negation: an English negator up to two words before a term, or a Telugu
+  negator right after it (లేదు, కాదు, ... follow the word they negate),
+  flips the term's sign at NEGATED_WEIGHT of its strength: "no deaths
+  reported" is relief, not a celebration. Negated hits don't count towards
+  `hits`, so articles resting on them still go to the LLM.
+
+Headline hits count double. Confidence grows with the polarity margin and
+the amount of evidence, so a single weak word never yields a confident label.
+"""
+import re
+from typing import Dict, Iterable, List, NamedTuple, Tuple
+
+ENGLISH_LEXICON: Dict[str, float] = {
+    # Positive
+    "growth": 1.0, "success": 1.5, "successful": 1.5, "victory": 1.5, "win": 1.0, "won": 1.0,
+    "profit": 1.0, "gain": 1.0, "improve": 1.0, "improvement": 1.0, "record": 0.5, "boost": 1.0,
+    "welfare": 0.8, "benefit": 1.0, "inaugurate": 0.8, "launch": 0.5, "approve": 0.8,
+    "sanction": 0.8, "achieve": 1.2, "achievement": 1.2, "award": 1.2, "progress": 1.0,
+    "relief": 1.0, "celebrate": 1.2, "praise": 1.5, "hail": 1.0, "development": 0.8,
+    "happy": 1.0, "resolve": 0.8, "milestone": 1.2,
+    # Negative
+    "loss": -1.0, "lose": -1.0, "lost": -1.0, "fail": -1.5, "failure": -1.5, "defeat": -1.5,
+    "crash": -1.5, "crisis": -1.5, "accident": -1.5, "death": -2.0, "dead": -2.0, "die": -2.0,
+    "kill": -2.0, "disaster": -2.0, "warning": -1.0, "protest": -1.0, "strike": -0.8,
+    "corruption": -2.0, "scam": -2.0, "fraud": -2.0, "arrest": -1.0, "attack": -1.5,
+    "murder": -2.0, "flood": -1.0, "drought": -1.5, "shortage": -1.2, "delay": -0.8,
+    "damage": -1.2, "injure": -1.5, "collapse": -1.5, "allege": -1.0, "allegation": -1.0,
+    "criticise": -1.0, "criticize": -1.0, "condemn": -1.2, "violence": -1.8, "suicide": -2.0,
+    "clash": -1.5, "dharna": -1.0, "agitation": -1.0
+}
+
+TELUGU_LEXICON: Dict[str, float] = {
+    # Positive
+    "అభివృద్ధి": 0.8,   # development
+    "విజయం": 1.5,       # victory
+    "విజయవంత": 1.5,     # successful
+    "ప్రారంభ": 0.5,     # inauguration / start
+    "సంక్షేమ": 0.8,     # welfare
+    "మంజూరు": 0.8,      # sanctioned
+    "ప్రగతి": 1.0,      # progress
+    "లబ్ధి": 1.0,       # benefit
+    "ప్రశంస": 1.5,      # praise
+    "సాయం": 0.8,        # help
+    "సహాయం": 0.8,       # assistance
+    "ఆనందం": 1.0,       # joy
+    "ఘనంగా": 1.0,       # grandly
+    "పరిష్కార": 1.0,    # solution / resolved
+    "శుభవార్త": 1.5,    # good news
+    "అవార్డు": 1.2,     # award
+    # Negative
+    "ప్రమాద": -1.5,     # accident / danger
+    "మృతి": -2.0,       # death
+    "మరణ": -2.0,        # death
+    "హత్య": -2.0,       # murder
+    "దాడి": -1.5,       # attack
+    "నష్ట": -1.2,       # loss
+    "ఆందోళన": -1.0,     # agitation / concern
+    "నిరసన": -1.0,      # protest
+    "విమర్శ": -1.0,     # criticism
+    "అవినీతి": -2.0,    # corruption
+    "వైఫల్య": -1.5,     # failure
+    "సమస్య": -0.8,      # problem
+    "ఇబ్బంది": -1.0,    # trouble
+    "అరెస్టు": -1.0,    # arrest
+    "వరద": -1.0,        # flood
+    "కరువు": -1.5,      # drought
+    "ఆరోపణ": -1.0,      # allegation
+    "ధర్నా": -1.0,      # dharna
+    "మోసం": -1.5        # fraud
+}
+
+ENGLISH_NEGATORS = ["not", "no", "never", "without", "hardly", "nor", "neither", "cannot", "didn't", "doesn't", "don't", "isn't", "wasn't"]
+TELUGU_NEGATORS = ["లేదు", "లేని", "కాదు", "కాలేదు", "లేకుండా", "లేక"]
+
+TELUGU_CHARS = "ఀ-౿"
+ENGLISH_SUFFIXES = r"(?:s|es|ed|d|ing|ly)?"
+HEADLINE_WEIGHT = 2.0
+NEGATION_MAX_GAP_WORDS = 2
+NEGATED_WEIGHT = 0.5 # share of a term's weight kept, sign flipped, when it is negated
+EVIDENCE_SATURATION = 4.0 # absolute weight at which evidence stops adding confidence
+NEUTRAL_BAND = 0.2
+
+
+def _alternation(words: Iterable[str]) -> str:
+    # Longest first so "successful" wins over "success"
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+SENTIMENT_RE = re.compile(
+    rf"(?<![\w{TELUGU_CHARS}])(?:"
+    rf"(?P<en_neg>{_alternation(ENGLISH_NEGATORS)})(?![\w{TELUGU_CHARS}])"
+    rf"|(?P<en>{_alternation(ENGLISH_LEXICON)}){ENGLISH_SUFFIXES}(?![\w{TELUGU_CHARS}])"
+    rf"|(?P<te_neg>{_alternation(TELUGU_NEGATORS)})[{TELUGU_CHARS}]*"
+    rf"|(?P<te>{_alternation(TELUGU_LEXICON)})(?P<te_suffix>[{TELUGU_CHARS}]*)"
+    rf")"
+)
+SENTENCE_BREAK_RE = re.compile(r"[.!?;।\n]")
+TELUGU_SUFFIX_NEGATION_RE = re.compile(f"(?:{_alternation(TELUGU_NEGATORS)})$")
+
+
+class LexiconScore(NamedTuple):
+    label: str
+    confidence: float
+    positive: float
+    negative: float
+    hits: int
+    negated: int
+
+
+def _score_segments(texts: List[str]) -> List[Tuple[float, float, int, int]]:
+    """
+    (positive weight, negative weight, plain term hits, negated term hits) for
+    each text, from one scan over all of them joined by newlines. Negation
+    never reaches across texts.
+    """
+    if not texts:
+        return []
+    texts = [text.lower() for text in texts]
+    ends = []
+    offset = 0
+    for text in texts:
+        offset += len(text)
+        ends.append(offset)
+        offset += 1 # the joining newline
+    results: List[Tuple[float, float, int, int]] = []
+
+    positive = negative = 0.0
+    hits = negated = 0
+    last_en_negator_end = -1
+    # A Telugu term is held back one match so a following negator can flip it
+    held: List[Tuple[float, bool]] = []
+
+    def add(weight: float, is_negated: bool):
+        nonlocal positive, negative, hits, negated
+        if is_negated:
+            weight = -weight * NEGATED_WEIGHT
+            negated += 1
+        else:
+            hits += 1
+        if weight > 0:
+            positive += weight
+        else:
+            negative -= weight
+
+    def flush():
+        for weight, is_negated in held:
+            add(weight, is_negated)
+        held.clear()
+
+    text = "\n".join(texts)
+    last_end = 0
+    for match in SENTIMENT_RE.finditer(text):
+        while match.start() > ends[len(results)]:
+            # Past the end of the current text: close it and start the next one fresh
+            flush()
+            results.append((positive, negative, hits, negated))
+            positive = negative = 0.0
+            hits = negated = 0
+            last_en_negator_end = -1
+            last_end = ends[len(results) - 1] + 1
+        gap = text[last_end:match.start()]
+        if match.group("te_neg") is not None:
+            if held and not gap.strip():
+                held[-1] = (held[-1][0], not held[-1][1])
+            flush()
+        elif match.group("en_neg") is not None:
+            flush()
+            last_en_negator_end = match.end()
+        else:
+            flush()
+            if match.group("en") is not None:
+                is_negated = False
+                if last_en_negator_end >= 0:
+                    between = text[last_en_negator_end:match.start()]
+                    is_negated = not SENTENCE_BREAK_RE.search(between) and len(between.split()) <= NEGATION_MAX_GAP_WORDS
+                add(ENGLISH_LEXICON[match.group("en")], is_negated)
+            else:
+                # Negator glued on as a suffix (e.g. ...లేని)
+                is_negated = bool(TELUGU_SUFFIX_NEGATION_RE.search(match.group("te_suffix")))
+                held.append((TELUGU_LEXICON[match.group("te")], is_negated))
+        last_end = match.end()
+    flush()
+    results.append((positive, negative, hits, negated))
+    results.extend((0.0, 0.0, 0, 0) for _ in range(len(texts) - len(results)))
+    return results
+
+
+def score(headline: str, body: str) -> LexiconScore:
+    head, body_scores = _score_segments([headline or "", body or ""])
+    return _combine(head, body_scores)
+
+
+def score_many(articles: Iterable[Tuple[str, str]]) -> List[LexiconScore]:
+    """Scores for many (headline, body) pairs from a single regex pass over the batch."""
+    texts = [text or "" for pair in articles for text in pair]
+    segments = _score_segments(texts)
+    return [_combine(segments[i], segments[i + 1]) for i in range(0, len(segments), 2)]
+
+
+def _combine(head: Tuple[float, float, int, int], body: Tuple[float, float, int, int]) -> LexiconScore:
+    head_pos, head_neg, head_hits, head_negated = head
+    body_pos, body_neg, body_hits, body_negated = body
+    positive = head_pos * HEADLINE_WEIGHT + body_pos
+    negative = head_neg * HEADLINE_WEIGHT + body_neg
+    hits = head_hits + body_hits
+    negated = head_negated + body_negated
+
+    total = positive + negative
+    if total == 0:
+        return LexiconScore("Neutral", 0.5, 0.0, 0.0, hits, negated)
+
+    polarity = (positive - negative) / total
+    evidence = min(1.0, total / EVIDENCE_SATURATION)
+    if polarity > NEUTRAL_BAND:
+        label = "Positive"
+    elif polarity < -NEUTRAL_BAND:
+        label = "Negative"
+    else:
+        return LexiconScore("Neutral", round(0.5 + 0.1 * evidence, 3), positive, negative, hits, negated)
+    return LexiconScore(label, round(0.5 + 0.5 * abs(polarity) * evidence, 3), positive, negative, hits, negated)
+
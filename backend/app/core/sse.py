@@ -0,0 +1,12 @@
+import json
+from typing import Any
+
+# Headers that keep proxies (nginx) from buffering an event stream
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no"
+}
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event. Data is JSON so multi-line tokens stay on one line."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,221 @@
+"""
+LLM call telemetry.
+
+Every provider call made by `llm_service` is recorded here with the agent
+name, model, key index, token usage, latency and outcome. Data is exported
+two ways:
+
+- Prometheus counters/histograms on `/metrics` (process lifetime).
+- A per-run summary collected while a pipeline run is active
+  (`track_run`), which the pipeline endpoint stores next to the DBFile.
+  Besides LLM activity it carries per-page records (`record_page`), e.g.
+  the triage decision for each page.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from prometheus_client.core import GaugeMetricFamily
+
+registry = CollectorRegistry()
+
+LLM_REQUESTS = Counter(
+    "llm_requests_total",
+    "Provider requests by outcome (success, rate_limited, error).",
+    ["agent", "provider", "model", "key", "outcome"],
+    registry=registry
+)
+LLM_LATENCY = Histogram(
+    "llm_request_latency_seconds",
+    "Latency of provider requests.",
+    ["agent", "provider", "model", "outcome"],
+    buckets=(0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120),
+    registry=registry
+)
+LLM_TOKENS = Counter(
+    "llm_tokens_total",
+    "Tokens reported by providers.",
+    ["agent", "provider", "model", "kind"],
+    registry=registry
+)
+LLM_RETRIES = Counter(
+    "llm_retries_total",
+    "Requests retried on another key or after a rate limit.",
+    ["agent", "provider", "reason"],
+    registry=registry
+)
+LLM_FALLBACKS = Counter(
+    "llm_fallbacks_total",
+    "Calls that fell through from one provider to the next.",
+    ["agent", "from_provider", "to_provider"],
+    registry=registry
+)
+LLM_CACHE_LOOKUPS = Counter(
+    "llm_cache_lookups_total",
+    "LLM response cache lookups.",
+    ["agent", "result"],
+    registry=registry
+)
+LLM_HEDGES = Counter(
+    "llm_hedges_total",
+    "Calls duplicated to a secondary provider.",
+    ["agent"],
+    registry=registry
+)
+
+
+class RunTelemetry:
+    """Aggregates LLM activity for one pipeline run, per agent."""
+
+    def __init__(self, run_id: str):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.agents: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self.pages: Dict[int, Dict[str, Any]] = defaultdict(dict)
+
+    def add(self, agent: str, **values: float):
+        stats = self.agents[agent]
+        for name, value in values.items():
+            stats[name] += value
+
+    def summary(self) -> Dict[str, Any]:
+        end = self.finished_at or time.time()
+        totals: Dict[str, float] = defaultdict(float)
+        agents = {}
+        for agent, stats in self.agents.items():
+            agents[agent] = {name: round(value, 3) for name, value in stats.items()}
+            for name, value in stats.items():
+                totals[name] += value
+        summary = {
+            "run_id": self.run_id,
+            "wall_seconds": round(end - self.started_at, 3),
+            "totals": {name: round(value, 3) for name, value in totals.items()},
+            "agents": agents
+        }
+        if self.pages:
+            summary["pages"] = [{"page": index + 1, **fields} for index, fields in sorted(self.pages.items())]
+        return summary
+
+
+_current_run: ContextVar[Optional[RunTelemetry]] = ContextVar("llm_run_telemetry", default=None)
+
+
+@contextmanager
+def track_run(run_id: str) -> Iterator[RunTelemetry]:
+    """Collect LLM telemetry for everything awaited inside the block (tasks inherit the context)."""
+    run = RunTelemetry(run_id)
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        run.finished_at = time.time()
+        _current_run.reset(token)
+
+
+def current_run() -> Optional[RunTelemetry]:
+    return _current_run.get()
+
+
+def record_call(
+    agent: str,
+    provider: str,
+    model: str,
+    outcome: str,
+    latency: float,
+    key_index: Optional[int] = None,
+    prompt_tokens: int = 0,
+    completion_tokens: int = 0
+):
+    key = str(key_index + 1) if key_index is not None else "-"
+    LLM_REQUESTS.labels(agent, provider, model, key, outcome).inc()
+    LLM_LATENCY.labels(agent, provider, model, outcome).observe(latency)
+    if prompt_tokens:
+        LLM_TOKENS.labels(agent, provider, model, "prompt").inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(agent, provider, model, "completion").inc(completion_tokens)
+
+    run = current_run()
+    if run:
+        run.add(
+            agent,
+            calls=1,
+            errors=0 if outcome == "success" else 1,
+            latency_seconds=latency,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens
+        )
+        run.add(agent, **{f"{provider}_calls": 1})
+
+
+def record_page(page_index: int, **fields: Any):
+    """Attach fields to the run's record for one page (0-based index)."""
+    run = current_run()
+    if run:
+        run.pages[page_index].update(fields)
+
+
+def record_retry(agent: str, provider: str, reason: str):
+    LLM_RETRIES.labels(agent, provider, reason).inc()
+    run = current_run()
+    if run:
+        run.add(agent, retries=1)
+
+
+def record_fallback(agent: str, from_provider: str, to_provider: str):
+    LLM_FALLBACKS.labels(agent, from_provider, to_provider).inc()
+    run = current_run()
+    if run:
+        run.add(agent, fallbacks=1)
+
+
+def record_cache(agent: str, hit: bool):
+    LLM_CACHE_LOOKUPS.labels(agent, "hit" if hit else "miss").inc()
+    run = current_run()
+    if run:
+        run.add(agent, cache_hits=1 if hit else 0, cache_misses=0 if hit else 1)
+
+
+def record_hedge(agent: str):
+    LLM_HEDGES.labels(agent).inc()
+    run = current_run()
+    if run:
+        run.add(agent, hedges=1)
+
+
+class LLMStateCollector:
+    """Exports live limiter, scheduler and breaker state as gauges at scrape time."""
+
+    def collect(self):
+        from app.core.circuit_breaker import CircuitState, circuit_breakers
+        from app.core.concurrency import groq_limiter, ollama_limiter
+        from app.core.groq_scheduler import groq_scheduler
+
+        limit = GaugeMetricFamily("llm_concurrency_limit", "Current adaptive concurrency limit.", labels=["provider"])
+        in_flight = GaugeMetricFamily("llm_in_flight", "Provider requests in flight.", labels=["provider"])
+        queued = GaugeMetricFamily("llm_queue_depth", "Calls waiting for a concurrency slot.", labels=["provider"])
+        for limiter in (groq_limiter, ollama_limiter):
+            limit.add_metric([limiter.name], limiter.limit)
+            in_flight.add_metric([limiter.name], limiter.in_flight)
+            queued.add_metric([limiter.name], limiter.waiting)
+        yield limit
+        yield in_flight
+        yield queued
+
+        snapshot = groq_scheduler.snapshot()
+        yield GaugeMetricFamily("llm_groq_scheduler_queue_depth", "Calls waiting for Groq key capacity.", value=snapshot["queued"])
+        headroom = GaugeMetricFamily("llm_groq_key_headroom", "Fraction of per-minute budget left on a Groq key.", labels=["key"])
+        for key in snapshot["keys"]:
+            headroom.add_metric([str(key["key_index"])], key["headroom"])
+        yield headroom
+
+        breaker_open = GaugeMetricFamily("llm_circuit_open", "1 if the circuit is open, 0.5 half-open, 0 closed.", labels=["name"])
+        for breaker in circuit_breakers.snapshot():
+            value = {CircuitState.OPEN.value: 1.0, CircuitState.HALF_OPEN.value: 0.5}.get(breaker["state"], 0.0)
+            breaker_open.add_metric([breaker["name"]], value)
+        yield breaker_open
+
+
+registry.register(LLMStateCollector())
@@ -0,0 +1,136 @@
+"""
+Single-pass text quality for extracted page text.
+
+`PDFExtractor.normalize_text` and `calculate_corruption_ratio` used to walk a
+page character by character in Python (one regex call per character), then
+scan it again for the ratio. Here:
+
+- `normalize` is NFKC, NBSP to space, and one compiled substitution dropping
+  zero-width characters and everything outside the allowed set. Output is
+  identical to the old per-character filter.
+- `assess` maps the text's code points through a precomputed BMP class table
+  and bincounts them (NumPy), so the corruption ratio, the U+FFFD count and a
+  per-script histogram come out of the same pass. Without NumPy it falls back
+  to `collections.Counter` and classifies each distinct character.
+- Long pages are probed first with evenly spaced windows; a page that is
+  obviously clean or obviously garbage returns from the probe (`sampled=True`)
+  without counting the rest. U+FFFD is always counted over the full text,
+  since a single one rejects a tier.
+
+See scripts/benchmark_text_quality.py for a comparison against the old code.
+"""
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Dict, NamedTuple, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TELUGU_RANGE = r'\u0C00-\u0C7F'
+# Common newspaper punctuation, quotes, and zero-width characters used in Indic scripts
+STANDARD_PUNCT = r'\s\.,!\?\(\)\[\]\{\}:;"\'\/\\%\$\#\*\+\-\=_@\|«»„""‘’' + r'\u200B\u200C\u200D\u2010-\u201F'
+ALPHANUM = r'a-zA-Z0-9'
+
+# Matches any character that is NOT Telugu, ASCII alphanumeric or standard punctuation
+DISALLOWED_CHAR_RE = re.compile(f'[^{TELUGU_RANGE}{STANDARD_PUNCT}{ALPHANUM}]')
+
+# Zero-width space/joiners are allowed characters, but normalization drops them too
+STRIP_CHARS_RE = re.compile(f'{DISALLOWED_CHAR_RE.pattern}|[\u200B-\u200D]')
+
+SAMPLE_MIN_CHARS = 20000
+SAMPLE_WINDOWS = 8
+SAMPLE_WINDOW_CHARS = 1000
+SAMPLE_CLEAN_RATIO = 0.02 # probe at or below this: clean, well under every tier threshold
+SAMPLE_GARBAGE_RATIO = 0.5 # probe at or above this: garbage, well over every tier threshold
+
+SCRIPTS = ("telugu", "latin", "digit", "whitespace", "punctuation", "other")
+_script_of: Dict[str, str] = {}
+_class_table = None
+_class_table_lock = threading.Lock()
+
+
+class TextQuality(NamedTuple):
+    corruption_ratio: float
+    fffd_count: int
+    scripts: Dict[str, int]
+    length: int
+    sampled: bool
+
+
+def normalize(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKC', text).replace('\u00A0', ' ')
+    return STRIP_CHARS_RE.sub('', text)
+
+
+def _classify(char: str) -> str:
+    script = _script_of.get(char)
+    if script is None:
+        if DISALLOWED_CHAR_RE.match(char):
+            script = "other"
+        elif '\u0C00' <= char <= '\u0C7F':
+            script = "telugu"
+        elif char.isascii() and char.isalpha():
+            script = "latin"
+        elif char.isascii() and char.isdigit():
+            script = "digit"
+        elif char.isspace():
+            script = "whitespace"
+        else:
+            script = "punctuation"
+        _script_of[char] = script
+    return script
+
+
+def _get_class_table() -> Optional["np.ndarray"]:
+    """Script index for every BMP code point; U+FFFF (disallowed) stands in for astral characters."""
+    global _class_table
+    if np is None:
+        return None
+    if _class_table is None:
+        with _class_table_lock:
+            if _class_table is None:
+                index = {script: i for i, script in enumerate(SCRIPTS)}
+                _class_table = np.array([index[_classify(chr(c))] for c in range(0x10000)], dtype=np.uint8)
+    return _class_table
+
+
+def script_histogram(text: str) -> Dict[str, int]:
+    table = _get_class_table()
+    if table is None:
+        histogram = dict.fromkeys(SCRIPTS, 0)
+        for char, count in Counter(text).items():
+            histogram[_classify(char)] += count
+        return histogram
+
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    counts = np.bincount(table[np.minimum(codes, 0xFFFF)], minlength=len(SCRIPTS))
+    return {script: int(count) for script, count in zip(SCRIPTS, counts)}
+
+
+def assess(text: str, sample: bool = True) -> TextQuality:
+    """Corruption ratio (share of disallowed characters), U+FFFD count and script histogram."""
+    if not text:
+        return TextQuality(1.0, 0, dict.fromkeys(SCRIPTS, 0), 0, False)
+
+    length = len(text)
+    fffd_count = text.count('\uFFFD')
+
+    if sample and length >= SAMPLE_MIN_CHARS:
+        step = length // SAMPLE_WINDOWS
+        probe = "".join(text[i * step:i * step + SAMPLE_WINDOW_CHARS] for i in range(SAMPLE_WINDOWS))
+        histogram = script_histogram(probe)
+        ratio = histogram["other"] / len(probe)
+        if ratio <= SAMPLE_CLEAN_RATIO or ratio >= SAMPLE_GARBAGE_RATIO:
+            # Scale the probe counts up to an estimate for the whole page
+            scale = length / len(probe)
+            estimate = {script: round(count * scale) for script, count in histogram.items()}
+            return TextQuality(ratio, fffd_count, estimate, length, True)
+
+    histogram = script_histogram(text)
+    return TextQuality(histogram["other"] / length, fffd_count, histogram, length, False)
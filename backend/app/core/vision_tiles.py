@@ -0,0 +1,234 @@
+"""
+Region tiles for the vision fallback.
+
+A whole scanned broadsheet squeezed into one 2000 px JPEG is a large, slow
+request in which body text is only a few pixels tall. Instead the page is
+split into article-sized tiles that are sent concurrently:
+
+1. Layout analysis runs on a small grayscale render (NumPy): ink rows and
+   columns give whitespace profiles, and rows/columns that are mostly ink
+   across a region are rule lines, treated as separators. A recursive XY-cut
+   on those profiles repeatedly halves the most oversized region (a side
+   longer than VISION_TILE_MAX_SIDE_FRACTION of the page's) at the separator
+   nearest its middle, up to VISION_MAX_TILES tiles. Cuts near a region's
+   edge are refused, so thin bands (headlines, decks) stay with the text they
+   introduce.
+2. Each tile is rendered from the PDF with a clip at its own zoom: small
+   enough to fit VISION_TILE_BASE_DIMENSION, raised up to
+   VISION_MAX_DIMENSION / VISION_TILE_MAX_DPI when the tile's text lines are
+   short, so dense small print gets more pixels.
+3. The JPEG encoder searches quality (binary search between
+   VISION_TILE_MIN_JPEG_QUALITY and VISION_JPEG_QUALITY) for the best image
+   under VISION_TILE_MAX_BYTES, shrinking the tile if even the lowest quality
+   does not fit. Pillow does the encoding when installed (several times faster
+   than PyMuPDF's encoder, and the search encodes a tile more than once).
+
+Tiles are planned once per page; `encode_tile` takes a zoom scale, a quality
+ceiling and a dimension cap so each rung of the VISION_LADDER re-encodes the
+same tiles coarser or finer.
+"""
+import io
+from typing import List, NamedTuple, Optional, Tuple
+from app.core.config import settings
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+ANALYSIS_MAX_DIMENSION = 1000 # px, longest side of the layout-analysis render
+INK_LEVEL = 160 # grayscale values below this are ink
+BLANK_FILL = 0.004 # rows/columns with less ink than this share are whitespace
+RULE_FILL = 0.6 # rows/columns with more ink than this share are rule lines
+MIN_GAP_PT = 6.0 # whitespace run (in PDF points) that separates regions
+THIN_BAND_FRACTION = 0.12 # no cut closer than this share of a region to its edge (keeps headlines with their body)
+MIN_TILE_AREA_FRACTION = 0.004 # smaller tiles (folios, specks) are dropped
+TILE_MARGIN_PT = 4.0
+
+
+class Tile(NamedTuple):
+    rect: Tuple[float, float, float, float] # PDF points
+    zoom: float
+    line_height_pt: Optional[float]
+
+
+def _runs(mask: "np.ndarray") -> List[Tuple[int, int]]:
+    """[start, end) runs of True in a 1-D mask."""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return list(zip(np.nonzero(edges == 1)[0], np.nonzero(edges == -1)[0]))
+
+
+def _separators(ink: "np.ndarray", axis: int) -> "np.ndarray":
+    fill = ink.mean(axis=axis)
+    return (fill < BLANK_FILL) | (fill > RULE_FILL)
+
+
+def _trim(ink: "np.ndarray", box: Tuple[int, int, int, int]) -> Optional[Tuple[int, int, int, int]]:
+    """Shrink a box to its content, dropping surrounding whitespace and rules; None when empty."""
+    y0, y1, x0, x1 = box
+    region = ink[y0:y1, x0:x1]
+    rows = np.nonzero(~_separators(region, 1))[0]
+    cols = np.nonzero(~_separators(region, 0))[0]
+    if not len(rows) or not len(cols):
+        return None
+    return y0 + rows[0], y0 + rows[-1] + 1, x0 + cols[0], x0 + cols[-1] + 1
+
+
+def _split(ink: "np.ndarray", box: Tuple[int, int, int, int], min_gap: int, max_h: int, max_w: int) -> Optional[List[Tuple[int, int, int, int]]]:
+    """Halve a box at the separator nearest the middle of its most oversized side."""
+    y0, y1, x0, x1 = box
+    height, width = y1 - y0, x1 - x0
+    region = ink[y0:y1, x0:x1]
+    axes = sorted(((1, height, height / max_h), (0, width, width / max_w)), key=lambda a: -a[2])
+    for axis, length, overflow in axes:
+        if overflow <= 1:
+            continue
+        thin = length * THIN_BAND_FRACTION
+        centers = [
+            (a + b) // 2 for a, b in _runs(_separators(region, axis))
+            if b - a >= min_gap and thin <= (a + b) // 2 <= length - thin
+        ]
+        if not centers:
+            continue
+        split = min(centers, key=lambda c: abs(c - length / 2))
+        if axis == 1:
+            halves = ((y0, y0 + split, x0, x1), (y0 + split, y1, x0, x1))
+        else:
+            halves = ((y0, y1, x0, x0 + split), (y0, y1, x0 + split, x1))
+        return [trimmed for trimmed in (_trim(ink, half) for half in halves) if trimmed]
+    return None
+
+
+def _cut(ink: "np.ndarray", min_gap: int, max_h: int, max_w: int, max_tiles: int) -> List[Tuple[int, int, int, int]]:
+    """XY-cut, always splitting the most oversized box next, until every box fits or max_tiles is reached."""
+    page = _trim(ink, (0, ink.shape[0], 0, ink.shape[1]))
+    if page is None:
+        return []
+    boxes = [page]
+    final: List[Tuple[int, int, int, int]] = []
+
+    def overflow(box):
+        return max((box[1] - box[0]) / max_h, (box[3] - box[2]) / max_w)
+
+    while boxes and len(boxes) + len(final) < max_tiles:
+        box = max(boxes, key=overflow)
+        if overflow(box) <= 1:
+            break
+        boxes.remove(box)
+        halves = _split(ink, box, min_gap, max_h, max_w)
+        if halves:
+            boxes.extend(halves)
+        else:
+            final.append(box)
+    # Reading order: top to bottom, then left to right
+    return sorted(boxes + final, key=lambda box: (box[0], box[2]))
+
+
+def _line_height(ink: "np.ndarray") -> Optional[float]:
+    """Median height of ink row runs (text lines), in analysis pixels."""
+    runs = [b - a for a, b in _runs(ink.mean(axis=1) >= BLANK_FILL)]
+    return float(np.median(runs)) if runs else None
+
+
+def plan_tiles(session, page_index: int) -> List[Tile]:
+    """Tiles for one page; a single full-page tile when no useful split exists."""
+    if np is None:
+        return []
+    width, height, samples = session.render_page_gray(page_index, ANALYSIS_MAX_DIMENSION)
+    gray = np.frombuffer(samples, dtype=np.uint8).reshape(height, width)
+    ink = gray < INK_LEVEL
+
+    page_w, page_h = session.page_size(page_index)
+    scale = width / page_w # analysis px per point
+    min_gap = max(2, int(MIN_GAP_PT * scale))
+    max_h = int(height * settings.VISION_TILE_MAX_SIDE_FRACTION)
+    max_w = int(width * settings.VISION_TILE_MAX_SIDE_FRACTION)
+
+    boxes = _cut(ink, min_gap, max_h, max_w, max(1, settings.VISION_MAX_TILES))
+    min_area = width * height * MIN_TILE_AREA_FRACTION
+    boxes = [box for box in boxes if (box[1] - box[0]) * (box[3] - box[2]) >= min_area]
+
+    tiles = []
+    margin = TILE_MARGIN_PT
+    for y0, y1, x0, x1 in boxes:
+        rect = (
+            max(0.0, x0 / scale - margin), max(0.0, y0 / scale - margin),
+            min(page_w, x1 / scale + margin), min(page_h, y1 / scale + margin)
+        )
+        line_px = _line_height(ink[y0:y1, x0:x1])
+        line_pt = line_px / scale if line_px else None
+        tiles.append(Tile(rect, tile_zoom(rect, line_pt), line_pt))
+    return tiles
+
+
+def tile_zoom(rect: Tuple[float, float, float, float], line_height_pt: Optional[float]) -> float:
+    longest = max(rect[2] - rect[0], rect[3] - rect[1], 1.0)
+    zoom = settings.VISION_TILE_BASE_DIMENSION / longest
+    if line_height_pt:
+        # Dense small print: enough pixels per text line for the model to read it
+        zoom = max(zoom, settings.VISION_TILE_MIN_LINE_PX / line_height_pt)
+    return min(zoom, max_zoom(rect))
+
+
+def max_zoom(rect: Tuple[float, float, float, float], max_dimension: Optional[int] = None) -> float:
+    longest = max(rect[2] - rect[0], rect[3] - rect[1], 1.0)
+    return min((max_dimension or settings.VISION_MAX_DIMENSION) / longest, settings.VISION_TILE_MAX_DPI / 72.0)
+
+
+def render_zoom(tile: Tile, zoom_scale: float = 1.0, max_dimension: Optional[int] = None) -> float:
+    """Zoom a tile is rendered at for a ladder rung (before any shrinking to fit the byte budget)."""
+    return min(tile.zoom * zoom_scale, max_zoom(tile.rect, max_dimension))
+
+
+def _jpeg_encoder(pixmap):
+    if Image is None:
+        return lambda quality: pixmap.tobytes("jpeg", jpg_quality=quality)
+    image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+
+    def encode(quality: int) -> bytes:
+        buffered = io.BytesIO()
+        image.save(buffered, format="JPEG", quality=quality)
+        return buffered.getvalue()
+
+    return encode
+
+
+def encode_jpeg_within(pixmap, max_bytes: int, max_quality: int, min_quality: int) -> Optional[bytes]:
+    """Highest JPEG quality in [min_quality, max_quality] whose output fits `max_bytes` (None if none does)."""
+    encode = _jpeg_encoder(pixmap)
+    data = encode(max_quality)
+    if len(data) <= max_bytes:
+        return data
+    best = None
+    low, high = min_quality, max_quality - 1
+    while low <= high:
+        quality = (low + high) // 2
+        data = encode(quality)
+        if len(data) <= max_bytes:
+            best = data
+            low = quality + 1
+        else:
+            high = quality - 1
+    return best
+
+
+def encode_tile(
+    session, page_index: int, tile: Tile, zoom_scale: float = 1.0, max_quality: Optional[int] = None,
+    max_dimension: Optional[int] = None
+) -> bytes:
+    """Render and encode a tile under VISION_TILE_MAX_BYTES, shrinking it if quality alone is not enough."""
+    zoom = render_zoom(tile, zoom_scale, max_dimension)
+    max_quality = max_quality or settings.VISION_JPEG_QUALITY
+    min_quality = min(settings.VISION_TILE_MIN_JPEG_QUALITY, max_quality)
+    for _ in range(4):
+        pixmap = session.render_page_pixmap(page_index, zoom, clip=tile.rect)
+        data = encode_jpeg_within(pixmap, settings.VISION_TILE_MAX_BYTES, max_quality, min_quality)
+        if data is not None:
+            return data
+        zoom *= 0.75
+    return _jpeg_encoder(pixmap)(min_quality)
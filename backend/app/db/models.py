@@ -25,6 +25,7 @@ class DBFile(Base):
     upload_date = Column(DateTime, default=datetime.utcnow)
     
     articles = relationship("DBArticle", back_populates="file")
+    runs = relationship("DBPipelineRun", back_populates="file")
 
 class DBArticle(Base):
     __tablename__ = "articles"
@@ -43,6 +44,31 @@ class DBArticle(Base):
     
     file = relationship("DBFile", back_populates="articles")
 
+class DBPipelineRun(Base):
+    __tablename__ = "pipeline_runs"
+
+    id = Column(String, primary_key=True, default=generate_uuid)
+    file_id = Column(String, ForeignKey("files.id"), index=True)
+    started_at = Column(DateTime, default=datetime.utcnow)
+    duration_seconds = Column(Float, nullable=True)
+    article_count = Column(Integer, nullable=True)
+    llm_summary = Column(Text, nullable=True) # JSON: per-agent calls, tokens, latency, retries, fallbacks, cache hits; per-page records
+
+    file = relationship("DBFile", back_populates="runs")
+
+class DBAnalysisMemo(Base):
+    """Analysis results keyed by a hash of the normalized headline + body, reused across editions/reprints."""
+    __tablename__ = "analysis_memo"
+
+    content_hash = Column(String, primary_key=True)
+    version = Column(String) # model + prompt version the results were produced with
+    department = Column(String, nullable=True)
+    sentiment_label = Column(String, nullable=True)
+    sentiment_confidence = Column(Float, nullable=True)
+    topic_cluster_id = Column(String, nullable=True)
+    hits = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
 class AuditLog(Base):
     __tablename__ = "audit_logs"
 
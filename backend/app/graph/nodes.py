@@ -1,9 +1,11 @@
 from app.graph.state import AgentState
+from app.core.config import settings
 from app.agents.ocr_agent import OCRAgent
 from app.agents.layout_agent import LayoutAgent
 from app.agents.vision_agent import VisionAgent
 from app.agents.department_agent import DepartmentAgent
 from app.agents.sentiment_agent import SentimentAgent
+from app.agents.analysis_agent import AnalysisAgent
 from app.agents.clustering_agent import ClusteringAgent
 from app.agents.search_agent import search_agent
 
@@ -13,6 +15,7 @@ from app.agents.search_agent import search_agent
 vision_agent = VisionAgent()
 department_agent = DepartmentAgent()
 sentiment_agent = SentimentAgent()
+analysis_agent = AnalysisAgent(department_agent, sentiment_agent)
 clustering_agent = ClusteringAgent()
 
 async def vision_node(state: AgentState) -> AgentState:
@@ -70,6 +73,11 @@ async def parallel_analysis_node(state: AgentState) -> AgentState:
     # as long as they don't touch the exact same property.
     
     try:
+        if settings.ANALYSIS_MODE == "fused":
+            # One model pass per batch yields department + sentiment together
+            await analysis_agent.run(articles)
+            return {"articles": articles}
+
         # We await both
         await asyncio.gather(
             department_agent.run(articles),
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.db.session import engine, Base
@@ -35,6 +35,28 @@ app.include_router(api_router, prefix=settings.API_V1_STR)
 def read_root():
     return {"message": "Welcome to Agentic News Digest and Sentiment Intelligence System"}
 
+@app.on_event("shutdown")
+async def close_llm_clients():
+    from app.core.llm import llm_service
+    await llm_service.aclose()
+
+@app.on_event("shutdown")
+def stop_pdf_workers():
+    from app.core.pdf_workers import pdf_workers
+    pdf_workers.shutdown()
+
+@app.on_event("shutdown")
+def close_page_cache():
+    from app.core.page_cache import page_cache
+    page_cache.close()
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus exposition of LLM call telemetry (latency, tokens, retries, fallbacks, cache hits)."""
+    from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+    from app.core.telemetry import registry
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
+
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
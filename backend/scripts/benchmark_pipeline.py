@@ -0,0 +1,128 @@
+"""
+End-to-end pipeline benchmark against recorded LLM traffic.
+
+Record fixtures once with live keys, then replay them offline as often as
+needed; replay is deterministic (seeded 429 injection, recorded latencies) so
+wall-time changes between commits come from our code, not the provider.
+
+    # once, with GROQ_API_KEYS set
+    python scripts/benchmark_pipeline.py --mode record
+
+    # afterwards, no network needed
+    python scripts/benchmark_pipeline.py --mode replay --output bench.json
+    python scripts/benchmark_pipeline.py --mode replay --baseline bench.json --max-regression 0.1
+
+Run from the backend/ directory. Chroma and any other files the pipeline
+writes go to a throwaway working directory.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PDF = os.path.join(os.path.dirname(BACKEND_DIR), "Vishakapatnam_NIE_27-12-2025.pdf")
+DEFAULT_FIXTURES = os.path.join(BACKEND_DIR, "fixtures", "llm")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark the document pipeline with recorded LLM responses.")
+    parser.add_argument("--pdf", default=DEFAULT_PDF, help="Newspaper PDF to process")
+    parser.add_argument("--mode", choices=["record", "replay"], default="replay")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="Fixture directory")
+    parser.add_argument("--latency-scale", type=float, default=1.0, help="Multiplier on recorded latencies (0 = no sleeps)")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Probability of an injected 429 per replayed request")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--baseline", help="Previous --output JSON to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.10, help="Allowed wall-time increase over the baseline (fraction)")
+    parser.add_argument("--output", help="Write the result JSON here")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """Settings are read at import time, so this must run before importing app."""
+    os.environ["LLM_REPLAY_MODE"] = args.mode
+    os.environ["LLM_REPLAY_DIR"] = os.path.abspath(args.fixtures)
+    os.environ["LLM_REPLAY_LATENCY_SCALE"] = str(args.latency_scale)
+    os.environ["LLM_REPLAY_RATE_LIMIT_RATE"] = str(args.rate_limit_rate)
+    os.environ["LLM_REPLAY_SEED"] = str(args.seed)
+    # Cache hits would hide the provider path we want to measure
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    sys.path.insert(0, BACKEND_DIR)
+
+
+async def run(pdf_path: str):
+    import fitz
+    from app.core import telemetry
+    from app.core.llm import llm_service
+    from app.core.llm_replay import llm_replay
+    from app.graph.workflow import app as pipeline_graph
+
+    initial_state = {
+        "file_id": "benchmark",
+        "file_path": pdf_path,
+        "articles": [],
+        "ocr_result": None,
+        "error": None,
+        "unassigned_segments": []
+    }
+    started = time.perf_counter()
+    try:
+        with telemetry.track_run("benchmark") as run_telemetry:
+            final_state = await pipeline_graph.ainvoke(initial_state)
+    finally:
+        await llm_service.aclose()
+    wall_seconds = time.perf_counter() - started
+
+    with fitz.open(pdf_path) as doc:
+        pages = len(doc)
+    return {
+        "pdf": os.path.basename(pdf_path),
+        "mode": llm_replay.mode,
+        "wall_seconds": round(wall_seconds, 3),
+        "pages": pages,
+        "articles": len(final_state.get("articles") or []),
+        "error": final_state.get("error"),
+        "llm": run_telemetry.summary(),
+        "replay": llm_replay.stats()
+    }
+
+
+def main():
+    args = parse_args()
+    pdf_path = os.path.abspath(args.pdf)
+    if not os.path.exists(pdf_path):
+        sys.exit(f"PDF not found: {pdf_path}")
+    output_path = os.path.abspath(args.output) if args.output else None
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    configure_environment(args)
+    workdir = tempfile.mkdtemp(prefix="pipeline-bench-")
+    os.chdir(workdir)
+
+    result = asyncio.run(run(pdf_path))
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2, ensure_ascii=False)
+
+    if result["replay"]["misses"]:
+        print(f"WARNING: {result['replay']['misses']} request(s) had no fixture; re-record after prompt changes.", file=sys.stderr)
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        limit = baseline["wall_seconds"] * (1 + args.max_regression)
+        change = result["wall_seconds"] / baseline["wall_seconds"] - 1 if baseline["wall_seconds"] else 0.0
+        print(f"Wall time {result['wall_seconds']:.2f}s vs baseline {baseline['wall_seconds']:.2f}s ({change:+.1%})")
+        if result["wall_seconds"] > limit:
+            print(f"REGRESSION: exceeds allowed {args.max_regression:.0%}", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
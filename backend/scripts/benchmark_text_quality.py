@@ -0,0 +1,109 @@
+"""
+Micro-benchmark: app/core/text_quality.py against the per-character
+normalize_text / findall corruption scoring it replaced.
+
+    python scripts/benchmark_text_quality.py
+    python scripts/benchmark_text_quality.py --pdf other.pdf --repeat 20
+
+Uses every page of the PDF (PyMuPDF text) plus a synthetic mojibake page, and
+checks that normalization output and full-pass ratios are unchanged before
+reporting timings. Run from the backend/ directory.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+import unicodedata
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PDF = os.path.join(os.path.dirname(BACKEND_DIR), "Vishakapatnam_NIE_27-12-2025.pdf")
+sys.path.insert(0, BACKEND_DIR)
+
+from app.core import text_quality  # noqa: E402
+
+LEGACY_RE = re.compile(f'[^{text_quality.TELUGU_RANGE}{text_quality.STANDARD_PUNCT}{text_quality.ALPHANUM}]')
+
+
+def legacy_normalize(text: str) -> str:
+    if not text:
+        return ""
+    text = unicodedata.normalize('NFKC', text)
+    text = text.replace('\u00A0', ' ')
+    text = text.replace('\u200B', '')
+    text = text.replace('\u200C', '')
+    text = text.replace('\u200D', '')
+
+    def filter_chars(char):
+        if char in '\n\r\t':
+            return char
+        if LEGACY_RE.match(char):
+            return ''
+        return char
+
+    return "".join(filter_chars(c) for c in text)
+
+
+def legacy_corruption_ratio(text: str):
+    if not text:
+        return 1.0, 0
+    fffd_count = text.count('\uFFFD')
+    return len(LEGACY_RE.findall(text)) / len(text), fffd_count
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Compare text normalization and corruption scoring implementations.")
+    parser.add_argument("--pdf", default=DEFAULT_PDF, help="PDF whose page text is used as input")
+    parser.add_argument("--repeat", type=int, default=10, help="Timed passes over all pages")
+    return parser.parse_args()
+
+
+def load_pages(pdf_path: str):
+    import fitz
+
+    with fitz.open(pdf_path) as doc:
+        pages = [page.get_text("text", sort=True) for page in doc]
+    # Mojibake as produced by broken legacy Telugu font encodings
+    rng = random.Random(0)
+    garbage = "".join(rng.choice("ÀÁÂÃÄÅÆÇÈÉÊËÌÍÎÏÐÑÒÓÔÕÖ×ØÙÚÛÜÝÞß¡¢£¤¥¦§¨©ª ") for _ in range(60000))
+    return pages + [garbage]
+
+
+def timed(fn, pages, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in pages:
+            fn(text)
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    args = parse_args()
+    if not os.path.exists(args.pdf):
+        sys.exit(f"PDF not found: {args.pdf}")
+    pages = load_pages(args.pdf)
+    chars = sum(len(p) for p in pages)
+
+    for i, text in enumerate(pages):
+        if text_quality.normalize(text) != legacy_normalize(text):
+            sys.exit(f"Normalization differs on input {i}")
+        full = text_quality.assess(text, sample=False)
+        if (full.corruption_ratio, full.fffd_count) != legacy_corruption_ratio(text):
+            sys.exit(f"Corruption ratio differs on input {i}")
+
+    rows = [
+        ("normalize (legacy)", timed(legacy_normalize, pages, args.repeat)),
+        ("normalize", timed(text_quality.normalize, pages, args.repeat)),
+        ("corruption ratio (legacy)", timed(legacy_corruption_ratio, pages, args.repeat)),
+        ("assess, full pass", timed(lambda t: text_quality.assess(t, sample=False), pages, args.repeat)),
+        ("assess, sampled", timed(text_quality.assess, pages, args.repeat)),
+    ]
+    sampled = sum(text_quality.assess(t).sampled for t in pages)
+    print(f"{len(pages)} inputs, {chars} chars, {sampled} decided from the probe")
+    for label, seconds in rows:
+        print(f"{label:<28} {seconds * 1000:9.2f} ms/pass  {chars / seconds / 1e6:8.2f} Mchar/s")
+
+
+if __name__ == "__main__":
+    main()
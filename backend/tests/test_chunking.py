@@ -0,0 +1,55 @@
+from app.agents.vision_agent import VisionAgent
+from app.core.chunking import chunk_text, count_tokens, merge_overlapping_text
+from app.schemas.layout import Article
+
+PARAGRAPHS = [f"Paragraph {i}. " + " ".join(f"word{i}x{j}" for j in range(60)) for i in range(12)]
+PAGE = "\n\n".join(PARAGRAPHS)
+
+
+def article(headline: str, body: str) -> Article:
+    return Article(headline=headline, body=body, page_number=1, segments=[], confidence=1.0)
+
+
+def test_short_text_is_one_chunk():
+    assert chunk_text("CM inaugurates bridge", max_tokens=100) == ["CM inaugurates bridge"]
+    assert chunk_text("   ", max_tokens=100) == []
+
+
+def test_chunks_respect_the_budget_and_overlap():
+    paragraph_tokens = max(count_tokens(paragraph) for paragraph in PARAGRAPHS)
+    budget = paragraph_tokens * 3
+    chunks = chunk_text(PAGE, max_tokens=budget, overlap_tokens=paragraph_tokens)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= budget for chunk in chunks)
+    for previous, current in zip(chunks, chunks[1:]):
+        # The last paragraph of each chunk opens the next one
+        assert current.startswith(previous.split("\n\n")[-1])
+    assert all(paragraph in PAGE for chunk in chunks for paragraph in chunk.split("\n\n"))
+
+
+def test_merge_drops_the_duplicated_span_and_keeps_line_breaks():
+    first = "The Chief Minister reviewed the project.\nWork on the second phase will start"
+    second = "Work on the second phase will start in March,\nofficials said."
+    merged = merge_overlapping_text(first, second, min_overlap=20)
+    assert merged == "The Chief Minister reviewed the project.\nWork on the second phase will start in March,\nofficials said."
+
+
+def test_merge_prefers_the_containing_text():
+    assert merge_overlapping_text("a short body", "this is a short body indeed") == "this is a short body indeed"
+    assert merge_overlapping_text("full text here", "text") == "full text here"
+
+
+def test_merge_refuses_unrelated_texts():
+    assert merge_overlapping_text("Rains lash coastal districts " * 3, "Collector orders relief camps " * 3) is None
+
+
+def test_chunk_articles_are_stitched_only_when_bodies_overlap():
+    tail = "The district collector said relief camps will stay open this week."
+    chunks = [
+        [article("Relief camps open", "Heavy rains hit the coast. " + tail), article("Roads damaged", "Several roads were cut off.")],
+        [article("Relief camps open", tail + " Food packets were distributed."), article("Roads damaged", "A different story entirely.")],
+        [article("", "Untitled fragment one."), article("", "Untitled fragment two.")]
+    ]
+    merged = VisionAgent._merge_chunk_articles(chunks)
+    assert [a.headline for a in merged] == ["Relief camps open", "Roads damaged", "Roads damaged", "", ""]
+    assert merged[0].body == "Heavy rains hit the coast. " + tail + " Food packets were distributed."
@@ -0,0 +1,90 @@
+import asyncio
+import time
+import pytest
+from app.core.circuit_breaker import CircuitBreaker, CircuitState, circuit_breakers
+from app.core.config import settings
+from app.core.llm import llm_service
+
+
+def make_breaker(**overrides) -> CircuitBreaker:
+    options = dict(failure_rate_threshold=0.5, window_seconds=60.0, min_calls=4, open_seconds=30.0, half_open_probes=1)
+    options.update(overrides)
+    return CircuitBreaker("test", **options)
+
+
+def force_half_open(breaker: CircuitBreaker):
+    breaker._open(time.monotonic() - breaker.open_seconds - 1)
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_opens_once_failure_rate_crosses_threshold():
+    breaker = make_breaker()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED # below min_calls
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_admits_one_probe_and_success_closes():
+    breaker = make_breaker()
+    force_half_open(breaker)
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_probe_reopens():
+    breaker = make_breaker()
+    force_half_open(breaker)
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+
+
+def test_release_probe_frees_the_slot_without_changing_state():
+    breaker = make_breaker()
+    force_half_open(breaker)
+    assert breaker.allow_request()
+    breaker.release_probe()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+
+
+def test_release_probe_is_a_no_op_when_closed():
+    breaker = make_breaker()
+    breaker.release_probe()
+    assert breaker.state == CircuitState.CLOSED
+
+
+@pytest.fixture
+def groq_only(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "groq")
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "key-one")
+    monkeypatch.setattr(settings, "GROQ_QUEUE_MAX_WAIT_SECONDS", 0.5)
+    circuit_breakers._breakers.clear()
+    yield
+    circuit_breakers._breakers.clear()
+
+
+def test_half_open_probe_is_released_after_non_provider_error(groq_only, monkeypatch):
+    async def bad_request(*args, **kwargs):
+        raise ValueError("unparseable request") # our fault, says nothing about Groq's health
+
+    async def ollama(*args, **kwargs):
+        return "from ollama"
+
+    monkeypatch.setattr(llm_service, "_groq_chat", bad_request)
+    monkeypatch.setattr(llm_service, "_call_ollama", ollama)
+    breaker = circuit_breakers.get("groq")
+    force_half_open(breaker)
+
+    result, route = asyncio.run(llm_service._dispatch([{"role": "user", "content": "hi"}], None, False, None, "test"))
+
+    assert (result, route[0]) == ("from ollama", "ollama")
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request() # the probe slot was handed back, not leaked until expiry
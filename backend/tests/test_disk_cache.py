@@ -0,0 +1,59 @@
+from types import SimpleNamespace
+import pytest
+from app.core import disk_cache
+from app.core.disk_cache import DiskCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = SimpleNamespace(value=1000.0)
+
+    def tick():
+        now.value += 1
+        return now.value
+
+    monkeypatch.setattr(disk_cache, "time", SimpleNamespace(time=tick))
+    return now
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=1000)
+    assert cache.get("missing") is None
+    cache.set("key", "value")
+    assert cache.get("key") == "value"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["writes"], stats["bytes"]) == (1, 1, 1, 5)
+
+
+def test_evicts_least_recently_used(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=300)
+    for key in "abc":
+        cache.set(key, key * 100)
+    cache.get("a") # "b" then "c" are now the least recently used
+    cache.set("d", "d" * 100)
+    # Over the cap: evict down to 90% of it, oldest access first
+    assert cache.evictions == 2
+    assert cache.stats()["bytes"] == 200
+    assert [key for key in "abcd" if cache.get(key)] == ["a", "d"]
+
+
+def test_oversized_values_are_not_stored(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=10)
+    cache.set("big", "x" * 11)
+    assert cache.get("big") is None
+
+
+def test_expired_entries_are_misses(tmp_path, clock):
+    cache = DiskCache(str(tmp_path / "cache.db"), max_bytes=1000, ttl_seconds=5)
+    cache.set("key", "value")
+    clock.value += 10
+    assert cache.get("key") is None
+    assert cache.stats()["bytes"] == 0
+
+
+def test_size_survives_reopening(tmp_path, clock):
+    path = str(tmp_path / "cache.db")
+    cache = DiskCache(path, max_bytes=1000)
+    cache.set("key", "value")
+    cache.close()
+    assert DiskCache(path, max_bytes=1000).stats()["bytes"] == 5
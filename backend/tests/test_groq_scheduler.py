@@ -0,0 +1,83 @@
+import asyncio
+import time
+import pytest
+from app.core.config import settings
+from app.core.groq_scheduler import GroqCapacityExhausted, GroqKeyScheduler, TokenBucket, parse_reset_seconds
+
+
+@pytest.fixture
+def scheduler(monkeypatch):
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "key-one,key-two")
+    monkeypatch.setattr(settings, "GROQ_RPM_PER_KEY", 30)
+    monkeypatch.setattr(settings, "GROQ_TPM_PER_KEY", 30000)
+    return GroqKeyScheduler()
+
+
+@pytest.mark.parametrize("value, seconds", [("12", 12.0), ("7.66s", 7.66), ("450ms", 0.45), ("2m59.56s", 179.56), ("1h", 3600.0)])
+def test_parse_reset_seconds(value, seconds):
+    assert parse_reset_seconds(value) == pytest.approx(seconds)
+
+
+@pytest.mark.parametrize("value", [None, "", "soon"])
+def test_parse_reset_seconds_rejects_garbage(value):
+    assert parse_reset_seconds(value) is None
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(capacity=60, per_minute=60)
+    bucket.consume(60)
+    assert bucket.seconds_until(30, bucket.updated) == pytest.approx(30.0)
+    bucket.refill(bucket.updated + 10)
+    assert bucket.level == pytest.approx(10.0)
+
+
+def test_acquire_spreads_load_and_release_refunds(scheduler):
+    async def scenario():
+        first = await scheduler.acquire(10000)
+        second = await scheduler.acquire(10000)
+        assert {first.index, second.index} == {0, 1} # the emptier key wins
+        tokens_before = first.state.tokens.level
+        scheduler.release(first)
+        assert first.state.tokens.level == pytest.approx(tokens_before + 10000, abs=1)
+        assert first.state.in_flight == 0
+        scheduler.release(first) # settling twice is a no-op
+        assert first.state.in_flight == 0
+
+    asyncio.run(scenario())
+
+
+def test_rate_limited_key_is_skipped(scheduler):
+    async def scenario():
+        lease = await scheduler.acquire(100)
+        scheduler.record_rate_limit(lease, {"retry-after": "30"})
+        for _ in range(3):
+            other = await scheduler.acquire(100)
+            assert other.index != lease.index
+            scheduler.release(other)
+
+    asyncio.run(scenario())
+
+
+def test_deadline_raises_capacity_exhausted(scheduler):
+    async def scenario():
+        for state in scheduler._sync_keys():
+            state.blocked_until = time.monotonic() + 60
+        with pytest.raises(GroqCapacityExhausted):
+            await scheduler.acquire(100, deadline=time.monotonic() + 0.2)
+
+    asyncio.run(scenario())
+
+
+def test_waiter_on_a_blocked_key_does_not_hold_up_other_keys(scheduler):
+    async def scenario():
+        blocked = scheduler._sync_keys()[0]
+        blocked.blocked_until = time.monotonic() + 0.5
+        waiter = asyncio.create_task(scheduler.acquire(100, exclude=[1]))
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        lease = await scheduler.acquire(100, exclude=[0])
+        assert lease.index == 1
+        assert time.monotonic() - started < 0.1
+        assert (await waiter).index == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+from app.core.config import settings
+from app.core.page_triage import decide, text_line_share
+
+NEWS_PAGE = {
+    "text_chars": 15000, "text_density": 4.5, "corruption_ratio": 0.01, "fffds": 0, "image_coverage": 1.0,
+    "body_font_size": 12.9, "body_font_ratio": 5.7, "headline_share": 0.03, "government_hits": 12, "off_topic_hits": 3
+}
+SCAN_PAGE = {
+    "text_chars": 0, "text_density": 0.0, "corruption_ratio": None, "fffds": 0, "image_coverage": 1.0,
+    "body_font_size": 0.0, "body_font_ratio": 0.0, "headline_share": 0.0, "government_hits": 0, "off_topic_hits": 0,
+    "ink_ratio": 0.12, "text_line_share": 0.55
+}
+
+
+def page(base, **changes):
+    return {**base, **changes}
+
+
+def test_news_page_is_digital():
+    assert decide(NEWS_PAGE)[0] == "digital"
+
+
+def test_scan_goes_to_vision():
+    assert decide(SCAN_PAGE) == ("vision", "no usable text layer")
+
+
+def test_blank_page_is_skipped():
+    assert decide(page(SCAN_PAGE, ink_ratio=0.001, text_line_share=0.0)) == ("skip", "blank page")
+
+
+def test_photo_or_ad_page_is_skipped():
+    decision, reason = decide(page(SCAN_PAGE, text_line_share=0.03))
+    assert decision == "skip" and reason.startswith("full-page ad/photo")
+
+
+def test_vector_graphic_is_skipped():
+    decision, reason = decide(page(SCAN_PAGE, image_coverage=0.0, text_line_share=0.0))
+    assert decision == "skip" and reason.startswith("full-page graphic")
+
+
+def test_display_type_only_is_an_ad():
+    decision, _ = decide(page(SCAN_PAGE, text_chars=30, body_font_size=40.0, body_font_ratio=17.6, text_line_share=0.6))
+    assert decision == "skip"
+
+
+def test_sparse_text_with_government_news_is_digital():
+    sparse = page(NEWS_PAGE, text_chars=600, text_density=0.2, government_hits=2, text_line_share=0.02)
+    assert decide(sparse)[0] == "digital"
+
+
+def test_off_topic_section_is_skipped():
+    sports = page(NEWS_PAGE, government_hits=1, off_topic_hits=settings.PAGE_TRIAGE_OFF_TOPIC_MIN_HITS + 5)
+    assert decide(sports)[0] == "skip"
+
+
+def test_garbled_text_goes_to_the_extraction_tiers():
+    assert decide(page(NEWS_PAGE, corruption_ratio=0.4, government_hits=0))[0] == "digital"
+
+
+def test_missing_keywords_alone_never_skip():
+    assert decide(page(NEWS_PAGE, government_hits=0, off_topic_hits=0))[0] == "digital"
+
+
+def raster(rows: np.ndarray) -> tuple:
+    gray = np.where(rows, 0, 255).astype(np.uint8)
+    return gray.shape[1], gray.shape[0], gray.tobytes()
+
+
+def test_text_lines_versus_solid_image():
+    height, width = 400, 240
+    lines = np.zeros((height, width), dtype=bool)
+    for top in range(0, height, 10):
+        lines[top:top + 5, :] = True # 5 px lines with 5 px leading
+    photo = np.zeros((height, width), dtype=bool)
+    photo[50:350, :] = True
+    assert text_line_share(*raster(lines), max_line_px=8) == pytest.approx(1.0)
+    assert text_line_share(*raster(photo), max_line_px=8) == 0.0
+    assert text_line_share(*raster(np.zeros((height, width), dtype=bool)), max_line_px=8) == 0.0
@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from app.core.analysis_memo import analysis_memo, memo_version
+from app.core.config import settings
+from app.core.page_cache import PageCache
+from app.schemas.layout import Article
+
+
+@pytest.fixture
+def groq_primary(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "groq")
+    monkeypatch.setattr(settings, "GROQ_API_KEY", "key-one")
+    monkeypatch.setattr(settings, "GROQ_MODEL", "text-model")
+    monkeypatch.setattr(settings, "GROQ_VISION_MODEL", "vision-model")
+
+
+def test_memo_version_names_provider_model_and_prompt(groq_primary):
+    assert memo_version() == f"groq:text-model:{settings.LLM_PROMPT_VERSION}"
+    assert memo_version(("ollama", "llama3.2")).startswith("ollama:llama3.2:")
+
+
+def test_memo_skips_answers_from_fallback_routes(groq_primary, monkeypatch):
+    stored = []
+    monkeypatch.setattr(settings, "ANALYSIS_MEMO_ENABLED", True)
+    monkeypatch.setattr(analysis_memo, "_store", stored.append)
+    article = Article(headline="CM visits port", body="The Chief Minister visited the port.", page_number=1, segments=[], confidence=1.0, department="Finance & Planning")
+
+    asyncio.run(analysis_memo.store([article], ["department"], {("groq", "text-model"), ("ollama", "llama3.2")}))
+    assert stored == []
+    asyncio.run(analysis_memo.store([article], ["department"], {("groq", "text-model")}))
+    assert [list(entries.values()) for entries in stored] == [[{"department": "Finance & Planning"}]]
+
+
+def test_page_cache_key_follows_the_primary_routes(groq_primary, monkeypatch):
+    groq_key = PageCache._articles_key("sha", 3)
+    assert groq_key.endswith(":groq:text-model:vision-model")
+    assert PageCache.primary_routes() == {("groq", "text-model"), ("groq", "vision-model")}
+
+    monkeypatch.setattr(settings, "LLM_PROVIDER", "ollama")
+    assert PageCache._articles_key("sha", 3) != groq_key
+    assert PageCache.primary_routes() == {("ollama", settings.OLLAMA_MODEL)}
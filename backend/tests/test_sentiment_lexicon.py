@@ -0,0 +1,45 @@
+import pytest
+from app.core import sentiment_lexicon
+from app.core.sentiment_lexicon import NEGATED_WEIGHT, score, score_many
+
+
+def test_whole_words_only():
+    assert score("", "Open the window").hits == 0
+    assert score("", "The team wins").hits == 1
+
+
+def test_headline_counts_double():
+    result = score("Victory", "")
+    assert result.positive == pytest.approx(1.5 * sentiment_lexicon.HEADLINE_WEIGHT)
+    assert result.label == "Positive"
+
+
+def test_english_negation_flips_at_reduced_weight():
+    result = score("", "No deaths were reported")
+    assert (result.hits, result.negated) == (0, 1)
+    assert result.positive == pytest.approx(2.0 * NEGATED_WEIGHT)
+    assert result.negative == 0
+
+
+def test_negation_does_not_cross_sentences():
+    result = score("", "There was no rain. Death toll rises")
+    assert (result.hits, result.negated) == (1, 0)
+
+
+def test_telugu_stem_with_suffix_and_trailing_negator():
+    assert score("", "అభివృద్ధికి నిధులు").hits == 1
+    negated = score("", "ప్రమాదం లేదు")
+    assert (negated.hits, negated.negated) == (0, 1)
+    assert negated.positive > 0
+
+
+def test_score_many_matches_score_and_keeps_texts_apart():
+    pairs = [
+        ("CM hails growth", "Record welfare benefits for farmers"),
+        ("వరద", "లేదు"), # a negator opening the body must not flip the headline term
+        ("", ""),
+        ("Protest turns violent", "not happy with the delay")
+    ]
+    assert score_many(pairs) == [score(headline, body) for headline, body in pairs]
+    assert score_many([]) == []
+    assert score_many(pairs)[1].negated == 0